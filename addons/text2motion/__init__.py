@@ -11,12 +11,36 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ThreadPoolExecutor
 import textwrap
-from .t2m_server_request_wrapper import ModelVersion, get_target_skeleton, load_frames, make_server_request
+from .t2m_server_request_wrapper import (ModelVersion, get_target_skeleton, load_frames, make_server_request,
+                                         T2MFramesLoader, active_loaders, get_cached_response,
+                                         assign_shared_action, get_matching_armatures, get_object_action,
+                                         group_armatures_by_skeleton,
+                                         get_request_cache_key, load_frames_incrementally, tag_generated_action,
+                                         stop_incremental_load, stop_incremental_loads,
+                                         GENERATED_FRAMES_PROPERTY, get_generated_frames,
+                                         set_response_cache)
+from .t2m_cache import T2MResponseCache
+from .t2m_library import T2MClipLibrary
+from .t2m_bone_map import AUTO_PROFILE_ID, T2MBoneMapLibrary, make_profile_template
+from .t2m_stream import decode_frames
+from . import t2m_server_request_wrapper
+from .t2m_jobs import POLL_INTERVAL_SECONDS, get_active_jobs, submit_job
+from .t2m_batch import T2MBatchItem, make_action_name, read_prompts
+from . import t2m_jobs
+from . import t2m_timing
+from .t2m_timing import T2MGenerationTimings, log_generation_timings
+from .t2m_reduce import DEFAULT_ANGLE_TOLERANCE_RADIANS, DEFAULT_LOCATION_TOLERANCE
+from .t2m_sequence import DEFAULT_BLEND_SECONDS, T2MSequence
+from .t2m_skeleton import DEFAULT_MATRIX_PRECISION
+from .t2m_retry import REQUEST_BURST, REQUEST_RATE_PER_SECOND
+from .t2m_root_motion import (ROOT_MOTION_FULL, ROOT_MOTION_GROUNDED, ROOT_MOTION_HORIZONTAL,
+                              ROOT_MOTION_IN_PLACE, ROOT_MOTION_NONE, ROOT_MOTION_OBJECT)
 import logging
 import bpy
 import webbrowser
-from bpy.props import (StringProperty, BoolProperty,
+from bpy.props import (StringProperty, BoolProperty, FloatProperty,
                        PointerProperty, IntProperty, EnumProperty)
 from text2motion_client_api.exceptions import ApiException
 from http import HTTPStatus
@@ -53,6 +77,42 @@ def _label_multiline(context, text, parent):
 
 MAX_DURATION_SECONDS = 30
 current_duration_unit_selector = 'seconds'
+bone_map_library = None
+# enum items must stay referenced while Blender shows them
+_bone_map_profile_items = []
+
+
+def _get_bone_map_profile_items(self, context):
+    global _bone_map_profile_items
+    if not bone_map_library:
+        _bone_map_profile_items = [(AUTO_PROFILE_ID, "Mixamo", "")]
+        return _bone_map_profile_items
+    _bone_map_profile_items = [
+        (profile_id, profile.name, profile.description)
+        for profile_id, profile in bone_map_library.get_profiles().items()
+    ]
+    return _bone_map_profile_items
+
+
+def _get_bone_map_profile_index(self):
+    # dynamic enums are saved as an item index, the id is saved instead so adding or removing a
+    # profile file does not switch the profile of saved scenes
+    profile_ids = [item[0] for item in _get_bone_map_profile_items(self, None)]
+    if self.bone_map_profile_id in profile_ids:
+        return profile_ids.index(self.bone_map_profile_id)
+    return 0
+
+
+def _set_bone_map_profile_index(self, value):
+    self.bone_map_profile_id = _get_bone_map_profile_items(self, None)[value][0]
+
+
+def get_bone_map_profile(scene_properties):
+    """The selected profile, None for the default Mixamo naming"""
+    if not bone_map_library or scene_properties.bone_map_profile_id == AUTO_PROFILE_ID:
+        return None
+    return bone_map_library.get_profile(scene_properties.bone_map_profile_id)
+
 current_duration = 5
 
 class T2MSceneProperties(bpy.types.PropertyGroup):
@@ -99,11 +159,89 @@ class T2MSceneProperties(bpy.types.PropertyGroup):
         default="T2MGeneratedAction",
         maxlen=63,
     )
-    is_root_motion_enabled: BoolProperty(
-        name="Apply Root Motion",
-        description="Apply root motion for the generated animation",
+    root_motion_mode: EnumProperty(
+        name="Root Motion",
+        description="How the motion of the root bone is applied to the generated animation",
+        items=[(ROOT_MOTION_FULL, "Full", "Apply the root motion as generated"),
+               (ROOT_MOTION_GROUNDED, "Grounded", "Apply the root motion with the height relative to the first frame"),
+               (ROOT_MOTION_HORIZONTAL, "Horizontal Only", "Apply the horizontal root motion, the root keeps its rest height"),
+               (ROOT_MOTION_IN_PLACE, "In Place", "Animate in place, the root keeps only its vertical motion"),
+               (ROOT_MOTION_OBJECT, "Transfer to Object", "Animate in place and move the object's delta location instead"),
+               (ROOT_MOTION_NONE, "Off", "No root bone location keys, the root stays at its rest location"),
+               ],
+        default=ROOT_MOTION_GROUNDED,
+    )
+    is_applied_to_matching_armatures: BoolProperty(
+        name="Apply to Matching Selected",
+        description="Also animate every selected armature with the same skeleton as the active one, sharing one generated action",
         default=True,
     )
+    bone_map_profile: EnumProperty(
+        name="Bone Map",
+        description="How the generated bones are matched to the bones of the armature",
+        items=_get_bone_map_profile_items,
+        get=_get_bone_map_profile_index,
+        set=_set_bone_map_profile_index,
+    )
+    bone_map_profile_id: StringProperty(
+        name="Bone Map Id",
+        description="Id of the selected bone map profile, see Bone Map",
+        default=AUTO_PROFILE_ID,
+        options={'HIDDEN'},
+    )
+    is_cache_bypassed: BoolProperty(
+        name="Bypass Cache",
+        description="Always make a new server request instead of reusing a cached response for the same prompt, skeleton, duration and model version",
+        default=False,
+    )
+    is_bulk_keyframe_insert_enabled: BoolProperty(
+        name="Bulk Keyframe Insert",
+        description="Write the generated keyframes directly into the F-Curves instead of inserting them one at a time",
+        default=True,
+    )
+    is_keyframe_reduction_enabled: BoolProperty(
+        name="Reduce Keyframes",
+        description="Drop generated keyframes that interpolation between the remaining keyframes reproduces within the tolerances",
+        default=False,
+    )
+    keyframe_reduction_angle_tolerance: FloatProperty(
+        name="Rotation Tolerance",
+        description="Largest rotation difference allowed where a keyframe is dropped",
+        subtype='ANGLE',
+        default=DEFAULT_ANGLE_TOLERANCE_RADIANS,
+        min=0.0,
+        soft_max=0.1,
+    )
+    keyframe_reduction_location_tolerance: FloatProperty(
+        name="Location Tolerance",
+        description="Largest location difference allowed where a keyframe is dropped",
+        subtype='DISTANCE',
+        default=DEFAULT_LOCATION_TOLERANCE,
+        min=0.0,
+        soft_max=0.1,
+        precision=4,
+    )
+    resample_mode: EnumProperty(
+        name="Resample",
+        description="Resample the generated motion so keyframes land on whole frames",
+        items=[('NONE', "Off", "Keep the generated timestamps, keyframes may fall between frames"),
+               ('SCENE', "Scene Frame Rate", "One keyframe per frame of the scene"),
+               ('CUSTOM', "Custom Rate", "Keyframes at a custom sampling rate"),
+               ],
+        default='NONE',
+    )
+    resample_fps: IntProperty(
+        name="Sampling Rate",
+        description="Keyframes per second when resampling at a custom rate. Keyframes land on whole frames when the scene frame rate is a multiple of it",
+        default=30,
+        min=1,
+        max=240,
+    )
+    is_timing_breakdown_shown: BoolProperty(
+        name="Show Timings",
+        description="Show how long each phase of the last generation took",
+        default=False,
+    )
     duration_unit: EnumProperty(
         name="",
         description="Duration unit selector",
@@ -139,6 +277,48 @@ class T2MSceneProperties(bpy.types.PropertyGroup):
                (ModelVersion.LAB_V_0_1_0, ModelVersion.LAB_V_0_1_0, ""),
                ]
     )
+    library_search: StringProperty(
+        name="",
+        description="Only list library clips whose name or prompt contains these words",
+    )
+    batch_prompt_source: EnumProperty(
+        name="Prompts",
+        description="Where to read the batch prompts from, one prompt per line",
+        items=[('TEXT', "Text", "Read prompts from a text datablock"),
+               ('FILE', "File", "Read prompts from a text file on disk"),
+               ],
+    )
+    batch_prompt_text: PointerProperty(
+        name="Text",
+        description="Text datablock with one prompt per line",
+        type=bpy.types.Text,
+    )
+    batch_prompt_file: StringProperty(
+        name="File",
+        description="Text file with one prompt per line",
+        subtype='FILE_PATH',
+    )
+    batch_concurrency: IntProperty(
+        name="Concurrent Requests",
+        description="Maximum number of requests in flight at the same time",
+        default=4,
+        min=1,
+        max=16,
+    )
+    sequence_blend_seconds: FloatProperty(
+        name="Blend Seconds",
+        description="Overlap between consecutive animations of a sequence, crossfaded from one to the next",
+        default=DEFAULT_BLEND_SECONDS,
+        min=0.0,
+        soft_max=2.0,
+    )
+    sequence_output: EnumProperty(
+        name="Output",
+        description="How the animations of a sequence are written",
+        items=[('ACTION', "Single Action", "Stitch the animations into one continuous action"),
+               ('NLA', "NLA Strips", "One action per prompt, laid out as NLA strips that blend into each other"),
+               ],
+    )
 
 
 # ------------------------------------------------------------------------
@@ -151,16 +331,106 @@ class T2MPreferences(bpy.types.AddonPreferences):
     # when defining this in a submodule of a python package.
     bl_idname = __name__
 
+    def update_library_directory(self, context):
+        _open_clip_library(self)
+
+    def update_skeleton_precision(self, context):
+        t2m_server_request_wrapper.skeleton_matrix_precision = self.skeleton_precision
+
+    def update_request_compression(self, context):
+        t2m_server_request_wrapper.client_manager.set_compress_requests(
+            self.is_request_compression_enabled)
+
+    def update_request_rate_limit(self, context):
+        t2m_server_request_wrapper.set_request_rate_limit(
+            self.request_rate_per_second, self.request_burst)
+
+    def update_cache_max_size(self, context):
+        cache = t2m_server_request_wrapper.response_cache
+        if cache:
+            cache.max_size_bytes = self.cache_max_size_mb * 1024 * 1024
+            cache.evict()
+
     api_key: StringProperty(
         name="API Key",
         description="API key used for making request to Text2Motion API server.",
         subtype='PASSWORD',
     )
+    library_directory: StringProperty(
+        name="Clip Library",
+        description="Directory of the offline clip library. Leave empty to use the add-on's user directory",
+        subtype='DIR_PATH',
+        update=update_library_directory,
+    )
+    cache_max_size_mb: IntProperty(
+        name="Response Cache Size (MB)",
+        description="Maximum disk space used to cache generated animations, least recently used responses are removed first",
+        default=512,
+        min=0,
+        update=update_cache_max_size,
+    )
+    skeleton_precision: IntProperty(
+        name="Skeleton Precision",
+        description="Decimal places of the skeleton rest matrices sent with every request. Fewer make smaller requests, changing it makes new cache entries",
+        default=DEFAULT_MATRIX_PRECISION,
+        min=3,
+        max=9,
+        update=update_skeleton_precision,
+    )
+    is_request_compression_enabled: BoolProperty(
+        name="Compress Requests",
+        description="Send request bodies gzip compressed. Turned off for the session when the server does not accept them",
+        default=True,
+        update=update_request_compression,
+    )
+    request_rate_per_second: FloatProperty(
+        name="Request Rate Limit",
+        description="Sustained requests per second sent by every generation together, 0 for no limit",
+        default=REQUEST_RATE_PER_SECOND,
+        min=0.0,
+        update=update_request_rate_limit,
+    )
+    request_burst: IntProperty(
+        name="Request Burst",
+        description="Requests that can start at once, e.g. a batch, before the rate limit applies",
+        default=REQUEST_BURST,
+        min=1,
+        update=update_request_rate_limit,
+    )
+    is_generated_frames_stored: BoolProperty(
+        name="Keep Generated Frames",
+        description="Store the generated frames in every generated action, so it can be saved to the clip library after its response left the cache. Adds about a megabyte per 30 seconds of animation to the .blend file",
+        default=False,
+    )
 
     def draw(self, context):
         layout = self.layout
         layout.operator("text2motion.open_developer_portal", icon="LINKED")
         layout.prop(self, "api_key")
+        layout.prop(self, "library_directory")
+        layout.prop(self, "is_generated_frames_stored")
+
+        col = layout.column(align=True)
+        col.prop(self, "cache_max_size_mb")
+        cache = t2m_server_request_wrapper.response_cache
+        if cache:
+            col.label(
+                text=f"Cache: {cache.get_size_bytes() / (1024 * 1024):.1f} MB, "
+                f"{cache.hits} hits, {cache.misses} misses this session")
+        col.operator("text2motion.clear_response_cache", icon="TRASH")
+
+        col = layout.column(align=True)
+        col.prop(self, "skeleton_precision")
+        col.prop(self, "is_request_compression_enabled")
+        col.prop(self, "request_rate_per_second")
+        row = col.row()
+        row.enabled = self.request_rate_per_second > 0
+        row.prop(self, "request_burst")
+
+        skeleton_cache = t2m_server_request_wrapper.skeleton_cache
+        layout.label(
+            text=f"Skeleton cache: {len(skeleton_cache)} rigs, "
+            f"{skeleton_cache.hits} hits, {skeleton_cache.misses} misses this session")
 
 # ------------------------------------------------------------------------
 #    Operators
@@ -180,6 +450,18 @@ class T2MSaveApiKeyOperator(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class T2MClearResponseCacheOperator(bpy.types.Operator):
+    """Remove all cached Text2Motion responses from disk"""
+    bl_idname = "text2motion.clear_response_cache"
+    bl_label = "Clear Response Cache"
+
+    def execute(self, context):
+        cache = t2m_server_request_wrapper.response_cache
+        if cache:
+            cache.clear()
+        return {'FINISHED'}
+
+
 class T2MOpenDeveloperPortalOperator(bpy.types.Operator):
     """Open Text2Motion Developer Portal in browser"""
     bl_idname = "text2motion.open_developer_portal"
@@ -210,121 +492,856 @@ class T2MOpenLicenseLinkOperator(bpy.types.Operator):
         return {'FINISHED'}
 
 
+GENERATION_JOB_NAME = "generate"
+BATCH_JOB_NAME = "batch"
+current_batch_items = []
+clip_library = None
+# enum items must stay referenced while Blender shows them
+_library_clip_items = []
+
+
+def get_generation_job():
+    return next((job for job in get_active_jobs() if job.name == GENERATION_JOB_NAME), None)
+
+
+def _get_requested_seconds(context) -> int:
+    scene_properties = context.scene.t2m_scene_properties
+    if scene_properties.is_auto_duration:
+        return 0
+    if scene_properties.duration_unit == 'seconds':
+        return scene_properties.seconds
+    return round(scene_properties.frames / context.scene.render.fps)
+
+
+def _report_api_exception(report, prompt: str, e: ApiException):
+    logger.error(
+        f"Failed to generate request for prompt: {prompt} \n"
+        f"HTTPStatus: {e.status} \n"
+        f"Reason: {e.reason} \n"
+        f"Body: {e.body}")
+
+    match e.status:
+        case (HTTPStatus.BAD_REQUEST |
+              HTTPStatus.NOT_FOUND |
+              HTTPStatus.METHOD_NOT_ALLOWED |
+              HTTPStatus.CONFLICT |
+              HTTPStatus.UNPROCESSABLE_ENTITY |
+              HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+              ):
+            logging.error(
+                "Text2Motion request failed due to issue on the client.")
+
+            error_message = ("Failed to generate request due to client error. \n"
+                             f'prompt: "{prompt}" \n'
+                             f'reason: "{e.reason}" \n'
+                             "Please contact support@text2motion.ai for help.")
+
+            report(
+                {"ERROR"}, error_message)
+        case HTTPStatus.UPGRADE_REQUIRED:
+            logging.error(
+                "Text2Motion request failed due to outdated package.")
+            error_message = 'Add-on update required. Please download the latest add-ons zip from Github and reinstall it.'
+            report(
+                {"ERROR"}, error_message)
+        case HTTPStatus.UNAUTHORIZED | HTTPStatus.FORBIDDEN:
+            logging.error(
+                "Text2Motion request failed due to auth issue.")
+            error_message = 'Invalid API Key. Please go to "Edit > Preferences > Add-ons > Text2Motion" and reconfigure your API key.'
+            report(
+                {"ERROR"}, error_message)
+        case HTTPStatus.TOO_MANY_REQUESTS:
+            logging.error(
+                "Text2Motion request failed due to throttling.")
+            error_message = "Request Throttled. Please wait for some time and try again later."
+            report(
+                {"ERROR"}, error_message)
+        case HTTPStatus.INTERNAL_SERVER_ERROR | HTTPStatus.BAD_GATEWAY | HTTPStatus.GATEWAY_TIMEOUT:
+            logging.error(
+                "Text2Motion request failed due to server issue.")
+            error_message = "Server has encountered an error. Please try again later."
+            report(
+                {"ERROR"}, error_message)
+        case HTTPStatus.SERVICE_UNAVAILABLE:
+            logging.error(
+                f"Text2Motion server maintenance in progress. Message: {e.body}")
+            error_message = "Text2Motion server maintenance in progress. Please try again later."
+            report(
+                {"ERROR"}, error_message)
+        case _:
+            logging.error(
+                "Text2Motion request failed due to unknown issue.")
+            error_message = "Text2Motion request failed due to unknown issue."
+            report(
+                {"ERROR"}, error_message)
+
+
+def _report_request_exception(report, prompt: str, e: Exception):
+    if isinstance(e, ApiException):
+        _report_api_exception(report, prompt, e)
+        return
+    logger.error(
+        "Exception when calling GenerateApi->generate_api_generate_post: %s\n" % e)
+    report(
+        {"ERROR"}, f"Failed to make Text2Motion request for prompt: {prompt}, {e}")
+
+
+def _validate_generate_context(operator, context) -> bool:
+    active_object = context.active_object
+    if not active_object or active_object.type != 'ARMATURE':
+        error_message = "Active object is not an armature, cannot generate animation"
+        logger.warning(error_message)
+        operator.report({"WARNING"}, error_message)
+        return False
+
+    if not bpy.app.online_access:
+        operator.report(
+            {"ERROR"}, "Cannot make server request without internet access permission")
+        return False
+    return True
+
+
+def _load_generated_frames(context, frames, target_object=None, action_name=None, timings=None,
+                           root_motion_origin=None, loader_options=None):
+    """Key `frames` with `loader_options`, the current panel options by default
+
+    Generations completing in the background pass the options captured when they were submitted,
+    their skeleton was sent with that bone map.
+    """
+    scene_properties = context.scene.t2m_scene_properties
+    if loader_options is None:
+        loader_options = _get_loader_options(scene_properties)
+    return load_frames(frames_str=frames,
+                       action_name=action_name or scene_properties.action_name,
+                       use_bulk_keyframe_insert=scene_properties.is_bulk_keyframe_insert_enabled,
+                       target_object=target_object,
+                       timings=timings,
+                       root_motion_origin=root_motion_origin,
+                       **loader_options)
+
+
+def _get_loader_options(scene_properties) -> dict:
+    match scene_properties.resample_mode:
+        case 'SCENE':
+            # the same rate the loader converts seconds to frames with
+            resample_fps = bpy.context.scene.render.fps
+        case 'CUSTOM':
+            resample_fps = scene_properties.resample_fps
+        case _:
+            resample_fps = None
+    addon_prefs = bpy.context.preferences.addons[__package__].preferences
+    return {
+        "root_motion_mode": scene_properties.root_motion_mode,
+        "reduce_keyframes": scene_properties.is_keyframe_reduction_enabled,
+        "angle_tolerance": scene_properties.keyframe_reduction_angle_tolerance,
+        "location_tolerance": scene_properties.keyframe_reduction_location_tolerance,
+        "resample_fps": resample_fps,
+        "bone_map_profile": get_bone_map_profile(scene_properties),
+        "store_frames": addon_prefs.is_generated_frames_stored,
+    }
+
+
+def _get_shared_targets(context, target_object) -> list:
+    if not context.scene.t2m_scene_properties.is_applied_to_matching_armatures:
+        return []
+    return get_matching_armatures(target_object, context.selected_objects)
+
+
+def _report_keyframe_reduction(report, timings: T2MGenerationTimings):
+    sample_count = timings.counters.get("sample_count", 0)
+    key_count = timings.counters.get("key_count", 0)
+    if key_count and sample_count != key_count:
+        report({"INFO"}, f"Reduced {sample_count} keyframes to {key_count} "
+               f"({sample_count / key_count:.1f}x smaller)")
+
+
 class T2MServerRequestOperator(bpy.types.Operator):
     """Make generate request to Text2Motion Server"""
     bl_idname = "text2motion.generate"
     bl_label = "Generate Animation"
 
     def execute(self, context):
-        active_object = bpy.context.active_object
-        if active_object.type != 'ARMATURE':
-            error_message = "Active object is not an armature, cannot generate animation"
-            logger.warning(error_message)
-            self.report({"WARNING"}, error_message)
+        if not _validate_generate_context(self, context):
             return {'CANCELLED'}
 
-        target_skeleton = get_target_skeleton(active_object)
-
         preferences = context.preferences
         addon_prefs = preferences.addons[__package__].preferences
         prompt = context.scene.t2m_scene_properties.prompt
         logger.debug(f"Prompt: {prompt}")
 
-        if not context.scene.t2m_scene_properties.is_auto_duration:
-            if context.scene.t2m_scene_properties.duration_unit == 'seconds':
-                seconds = context.scene.t2m_scene_properties.seconds
-            else:
-                seconds = round(context.scene.t2m_scene_properties.frames / bpy.context.scene.render.fps)
-        else:
-            seconds = 0
+        seconds = _get_requested_seconds(context)
+        model_version = context.scene.t2m_scene_properties.model_version
+        timings = T2MGenerationTimings(prompt, model_version)
+        target_skeleton = get_target_skeleton(
+            context.active_object, timings, get_bone_map_profile(context.scene.t2m_scene_properties))
+        shared_targets = _get_shared_targets(context, context.active_object)
 
         response = None
         try:
-            if not bpy.app.online_access:
-                self.report(
-                    {"ERROR"}, "Cannot make server request without internet access permission")
-                return {'CANCELLED'}
-            
             response = make_server_request(
-                prompt, 
-                target_skeleton, 
-                seconds, 
+                prompt,
+                target_skeleton,
+                seconds,
                 addon_prefs.api_key,
-                context.scene.t2m_scene_properties.model_version)
-        except ApiException as e:
-            logger.error(
-                f"Failed to generate request for prompt: {prompt} \n"
-                f"HTTPStatus: {e.status} \n"
-                f"Reason: {e.reason} \n"
-                f"Body: {e.body}")
-
-            match e.status:
-                case (HTTPStatus.BAD_REQUEST |
-                      HTTPStatus.NOT_FOUND |
-                      HTTPStatus.METHOD_NOT_ALLOWED |
-                      HTTPStatus.CONFLICT |
-                      HTTPStatus.UNPROCESSABLE_ENTITY |
-                      HTTPStatus.UNSUPPORTED_MEDIA_TYPE
-                      ):
-                    logging.error(
-                        "Text2Motion request failed due to issue on the client.")
-
-                    error_message = ("Failed to generate request due to client error. \n"
-                                     f'prompt: "{prompt}" \n'
-                                     f'reason: "{e.reason}" \n'
-                                     "Please contact support@text2motion.ai for help.")
+                model_version,
+                context.scene.t2m_scene_properties.is_cache_bypassed,
+                timings)
+        except Exception as e:
+            _report_request_exception(self.report, prompt, e)
 
-                    self.report(
-                        {"ERROR"}, error_message)
-                case HTTPStatus.UPGRADE_REQUIRED:
-                    logging.error(
-                        "Text2Motion request failed due to outdated package.")
-                    error_message = 'Add-on update required. Please download the latest add-ons zip from Github and reinstall it.'
-                    self.report(
-                        {"ERROR"}, error_message)
-                case HTTPStatus.UNAUTHORIZED | HTTPStatus.FORBIDDEN:
-                    logging.error(
-                        "Text2Motion request failed due to auth issue.")
-                    error_message = 'Invalid API Key. Please go to "Edit > Preferences > Add-ons > Text2Motion" and reconfigure your API key.'
-                    self.report(
-                        {"ERROR"}, error_message)
-                case HTTPStatus.TOO_MANY_REQUESTS:
-                    logging.error(
-                        "Text2Motion request failed due to throttling.")
-                    error_message = "Request Throttled. Please wait for some time and try again later."
-                    self.report(
-                        {"ERROR"}, error_message)
-                case HTTPStatus.INTERNAL_SERVER_ERROR | HTTPStatus.BAD_GATEWAY | HTTPStatus.GATEWAY_TIMEOUT:
-                    logging.error(
-                        "Text2Motion request failed due to server issue.")
-                    error_message = "Server has encountered an error. Please try again later."
-                    self.report(
-                        {"ERROR"}, error_message)
-                case HTTPStatus.SERVICE_UNAVAILABLE:
-                    logging.error(
-                        f"Text2Motion server maintenance in progress. Message: {e.body}")
-                    error_message = "Text2Motion server maintenance in progress. Please try again later."
-                    self.report(
-                        {"ERROR"}, error_message)
-                case _:
-                    logging.error(
-                        "Text2Motion request failed due to unknown issue.")
-                    error_message = "Text2Motion request failed due to unknown issue."
-                    self.report(
-                        {"ERROR"}, error_message)
+        if not response:
+            return {'CANCELLED'}
 
-        except Exception as e:
+        action = _load_generated_frames(context, response, timings=timings)
+        tag_generated_action(action, prompt, model_version, get_request_cache_key(
+            prompt, target_skeleton, seconds, model_version))
+        assign_shared_action(action, shared_targets, context.active_object)
+        log_generation_timings(timings)
+        _report_keyframe_reduction(self.report, timings)
+        return {'FINISHED'}
+
+
+class T2MServerRequestAsyncOperator(bpy.types.Operator):
+    """Make generate request to Text2Motion Server without blocking Blender. Press Esc to cancel"""
+    bl_idname = "text2motion.generate_async"
+    bl_label = "Generate Animation"
+
+    _timer = None
+    _job = None
+    _loader = None
+    _prompt = ""
+
+    @classmethod
+    def poll(cls, context):
+        return get_generation_job() is None
+
+    def invoke(self, context, event):
+        if not _validate_generate_context(self, context):
+            return {'CANCELLED'}
+
+        target_object = context.active_object
+
+        preferences = context.preferences
+        addon_prefs = preferences.addons[__package__].preferences
+        prompt = context.scene.t2m_scene_properties.prompt
+        logger.debug(f"Prompt: {prompt}")
+        self._prompt = prompt
+        seconds = _get_requested_seconds(context)
+        model_version = context.scene.t2m_scene_properties.model_version
+        timings = T2MGenerationTimings(prompt, model_version)
+        # the frames must be applied with the bone map the skeleton was sent with
+        loader_options = _get_loader_options(context.scene.t2m_scene_properties)
+        target_skeleton = get_target_skeleton(
+            target_object, timings, loader_options["bone_map_profile"])
+        shared_target_names = [
+            obj.name for obj in _get_shared_targets(context, target_object)]
+        # objects are looked up by name, a struct held across undo or deletion is invalid
+        target_object_name = target_object.name
+        cache_key = get_request_cache_key(
+            prompt, target_skeleton, seconds, model_version)
+
+        def on_success(job, response):
+            if not response:
+                return
+            # the object may have been deleted while the request was in flight
+            target_object = bpy.data.objects.get(target_object_name)
+            if not target_object:
+                logger.warning("Target armature no longer exists, discarding generated animation")
+                return
+            scene_properties = bpy.context.scene.t2m_scene_properties
+            loader = T2MFramesLoader(
+                action_name=scene_properties.action_name,
+                use_bulk_keyframe_insert=scene_properties.is_bulk_keyframe_insert_enabled,
+                target_object=target_object,
+                timings=timings,
+                **loader_options)
+            tag_generated_action(loader.action, prompt, model_version, cache_key)
+            loader.push_chunk(response)
+            loader.finish_stream()
+
+            def on_finished(loader, error):
+                # the shared targets may need their own copy of the action, made once it is keyed
+                target_object = bpy.data.objects.get(target_object_name)
+                if error is None and target_object:
+                    assign_shared_action(loader.action, [
+                        bpy.data.objects[name] for name in shared_target_names
+                        if name in bpy.data.objects], target_object)
+                log_generation_timings(timings)
+
+            # key a few bones per timer tick so the viewport keeps updating on long clips
+            load_frames_incrementally(loader, on_finished=on_finished)
+            # Esc keeps cancelling until every bone is keyed
+            self._loader = loader
+
+        self._job = submit_job(
+            GENERATION_JOB_NAME,
+            make_server_request,
+            prompt,
+            target_skeleton,
+            seconds,
+            addon_prefs.api_key,
+            model_version,
+            context.scene.t2m_scene_properties.is_cache_bypassed,
+            timings,
+            on_success=on_success)
+
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(
+            POLL_INTERVAL_SECONDS, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({"INFO"}, "Text2Motion generation cancelled")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER' or not self._job.is_finished:
+            return {'PASS_THROUGH'}
+        if self._loader and self._loader in active_loaders:
+            return {'PASS_THROUGH'}
+
+        self._remove_timer(context)
+        if self._job.error:
+            _report_request_exception(self.report, self._prompt, self._job.error)
+            return {'CANCELLED'}
+
+        if context.active_object and context.active_object.type == 'ARMATURE':
+            bpy.ops.object.mode_set(mode='POSE')
+        logger.info(
+            f"Text2Motion generation finished in {self._job.elapsed_seconds:.1f}s")
+        return {'FINISHED'}
+
+    def cancel(self, context):
+        if self._job and not self._job.is_finished:
+            self._job.cancel()
+        if self._loader:
+            stop_incremental_load(self._loader)
+            self._loader = None
+        self._remove_timer(context)
+
+    def _remove_timer(self, context):
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+
+
+def _read_batch_prompts(report, context) -> list[str] | None:
+    scene_properties = context.scene.t2m_scene_properties
+    if scene_properties.batch_prompt_source == 'TEXT':
+        if not scene_properties.batch_prompt_text:
+            report({"WARNING"}, "Select a text datablock with the prompts")
+            return None
+        prompts = read_prompts(scene_properties.batch_prompt_text.as_string())
+    else:
+        path = bpy.path.abspath(scene_properties.batch_prompt_file)
+        try:
+            with open(path, encoding="utf-8") as prompt_file:
+                prompts = read_prompts(prompt_file.read())
+        except OSError as e:
+            report({"ERROR"}, f"Failed to read prompts from {path}: {e}")
+            return None
+
+    if not prompts:
+        report({"WARNING"}, "No prompts to generate")
+    return prompts
+
+
+class T2MBatchGenerateOperator(bpy.types.Operator):
+    """Generate an animation for every prompt on every selected armature. Press Esc to cancel"""
+    bl_idname = "text2motion.generate_batch"
+    bl_label = "Generate Batch"
+
+    _timer = None
+    _executor = None
+
+    @classmethod
+    def poll(cls, context):
+        return not current_batch_items
+
+    def invoke(self, context, event):
+        global current_batch_items
+        if not bpy.app.online_access:
+            self.report(
+                {"ERROR"}, "Cannot make server request without internet access permission")
+            return {'CANCELLED'}
+
+        prompts = _read_batch_prompts(self.report, context)
+        if not prompts:
+            return {'CANCELLED'}
+
+        target_objects = [
+            obj for obj in context.selected_objects if obj.type == 'ARMATURE']
+        if not target_objects:
+            self.report({"WARNING"}, "Select at least one armature")
+            return {'CANCELLED'}
+
+        preferences = context.preferences
+        addon_prefs = preferences.addons[__package__].preferences
+        scene_properties = context.scene.t2m_scene_properties
+        seconds = _get_requested_seconds(context)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=scene_properties.batch_concurrency, thread_name_prefix="text2motion_batch")
+        if scene_properties.is_applied_to_matching_armatures:
+            # one request per prompt for every group of armatures with the same skeleton
+            target_groups = group_armatures_by_skeleton(target_objects)
+        else:
+            target_groups = [[target_object] for target_object in target_objects]
+
+        loader_options = _get_loader_options(scene_properties)
+        items = []
+        for target_object, *shared_targets in target_groups:
+            skeleton_timings = T2MGenerationTimings()
+            target_skeleton = get_target_skeleton(
+                target_object, skeleton_timings, loader_options["bone_map_profile"])
+            for prompt_index, prompt in enumerate(prompts):
+                item = T2MBatchItem(
+                    prompt,
+                    target_object.name,
+                    make_action_name(scene_properties.action_name, target_object.name, prompt_index))
+                item.shared_object_names = [obj.name for obj in shared_targets]
+                item.loader_options = loader_options
+                # the skeleton is shared by every prompt of the armature, each item reports it
+                item.timings = T2MGenerationTimings(prompt, scene_properties.model_version)
+                item.timings.spans.update(skeleton_timings.spans)
+                item.timings.counters.update(skeleton_timings.counters)
+                item.cache_key = get_request_cache_key(
+                    prompt, target_skeleton, seconds, scene_properties.model_version)
+                item.job = submit_job(
+                    BATCH_JOB_NAME,
+                    make_server_request,
+                    prompt,
+                    target_skeleton,
+                    seconds,
+                    addon_prefs.api_key,
+                    scene_properties.model_version,
+                    scene_properties.is_cache_bypassed,
+                    item.timings,
+                    on_success=self._make_on_success(item, scene_properties.model_version),
+                    executor=self._executor)
+                items.append(item)
+        current_batch_items = items
+        logger.info(
+            f"Generating batch of {len(items)} animations, {scene_properties.batch_concurrency} at a time")
+
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(
+            POLL_INTERVAL_SECONDS, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    @staticmethod
+    def _make_on_success(item: T2MBatchItem, model_version: str):
+        def on_success(job, response):
+            target_object = bpy.data.objects.get(item.target_object_name)
+            if not response or not target_object:
+                return
+            action = _load_generated_frames(
+                bpy.context, response, target_object=target_object, action_name=item.action_name,
+                timings=item.timings, loader_options=item.loader_options)
+            # keep every action of the batch, only the last one stays assigned to the armature
+            action.use_fake_user = True
+            tag_generated_action(action, item.prompt, model_version, item.cache_key)
+            assign_shared_action(action, [
+                bpy.data.objects[name] for name in item.shared_object_names if name in bpy.data.objects],
+                target_object)
+            log_generation_timings(item.timings)
+            logger.info(
+                f"Generated {action.name} for prompt: {item.prompt} in {job.elapsed_seconds:.1f}s")
+        return on_success
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({"INFO"}, "Text2Motion batch generation cancelled")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER' or not all(item.job.is_finished for item in current_batch_items):
+            return {'PASS_THROUGH'}
+
+        failed_items = [item for item in current_batch_items if item.job.error]
+        for item in failed_items:
             logger.error(
-                "Exception when calling GenerateApi->generate_api_generate_post: %s\n" % e)
+                f"Batch generation failed for {item.action_name}, prompt: {item.prompt}: {item.job.error}")
+        if failed_items:
             self.report(
-                {"ERROR"}, f"Failed to make Text2Motion request for prompt: {prompt}, {e}")
+                {"WARNING"},
+                f"Batch finished, {len(failed_items)} of {len(current_batch_items)} generations failed. "
+                "See the system console for details.")
+        else:
+            self.report(
+                {"INFO"}, f"Batch finished, generated {len(current_batch_items)} animations")
+        self._finish(context)
+        return {'FINISHED'}
 
-        if not response:
+    def cancel(self, context):
+        for item in current_batch_items:
+            if not item.job.is_finished:
+                item.job.cancel()
+        self._finish(context)
+
+    def _finish(self, context):
+        global current_batch_items
+        current_batch_items = []
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _request_frames(*args):
+    # decoded on the worker thread, the frames are only stitched once every prompt is generated
+    response = make_server_request(*args)
+    return decode_frames(response) if response else None
+
+
+class T2MSequenceGenerateOperator(bpy.types.Operator):
+    """Generate the prompts one after the other as a single animation of the active armature. Press Esc to cancel"""
+    bl_idname = "text2motion.generate_sequence"
+    bl_label = "Generate Sequence"
+
+    _timer = None
+    _executor = None
+    _target_object_name = ""
+    _shared_object_names = ()
+    _timings = None
+    _loader_options = None
+    _blend_seconds = DEFAULT_BLEND_SECONDS
+    _sequence_output = 'ACTION'
+    _model_version = ""
+
+    @classmethod
+    def poll(cls, context):
+        return not current_batch_items
+
+    def invoke(self, context, event):
+        global current_batch_items
+        if not _validate_generate_context(self, context):
+            return {'CANCELLED'}
+
+        prompts = _read_batch_prompts(self.report, context)
+        if not prompts:
+            return {'CANCELLED'}
+
+        preferences = context.preferences
+        addon_prefs = preferences.addons[__package__].preferences
+        scene_properties = context.scene.t2m_scene_properties
+        seconds = _get_requested_seconds(context)
+        target_object = context.active_object
+        self._target_object_name = target_object.name
+        self._shared_object_names = [
+            obj.name for obj in _get_shared_targets(context, target_object)]
+        # every prompt reports its own request, the whole sequence adds them up with the
+        # skeleton, stitching and keying
+        self._timings = T2MGenerationTimings("; ".join(prompts), scene_properties.model_version)
+        # the sequence is written with the options it was submitted with
+        self._loader_options = _get_loader_options(scene_properties)
+        self._blend_seconds = scene_properties.sequence_blend_seconds
+        self._sequence_output = scene_properties.sequence_output
+        self._model_version = scene_properties.model_version
+        target_skeleton = get_target_skeleton(
+            target_object, self._timings, self._loader_options["bone_map_profile"])
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=scene_properties.batch_concurrency, thread_name_prefix="text2motion_sequence")
+        items = []
+        for prompt_index, prompt in enumerate(prompts):
+            item = T2MBatchItem(
+                prompt,
+                target_object.name,
+                make_action_name(scene_properties.action_name, target_object.name, prompt_index))
+            item.cache_key = get_request_cache_key(
+                prompt, target_skeleton, seconds, scene_properties.model_version)
+            item.timings = T2MGenerationTimings(prompt, scene_properties.model_version)
+            item.job = submit_job(
+                BATCH_JOB_NAME,
+                _request_frames,
+                prompt,
+                target_skeleton,
+                seconds,
+                addon_prefs.api_key,
+                scene_properties.model_version,
+                scene_properties.is_cache_bypassed,
+                item.timings,
+                on_success=self._make_on_success(item),
+                executor=self._executor)
+            items.append(item)
+        current_batch_items = items
+        logger.info(
+            f"Generating sequence of {len(items)} animations, {scene_properties.batch_concurrency} at a time")
+
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(
+            POLL_INTERVAL_SECONDS, window=context.window)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    @staticmethod
+    def _make_on_success(item: T2MBatchItem):
+        def on_success(job, frames):
+            item.frames = frames
+            log_generation_timings(item.timings)
+            logger.info(f"Generated prompt: {item.prompt} in {job.elapsed_seconds:.1f}s")
+        return on_success
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({"INFO"}, "Text2Motion sequence generation cancelled")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER' or not all(item.job.is_finished for item in current_batch_items):
+            return {'PASS_THROUGH'}
+
+        # a sequence with a gap would not continue, so nothing is written unless every prompt worked
+        failed_items = [item for item in current_batch_items if item.job.error or not item.frames]
+        for item in failed_items:
+            logger.error(f"Sequence generation failed for prompt: {item.prompt}: {item.job.error}")
+        target_object = bpy.data.objects.get(self._target_object_name)
+        if failed_items or not target_object:
+            self.report(
+                {"ERROR"},
+                f"Sequence cancelled, {len(failed_items)} of {len(current_batch_items)} generations failed. "
+                "See the system console for details." if failed_items else
+                "Target armature no longer exists, discarding generated sequence")
+            self._finish(context)
             return {'CANCELLED'}
 
-        load_frames(frames_str=response,
-                    action_name=context.scene.t2m_scene_properties.action_name,
-                    apply_root_motion=context.scene.t2m_scene_properties.is_root_motion_enabled)
+        self._write_sequence(context, target_object)
+        self.report({"INFO"}, f"Sequence finished, joined {len(current_batch_items)} animations")
+        self._finish(context)
+        return {'FINISHED'}
+
+    def _write_sequence(self, context, target_object):
+        timings = self._timings
+        for item in current_batch_items:
+            timings.merge(item.timings)
+        with timings.span("stitch"):
+            sequence = T2MSequence([item.frames for item in current_batch_items],
+                                   context.scene.render.fps, self._blend_seconds)
+        shared_targets = [
+            bpy.data.objects[name] for name in self._shared_object_names if name in bpy.data.objects]
+
+        if self._sequence_output == 'NLA':
+            _add_sequence_strips(context, sequence, current_batch_items,
+                                 [target_object, *shared_targets], timings, self._model_version,
+                                 self._loader_options)
+        else:
+            with timings.span("stitch"):
+                frames = sequence.stitch()
+            # the stitched frames are not a server response, so there is no cache key to tag and
+            # they are kept with the action for the clip library
+            action = _load_generated_frames(
+                context, frames, target_object=target_object, timings=timings,
+                loader_options={**self._loader_options, "store_frames": True})
+            action["t2m_prompt"] = frames.prompt
+            action["t2m_model_version"] = self._model_version
+            assign_shared_action(action, shared_targets, target_object)
+        log_generation_timings(timings)
+
+    def cancel(self, context):
+        for item in current_batch_items:
+            if not item.job.is_finished:
+                item.job.cancel()
+        self._finish(context)
+
+    def _finish(self, context):
+        global current_batch_items
+        current_batch_items = []
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _add_sequence_strips(context, sequence: T2MSequence, items, target_objects, timings,
+                         model_version: str, loader_options=None):
+    """Load every clip of `sequence` into its own action and lay them out as NLA strips
+
+    Consecutive strips alternate between two tracks so they can overlap. Only the strips of the
+    upper track blend in and out, over the strip below them.
+    """
+    target_object = target_objects[0]
+    root_motion_origin = sequence.get_root_origin()
+    actions = []
+    for item, clip in zip(items, sequence.clips):
+        action = _load_generated_frames(
+            context, clip, target_object=target_object, action_name=item.action_name,
+            timings=timings, root_motion_origin=root_motion_origin, loader_options=loader_options)
+        action.use_fake_user = True
+        tag_generated_action(action, item.prompt, model_version, item.cache_key)
+        actions.append(action)
+
+    blend_frames = sequence.blend_frames + [0]
+    for obj in target_objects:
+        animation_data = obj.animation_data_create()
+        animation_data.action = None
+        tracks = [animation_data.nla_tracks.new() for _ in range(2)]
+        tracks[0].name = f"{actions[0].name} Sequence"
+        tracks[1].name = f"{actions[0].name} Sequence Blend"
+        for index, (action, start_frame) in enumerate(zip(actions, sequence.start_frames)):
+            action = get_object_action(action, target_object, obj)
+            strip = tracks[index % 2].strips.new(action.name, start_frame, action)
+            strip.extrapolation = 'NOTHING'
+            if index % 2:
+                strip.blend_in = blend_frames[index]
+                strip.blend_out = blend_frames[index + 1]
+    context.scene.frame_start = 0
+    context.scene.frame_end = max(0, sequence.frame_count - 1)
+
+
+def _open_bone_map_library():
+    global bone_map_library
+    directory = bpy.utils.extension_path_user(__package__, path="bone_maps", create=True)
+    try:
+        bone_map_library = T2MBoneMapLibrary(directory)
+    except OSError as e:
+        logger.error(f"Failed to open bone map profiles {directory}: {e}")
+        bone_map_library = None
+
+
+class T2MSaveBoneMapProfileOperator(bpy.types.Operator):
+    """Save a bone map profile listing every bone of the active armature, edit the file to map the bones"""
+    bl_idname = "text2motion.save_bone_map_profile"
+    bl_label = "New Profile from Armature"
+
+    @classmethod
+    def poll(cls, context):
+        active_object = context.active_object
+        return bone_map_library is not None and active_object and active_object.type == 'ARMATURE'
+
+    def execute(self, context):
+        armature = context.active_object.data
+        profile = make_profile_template(
+            armature.name, [bone.name for bone in armature.bones])
+        try:
+            profile_id = bone_map_library.save_profile(profile)
+        except OSError as e:
+            self.report({"ERROR"}, f"Failed to save bone map profile: {e}")
+            return {'CANCELLED'}
+        context.scene.t2m_scene_properties.bone_map_profile_id = profile_id
+        self.report(
+            {"INFO"}, f"Saved bone map profile {profile_id} to {bone_map_library.directory}")
+        return {'FINISHED'}
+
+
+def _open_clip_library(addon_prefs):
+    global clip_library
+    directory = bpy.path.abspath(addon_prefs.library_directory) if addon_prefs.library_directory else \
+        bpy.utils.extension_path_user(__package__, path="library", create=True)
+    try:
+        clip_library = T2MClipLibrary(directory)
+    except OSError as e:
+        logger.error(f"Failed to open clip library {directory}: {e}")
+        clip_library = None
+
+
+def _get_library_clip_items(self, context):
+    global _library_clip_items
+    if not clip_library:
+        _library_clip_items = []
+        return _library_clip_items
+    _library_clip_items = [
+        (entry.hash, entry.name,
+         f"{entry.prompt} ({entry.duration:.1f}s, {entry.bone_count} bones, {entry.model_version})")
+        for entry in clip_library.search(context.scene.t2m_scene_properties.library_search)
+    ]
+    return _library_clip_items
+
+
+class T2MLibrarySaveClipOperator(bpy.types.Operator):
+    """Save the generated frames of the active action to the offline clip library"""
+    bl_idname = "text2motion.library_save_clip"
+    bl_label = "Save to Library"
+
+    @classmethod
+    def poll(cls, context):
+        active_object = context.active_object
+        if not (clip_library is not None and active_object and active_object.animation_data and
+                active_object.animation_data.action):
+            return False
+        action = active_object.animation_data.action
+        return (GENERATED_FRAMES_PROPERTY in action or "t2m_cache_key" in action or
+                "t2m_library_hash" in action)
+
+    def execute(self, context):
+        action = context.active_object.animation_data.action
+        entry = clip_library.get_entry(action.get("t2m_library_hash", ""))
+        if entry:
+            self.report({"INFO"}, f"{action.name} is already in the clip library as {entry.name}")
+            return {'FINISHED'}
+
+        try:
+            frames = get_generated_frames(action)
+            if frames is None:
+                # only the cache key is kept with the action unless Keep Generated Frames is set
+                response = get_cached_response(action["t2m_cache_key"])
+                if response is None:
+                    self.report(
+                        {"ERROR"}, f"The generated frames of {action.name} are no longer in the response cache, "
+                        "enable Keep Generated Frames in the preferences to keep them with the action")
+                    return {'CANCELLED'}
+                frames = decode_frames(response)
+
+            entry = clip_library.add_clip(
+                frames,
+                action.name,
+                prompt=action.get("t2m_prompt"),
+                model_version=action.get("t2m_model_version", ""))
+        except (OSError, ValueError) as e:
+            self.report({"ERROR"}, f"Failed to save {action.name} to the clip library: {e}")
+            return {'CANCELLED'}
+
+        self.report({"INFO"}, f"Saved {entry.name} to the clip library")
+        return {'FINISHED'}
+
+
+class T2MLibraryLoadClipOperator(bpy.types.Operator):
+    """Load a clip from the offline clip library onto the active armature"""
+    bl_idname = "text2motion.library_load_clip"
+    bl_label = "Load from Library"
+    bl_property = "clip"
+
+    clip: EnumProperty(
+        name="Clip",
+        items=_get_library_clip_items,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        active_object = context.active_object
+        return clip_library is not None and active_object and active_object.type == 'ARMATURE'
+
+    def invoke(self, context, event):
+        context.window_manager.invoke_search_popup(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        entry = clip_library.get_entry(self.clip)
+        if not entry:
+            self.report({"ERROR"}, "Clip not found in the library")
+            return {'CANCELLED'}
+
+        try:
+            frames = clip_library.read_clip(entry)
+        except (OSError, ValueError) as e:
+            self.report({"ERROR"}, f"Failed to read {entry.name} from the clip library: {e}")
+            return {'CANCELLED'}
+
+        # the frames stay in the library, the action only refers to them
+        loader_options = {
+            **_get_loader_options(context.scene.t2m_scene_properties), "store_frames": False}
+        action = _load_generated_frames(
+            context, frames, action_name=entry.name, loader_options=loader_options)
+        action["t2m_prompt"] = entry.prompt
+        action["t2m_model_version"] = entry.model_version
+        action["t2m_library_hash"] = entry.hash
         return {'FINISHED'}
 
 
@@ -399,7 +1416,19 @@ class OBJECT_PT_T2MPanel(T2MPanelBase, bpy.types.Panel):
             return
         col = layout.column(align=True)
         col.prop(context.scene.t2m_scene_properties, "prompt")
-        col.operator("text2motion.generate", icon="RENDER_ANIMATION")
+        generation_job = get_generation_job()
+        if generation_job:
+            col.label(
+                text=f"Generating... {generation_job.elapsed_seconds:.1f}s (Esc to cancel)",
+                icon="SORTTIME")
+        else:
+            col.operator("text2motion.generate_async", icon="RENDER_ANIMATION")
+
+        for loader in active_loaders:
+            col.progress(
+                factor=loader.progress,
+                type='BAR',
+                text=f"Applying {loader.action.name} {loader.progress:.0%} (Esc to cancel)")
 
 
 class OBJECT_PT_T2MAdvancedOptionsPanel(T2MPanelBase, bpy.types.Panel):
@@ -411,8 +1440,98 @@ class OBJECT_PT_T2MAdvancedOptionsPanel(T2MPanelBase, bpy.types.Panel):
         layout = self.layout
         col = layout.column(align=True)
         col.prop(context.scene.t2m_scene_properties, "action_name")
-        col.prop(context.scene.t2m_scene_properties, "is_root_motion_enabled")
+        col.prop(context.scene.t2m_scene_properties, "root_motion_mode")
+        col.prop(context.scene.t2m_scene_properties, "is_applied_to_matching_armatures")
+        row = col.row(align=True)
+        row.prop(context.scene.t2m_scene_properties, "bone_map_profile")
+        row.operator("text2motion.save_bone_map_profile", text="", icon="ADD")
+        if bone_map_library:
+            row.operator("wm.path_open", text="", icon="FILEBROWSER").filepath = bone_map_library.directory
         col.prop(context.scene.t2m_scene_properties, "model_version")
+        col.prop(context.scene.t2m_scene_properties, "is_cache_bypassed")
+        col.prop(context.scene.t2m_scene_properties, "is_bulk_keyframe_insert_enabled")
+
+        scene_properties = context.scene.t2m_scene_properties
+        col = layout.column(align=True)
+        col.prop(scene_properties, "resample_mode")
+        if scene_properties.resample_mode == 'CUSTOM':
+            col.prop(scene_properties, "resample_fps")
+
+        col = layout.column(align=True)
+        col.prop(scene_properties, "is_keyframe_reduction_enabled")
+        sub_col = col.column(align=True)
+        sub_col.enabled = scene_properties.is_keyframe_reduction_enabled
+        sub_col.prop(scene_properties, "keyframe_reduction_angle_tolerance")
+        sub_col.prop(scene_properties, "keyframe_reduction_location_tolerance")
+        if t2m_timing.last_generation_timings:
+            counters = t2m_timing.last_generation_timings.to_dict()["counters"]
+            if counters.get("key_count"):
+                col.label(
+                    text=f"Last generation: {counters['key_count']} of {counters['sample_count']} keyframes, "
+                    f"{counters['sample_count'] / counters['key_count']:.1f}x compression")
+
+        col = layout.column(align=True)
+        col.prop(context.scene.t2m_scene_properties, "is_timing_breakdown_shown")
+
+        timings = t2m_timing.last_generation_timings
+        if context.scene.t2m_scene_properties.is_timing_breakdown_shown and timings:
+            timings = timings.to_dict()
+            box = layout.box()
+            box.label(text=f"Last generation: {timings['total_ms']:.0f} ms", icon="TIME")
+            for name, milliseconds in timings["spans_ms"].items():
+                box.label(text=f"{name}: {milliseconds:.1f} ms")
+            for name, value in timings["counters"].items():
+                box.label(text=f"{name}: {value}")
+
+class OBJECT_PT_T2MBatchGenerationPanel(T2MPanelBase, bpy.types.Panel):
+    bl_parent_id = "OBJECT_PT_T2MPanel"
+    bl_label = "Batch Generation"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        scene_properties = context.scene.t2m_scene_properties
+        col = layout.column(align=True)
+        col.prop(scene_properties, "batch_prompt_source", expand=True)
+        if scene_properties.batch_prompt_source == 'TEXT':
+            col.prop(scene_properties, "batch_prompt_text")
+        else:
+            col.prop(scene_properties, "batch_prompt_file")
+        col.prop(scene_properties, "batch_concurrency")
+        col.separator()
+
+        if current_batch_items:
+            finished_count = sum(
+                1 for item in current_batch_items if item.job.is_finished)
+            col.label(
+                text=f"Generated {finished_count} of {len(current_batch_items)} (Esc to cancel)",
+                icon="SORTTIME")
+        else:
+            col.label(text="Prompts are generated for every selected armature")
+            col.operator("text2motion.generate_batch", icon="RENDER_ANIMATION")
+            col.separator()
+            col.label(text="Or joined into one animation of the active armature")
+            col.prop(scene_properties, "sequence_output", expand=True)
+            col.prop(scene_properties, "sequence_blend_seconds")
+            col.operator("text2motion.generate_sequence", icon="SEQUENCE")
+
+
+class OBJECT_PT_T2MClipLibraryPanel(T2MPanelBase, bpy.types.Panel):
+    bl_parent_id = "OBJECT_PT_T2MPanel"
+    bl_label = "Clip Library"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column(align=True)
+        if not clip_library:
+            col.label(text="Clip library is not available", icon="ERROR")
+            return
+        col.label(text=f"{len(clip_library.get_entries())} clips in the library")
+        col.prop(context.scene.t2m_scene_properties, "library_search", icon="VIEWZOOM")
+        col.operator("text2motion.library_load_clip", icon="IMPORT")
+        col.operator("text2motion.library_save_clip", icon="EXPORT")
+
 
 class OBJECT_PT_T2MAnimationDurationOptionsPanel(T2MPanelBase, bpy.types.Panel):
     bl_parent_id = "OBJECT_PT_T2MAdvancedOptionsPanel"
@@ -457,9 +1576,18 @@ classes = (
     OBJECT_PT_T2MPanel,
     OBJECT_PT_T2MAdvancedOptionsPanel,
     OBJECT_PT_T2MAnimationDurationOptionsPanel,
+    OBJECT_PT_T2MBatchGenerationPanel,
+    OBJECT_PT_T2MClipLibraryPanel,
     OBJECT_PT_T2MLicenseInfoPanel,
     T2MServerRequestOperator,
+    T2MServerRequestAsyncOperator,
+    T2MBatchGenerateOperator,
+    T2MSequenceGenerateOperator,
+    T2MLibrarySaveClipOperator,
+    T2MLibraryLoadClipOperator,
+    T2MSaveBoneMapProfileOperator,
     T2MSaveApiKeyOperator,
+    T2MClearResponseCacheOperator,
     T2MOpenDeveloperPortalOperator,
     T2MOpenLicenseLinkOperator,
     T2MSceneProperties,
@@ -473,8 +1601,23 @@ def register():
     bpy.types.Scene.t2m_scene_properties = PointerProperty(
         type=T2MSceneProperties)
 
+    addon_prefs = bpy.context.preferences.addons[__package__].preferences
+    set_response_cache(T2MResponseCache(
+        bpy.utils.extension_path_user(__package__, path="response_cache", create=True),
+        addon_prefs.cache_max_size_mb * 1024 * 1024))
+    addon_prefs.update_skeleton_precision(bpy.context)
+    addon_prefs.update_request_compression(bpy.context)
+    addon_prefs.update_request_rate_limit(bpy.context)
+    _open_clip_library(addon_prefs)
+    _open_bone_map_library()
+
 
 def unregister():
+    t2m_jobs.shutdown()
+    stop_incremental_loads()
+    set_response_cache(None)
+    t2m_server_request_wrapper.skeleton_cache.clear()
+    t2m_server_request_wrapper.client_manager.close()
     for cls in classes:
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.t2m_scene_properties
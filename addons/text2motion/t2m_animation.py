@@ -1,8 +1,11 @@
-from typing import Dict, List
-
+import numpy
 from pydantic import BaseModel, Field
 
 T2M_SAVE_FILE_VERSION_1_0 = "1.0"
+T2M_SAVE_FILE_VERSION_2_0 = "2.0"
+
+ROTATION_WIDTH = 4
+POSITION_WIDTH = 3
 
 
 class T2MSaveFile(BaseModel):
@@ -11,11 +14,110 @@ class T2MSaveFile(BaseModel):
 
 
 class T2MTrack(BaseModel):
-    rotation: Dict[str, List[float]] = Field(default_factory=dict)
-    position: Dict[str, List[float]] = Field(default_factory=dict)
+    rotation: dict[str, list[float]] = Field(default_factory=dict)
+    position: dict[str, list[float]] = Field(default_factory=dict)
 
 
 class T2MFrames(BaseModel):
     duration: float
-    bones: Dict[str, T2MTrack]
+    bones: dict[str, T2MTrack]
     prompt: str = None
+
+
+def _samples_to_arrays(samples: dict[str, list[float]], width: int):
+    times = numpy.asarray(list(samples.keys()), dtype=numpy.float64)
+    # converted without a dtype first, so strings, nulls and nested objects are not coerced
+    values = numpy.asarray(list(samples.values()))
+    if values.size and values.dtype.kind not in "iuf":
+        raise ValueError(f"Expected numbers, got {values.dtype} samples")
+    values = values.astype(numpy.float64).reshape(-1, width)
+    order = numpy.argsort(times, kind="stable")
+    return times[order], values[order]
+
+
+def _arrays_to_samples(times: numpy.ndarray, values: numpy.ndarray) -> dict[str, list[float]]:
+    return {repr(time): value for time, value in zip(times.tolist(), values.tolist())}
+
+
+class T2MTrackArrays:
+    """Columnar form of a T2MTrack
+
+    Sorted float64 time arrays in seconds with contiguous (N, 4) xyzw rotation and (M, 3)
+    position arrays, instead of a dict entry and a list per sample.
+    """
+
+    def __init__(
+            self,
+            rotation_times: numpy.ndarray,
+            rotation_values: numpy.ndarray,
+            position_times: numpy.ndarray,
+            position_values: numpy.ndarray):
+        self.rotation_times = rotation_times
+        self.rotation_values = rotation_values
+        self.position_times = position_times
+        self.position_values = position_values
+
+    @classmethod
+    def from_dict(cls, track: dict) -> "T2MTrackArrays":
+        """Convert a decoded T2MTrack JSON object
+
+        The types and shapes of the samples are validated, anything malformed raises ValueError.
+        """
+        if not isinstance(track, dict):
+            raise ValueError(f"Expected a T2MTrack object, got {type(track).__name__}")  # noqa: TRY004
+        samples = {}
+        for name, width in (("rotation", ROTATION_WIDTH), ("position", POSITION_WIDTH)):
+            track_samples = track.get(name, {})
+            if not isinstance(track_samples, dict):
+                raise ValueError(f"Expected {name} to map times to lists of numbers")  # noqa: TRY004
+            try:
+                samples[name] = _samples_to_arrays(track_samples, width)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid {name} samples: {e}") from None
+        return cls(*samples["rotation"], *samples["position"])
+
+    @classmethod
+    def from_track(cls, track: T2MTrack) -> "T2MTrackArrays":
+        return cls.from_dict({"rotation": track.rotation, "position": track.position})
+
+    def to_track(self) -> T2MTrack:
+        return T2MTrack(
+            rotation=_arrays_to_samples(self.rotation_times, self.rotation_values),
+            position=_arrays_to_samples(self.position_times, self.position_values),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return (self.rotation_times.nbytes + self.rotation_values.nbytes +
+                self.position_times.nbytes + self.position_values.nbytes)
+
+
+class T2MFramesArrays:
+    """Columnar form of T2MFrames, converted once from the wire JSON"""
+
+    def __init__(
+            self,
+            duration: float,
+            bones: dict[str, T2MTrackArrays],
+            prompt: str | None = None):
+        self.duration = duration
+        self.bones = bones
+        self.prompt = prompt
+
+    @classmethod
+    def from_frames(cls, frames: T2MFrames) -> "T2MFramesArrays":
+        return cls(
+            frames.duration,
+            {bone_name: T2MTrackArrays.from_track(track)
+             for bone_name, track in frames.bones.items()},
+            frames.prompt)
+
+    def to_frames(self) -> T2MFrames:
+        return T2MFrames(
+            duration=self.duration,
+            bones={bone_name: track.to_track()
+                   for bone_name, track in self.bones.items()},
+            prompt=self.prompt)
+
+    def to_json(self) -> str:
+        return self.to_frames().model_dump_json()
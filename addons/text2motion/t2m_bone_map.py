@@ -0,0 +1,205 @@
+"""Mapping between Text2Motion bone names and the bones of an armature
+
+Text2Motion names bones like Mixamo without the namespace colon, e.g. "mixamorigHips". A
+profile maps those names to the bones of a rig, and is compiled once per armature into a
+T2MBoneMap, so the names sent with the skeleton and the tracks that come back resolve to bone
+indices without string handling per bone. Bones a profile does not mention keep their own name.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Sequence
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("text2motion")
+
+AUTO_PROFILE_ID = "AUTO"
+PROFILE_FILE_EXTENSION = ".json"
+
+# mixamo exports namespace the bones, e.g. "mixamorig:Hips" or "mixamorig1:Hips"
+_MIXAMO_NAMESPACE = re.compile(r"^mixamorig\d*:")
+
+
+def normalize_bone_name(bone_name: str) -> str:
+    return _MIXAMO_NAMESPACE.sub("mixamorig", bone_name)
+
+
+class T2MBoneMapProfile(BaseModel):
+    name: str
+    description: str = ""
+    # Text2Motion bone name -> armature bone name
+    bones: dict[str, str] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha1(json.dumps(self.bones, sort_keys=True).encode()).hexdigest()
+
+
+def _sided(names: dict[str, str], left: str, right: str) -> dict[str, str]:
+    """Expand "{side}" in a mapping into its Left and Right entries"""
+    result = {}
+    for t2m_name, bone_name in names.items():
+        if "{side}" not in t2m_name:
+            result[t2m_name] = bone_name
+            continue
+        result[t2m_name.format(side="Left")] = bone_name.format(side=left)
+        result[t2m_name.format(side="Right")] = bone_name.format(side=right)
+    return result
+
+
+BUILTIN_PROFILES = {
+    AUTO_PROFILE_ID: T2MBoneMapProfile(
+        name="Mixamo",
+        description="Mixamo rigs with any namespace, other rigs keep their bone names",
+    ),
+    "RIGIFY": T2MBoneMapProfile(
+        name="Rigify",
+        description="Deform bones of a generated Rigify human rig",
+        bones=_sided({
+            "mixamorigHips": "DEF-spine",
+            "mixamorigSpine": "DEF-spine.001",
+            "mixamorigSpine1": "DEF-spine.002",
+            "mixamorigSpine2": "DEF-spine.003",
+            "mixamorigNeck": "DEF-spine.004",
+            "mixamorigHead": "DEF-spine.006",
+            "mixamorig{side}Shoulder": "DEF-shoulder.{side}",
+            "mixamorig{side}Arm": "DEF-upper_arm.{side}",
+            "mixamorig{side}ForeArm": "DEF-forearm.{side}",
+            "mixamorig{side}Hand": "DEF-hand.{side}",
+            "mixamorig{side}UpLeg": "DEF-thigh.{side}",
+            "mixamorig{side}Leg": "DEF-shin.{side}",
+            "mixamorig{side}Foot": "DEF-foot.{side}",
+            "mixamorig{side}ToeBase": "DEF-toe.{side}",
+        }, "L", "R"),
+    ),
+    "UE_MANNEQUIN": T2MBoneMapProfile(
+        name="UE Mannequin",
+        description="Unreal Engine mannequin skeleton",
+        bones=_sided({
+            "mixamorigHips": "pelvis",
+            "mixamorigSpine": "spine_01",
+            "mixamorigSpine1": "spine_02",
+            "mixamorigSpine2": "spine_03",
+            "mixamorigNeck": "neck_01",
+            "mixamorigHead": "head",
+            "mixamorig{side}Shoulder": "clavicle_{side}",
+            "mixamorig{side}Arm": "upperarm_{side}",
+            "mixamorig{side}ForeArm": "lowerarm_{side}",
+            "mixamorig{side}Hand": "hand_{side}",
+            "mixamorig{side}UpLeg": "thigh_{side}",
+            "mixamorig{side}Leg": "calf_{side}",
+            "mixamorig{side}Foot": "foot_{side}",
+            "mixamorig{side}ToeBase": "ball_{side}",
+        }, "l", "r"),
+    ),
+}
+
+
+class T2MBoneMap:
+    """A profile compiled for one armature's bones"""
+
+    def __init__(self, t2m_names: list[str]):
+        # Text2Motion name of every armature bone, in armature bone order
+        self.t2m_names = t2m_names
+        self._indices = {t2m_name: index for index, t2m_name in enumerate(t2m_names)}
+
+    def get_index(self, t2m_name: str) -> int | None:
+        return self._indices.get(t2m_name)
+
+    def __len__(self):
+        return len(self.t2m_names)
+
+
+def compile_bone_map(
+        bone_names: Sequence[str],
+        profile: T2MBoneMapProfile | None = None) -> T2MBoneMap:
+    armature_to_t2m = {}
+    if profile:
+        armature_to_t2m = {bone_name: t2m_name for t2m_name, bone_name in profile.bones.items()}
+
+    # names of mapped bones take precedence over the same name derived from an unmapped bone
+    mapped_names = {armature_to_t2m[bone_name]
+                    for bone_name in bone_names if bone_name in armature_to_t2m}
+    t2m_names = []
+    used_names = set()
+    for bone_name in bone_names:
+        t2m_name = armature_to_t2m.get(bone_name)
+        reserved_names = used_names
+        if t2m_name is None:
+            t2m_name = normalize_bone_name(bone_name)
+            reserved_names = used_names | mapped_names
+        if t2m_name in reserved_names:
+            logger.warning(f"Bone {bone_name} maps to {t2m_name}, which is already taken")
+            t2m_name = bone_name
+            suffix = 1
+            while t2m_name in reserved_names:
+                t2m_name = f"{bone_name}.{suffix:03d}"
+                suffix += 1
+        used_names.add(t2m_name)
+        t2m_names.append(t2m_name)
+    return T2MBoneMap(t2m_names)
+
+
+def make_profile_template(name: str, bone_names: Sequence[str]) -> T2MBoneMapProfile:
+    """A custom profile listing every bone under its current Text2Motion name, ready to edit"""
+    return T2MBoneMapProfile(
+        name=name,
+        bones={normalize_bone_name(bone_name): bone_name for bone_name in bone_names},
+    )
+
+
+class T2MBoneMapLibrary:
+    """Built-in profiles plus the custom profiles stored as JSON files in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._custom_profiles: dict[str, T2MBoneMapProfile] = {}
+        self._files_signature = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _load_custom_profiles(self) -> dict[str, T2MBoneMapProfile]:
+        try:
+            files = sorted(
+                (entry.name, entry.stat().st_mtime) for entry in os.scandir(self.directory)
+                if entry.name.endswith(PROFILE_FILE_EXTENSION))
+        except OSError:
+            return {}
+        # profiles are edited by hand, so they are re-read only when a file changes
+        if files == self._files_signature:
+            return self._custom_profiles
+
+        profiles = {}
+        for file_name, _ in files:
+            path = os.path.join(self.directory, file_name)
+            try:
+                with open(path, encoding="utf-8") as profile_file:
+                    profiles[file_name] = T2MBoneMapProfile.model_validate_json(profile_file.read())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping invalid bone map profile {path}: {e}")
+        self._custom_profiles = profiles
+        self._files_signature = files
+        return profiles
+
+    def get_profiles(self) -> dict[str, T2MBoneMapProfile]:
+        with self._lock:
+            return {**BUILTIN_PROFILES, **self._load_custom_profiles()}
+
+    def get_profile(self, profile_id: str) -> T2MBoneMapProfile | None:
+        return self.get_profiles().get(profile_id)
+
+    def save_profile(self, profile: T2MBoneMapProfile) -> str:
+        """Write `profile` as a new custom profile, returns its id"""
+        base_name = re.sub(r"[^\w\-]+", "_", profile.name).strip("_") or "profile"
+        file_name = base_name + PROFILE_FILE_EXTENSION
+        index = 1
+        while os.path.exists(os.path.join(self.directory, file_name)):
+            file_name = f"{base_name}_{index}{PROFILE_FILE_EXTENSION}"
+            index += 1
+        with open(os.path.join(self.directory, file_name), "w", encoding="utf-8") as profile_file:
+            profile_file.write(profile.model_dump_json(indent=1))
+        return file_name
@@ -0,0 +1,282 @@
+"""Headless batch generation for background Blender
+
+Run on a render node with:
+
+    blender -b scene.blend --online-mode --python-expr \\
+        "import sys, bl_ext.user_default.text2motion.t2m_cli as cli; sys.exit(cli.main())" \\
+        -- --manifest jobs.csv --report report.json
+
+The manifest is a CSV file with a header row, or a JSON list of objects, with the columns
+armature, prompt, seconds, model_version and action_name. Only armature and prompt are
+required. Every generated action is kept in the saved .blend file and a JSON report with the
+timings of every job is written to --report, or printed when it is omitted. A job that fails,
+including a manifest row that cannot be read, is reported with its error and the other jobs
+still run.
+
+Frames are loaded with the add-on's default Advanced Options, keeping the generated
+timestamps, with the options below to change them.
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import bpy
+
+from .t2m_batch import make_action_name
+from .t2m_bone_map import AUTO_PROFILE_ID, T2MBoneMapLibrary
+from .t2m_reduce import DEFAULT_ANGLE_TOLERANCE_RADIANS, DEFAULT_LOCATION_TOLERANCE
+from .t2m_retry import REQUEST_BURST, REQUEST_RATE_PER_SECOND
+from .t2m_root_motion import ROOT_MOTION_GROUNDED, ROOT_MOTION_MODES, ROOT_MOTION_NONE
+from .t2m_server_request_wrapper import (
+    ModelVersion,
+    get_request_cache_key,
+    get_target_skeleton,
+    load_frames,
+    make_server_request,
+    set_request_rate_limit,
+    tag_generated_action,
+)
+
+logger = logging.getLogger("text2motion")
+
+API_KEY_ENVIRONMENT_VARIABLE = "T2M_API_KEY"
+DEFAULT_CONCURRENCY = 4
+
+
+class T2MCliJob:
+    def __init__(self, index: int, row: dict):
+        self.index = index
+        self.status = "pending"
+        self.error = None
+        self.timings = {}
+        self.target_skeleton = None
+        if not isinstance(row, dict):
+            row = {}
+            self._set_invalid("expected an object with the job's columns")
+        self.armature = row.get("armature", "")
+        self.prompt = row.get("prompt", "")
+        self.seconds = 0
+        self.model_version = ModelVersion.STABLE.value
+        self.action_name = row.get("action_name") or make_action_name(
+            "T2MGeneratedAction", self.armature, index)
+        try:
+            self.seconds = int(row.get("seconds") or 0)
+            self.model_version = ModelVersion(row.get("model_version") or ModelVersion.STABLE).value
+        except (TypeError, ValueError) as e:
+            self._set_invalid(e)
+
+    def _set_invalid(self, error):
+        self.status = "error"
+        self.error = f"Invalid manifest row {self.index}: {error}"
+
+    def to_report(self) -> dict:
+        return {
+            "index": self.index,
+            "armature": self.armature,
+            "prompt": self.prompt,
+            "seconds": self.seconds,
+            "model_version": self.model_version,
+            "action_name": self.action_name,
+            "status": self.status,
+            "error": self.error,
+            "timings": self.timings,
+        }
+
+
+def read_manifest(path: str) -> list[T2MCliJob]:
+    with open(path, encoding="utf-8", newline="") as manifest_file:
+        if path.lower().endswith(".json"):
+            rows = json.load(manifest_file)
+        else:
+            rows = list(csv.DictReader(manifest_file))
+    return [T2MCliJob(index, row) for index, row in enumerate(rows)]
+
+
+def _parse_args(argv: list[str] | None):
+    if argv is None:
+        # blender passes the script arguments after "--"
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(
+        prog="text2motion", description="Generate Text2Motion animations in background Blender")
+    parser.add_argument("--manifest", required=True,
+                        help="CSV or JSON file with the jobs to generate")
+    parser.add_argument("--report", help="Where to write the JSON report, printed if omitted")
+    parser.add_argument("--output", help="Where to save the .blend file, defaults to the opened file")
+    parser.add_argument("--api-key", help=f"Defaults to ${API_KEY_ENVIRONMENT_VARIABLE} or the add-on preferences")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum number of requests in flight at the same time")
+    parser.add_argument("--rate-limit", type=float, default=REQUEST_RATE_PER_SECOND,
+                        help="Sustained requests per second, 0 for no limit")
+    parser.add_argument("--burst", type=int, default=REQUEST_BURST,
+                        help="Requests that can start at once before --rate-limit applies")
+    parser.add_argument("--bypass-cache", action="store_true",
+                        help="Always make a new request instead of reusing cached responses")
+    parser.add_argument("--root-motion", choices=ROOT_MOTION_MODES, default=ROOT_MOTION_GROUNDED,
+                        help="How the root bone's motion is applied to the generated animations")
+    parser.add_argument("--no-root-motion", action="store_true",
+                        help="Do not apply root motion, same as --root-motion NONE")
+    parser.add_argument("--resample-fps", type=float,
+                        help="Resample onto this many keyframes per second, e.g. the scene frame "
+                             "rate, by default the generated timestamps are kept")
+    parser.add_argument("--reduce-keyframes", action="store_true",
+                        help="Drop keyframes that interpolation reproduces within the tolerances")
+    parser.add_argument("--angle-tolerance", type=float,
+                        default=math.degrees(DEFAULT_ANGLE_TOLERANCE_RADIANS),
+                        help="Rotation tolerance of --reduce-keyframes in degrees")
+    parser.add_argument("--location-tolerance", type=float, default=DEFAULT_LOCATION_TOLERANCE,
+                        help="Location tolerance of --reduce-keyframes")
+    parser.add_argument("--bone-map-profile", default=AUTO_PROFILE_ID,
+                        help="Id of the bone map profile the armatures are named with")
+    parser.add_argument("--store-frames", action="store_true",
+                        help="Keep the generated frames in every action for the clip library, "
+                             "about a megabyte per 30 seconds of animation in the saved .blend file")
+    return parser.parse_args(argv)
+
+
+def _get_api_key(args) -> str:
+    if args.api_key:
+        return args.api_key
+    if os.environ.get(API_KEY_ENVIRONMENT_VARIABLE):
+        return os.environ[API_KEY_ENVIRONMENT_VARIABLE]
+    addon = bpy.context.preferences.addons.get(__package__)
+    return addon.preferences.api_key if addon else ""
+
+
+def get_loader_options(args) -> dict:
+    """Frames loader options from the command line, the same options the add-on's panel sets
+
+    Raises ValueError for an unknown bone map profile.
+    """
+    bone_map_profile = None
+    if args.bone_map_profile != AUTO_PROFILE_ID:
+        library = T2MBoneMapLibrary(
+            bpy.utils.extension_path_user(__package__, path="bone_maps", create=True))
+        bone_map_profile = library.get_profile(args.bone_map_profile)
+        if bone_map_profile is None:
+            raise ValueError(f"Bone map profile {args.bone_map_profile} not found")
+
+    return {
+        "reduce_keyframes": args.reduce_keyframes,
+        "angle_tolerance": math.radians(args.angle_tolerance),
+        "location_tolerance": args.location_tolerance,
+        "resample_fps": args.resample_fps or None,
+        "bone_map_profile": bone_map_profile,
+        "store_frames": args.store_frames,
+    }
+
+
+def _timed_request(job: T2MCliJob, api_key: str, bypass_cache: bool):
+    start = time.perf_counter()
+    response = make_server_request(
+        job.prompt, job.target_skeleton, job.seconds, api_key, job.model_version, bypass_cache)
+    job.timings["request_seconds"] = time.perf_counter() - start
+    return response
+
+
+def run_jobs(jobs: list[T2MCliJob], api_key: str, concurrency: int = DEFAULT_CONCURRENCY,
+             bypass_cache: bool = False, root_motion_mode: str = ROOT_MOTION_GROUNDED,
+             loader_options: dict | None = None):
+    """Generate every job, requests run concurrently and results are keyed on this thread
+
+    `loader_options` are passed on to load_frames, see get_loader_options.
+    """
+    loader_options = loader_options or {}
+    runnable_jobs = []
+    for job in jobs:
+        if job.status == "error":
+            continue
+        target_object = bpy.data.objects.get(job.armature)
+        if not target_object or target_object.type != 'ARMATURE':
+            job.status = "error"
+            job.error = f"Armature {job.armature} not found"
+            continue
+        start = time.perf_counter()
+        try:
+            job.target_skeleton = get_target_skeleton(
+                target_object, bone_map_profile=loader_options.get("bone_map_profile"))
+        except Exception as e:  # noqa: BLE001 - a failed job is reported, the others still run
+            logger.error(f"Job {job.index} failed to read the skeleton of {job.armature}: {e}")
+            job.status = "error"
+            job.error = str(e)
+            continue
+        job.timings["skeleton_seconds"] = time.perf_counter() - start
+        runnable_jobs.append(job)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="text2motion_cli") as executor:
+        futures = {executor.submit(_timed_request, job, api_key, bypass_cache): job
+                   for job in runnable_jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                response = future.result()
+                start = time.perf_counter()
+                action = load_frames(
+                    response,
+                    action_name=job.action_name,
+                    root_motion_mode=root_motion_mode,
+                    target_object=bpy.data.objects[job.armature],
+                    **loader_options)
+                action.use_fake_user = True
+                tag_generated_action(action, job.prompt, job.model_version, get_request_cache_key(
+                    job.prompt, job.target_skeleton, job.seconds, job.model_version))
+                job.timings["load_seconds"] = time.perf_counter() - start
+                job.action_name = action.name
+                job.status = "ok"
+            except Exception as e:  # noqa: BLE001 - a failed job is reported, the others still run
+                logger.error(f"Job {job.index} failed for prompt: {job.prompt}: {e}")
+                job.status = "error"
+                job.error = str(e)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if not bpy.app.online_access:
+        logger.error("Online access is disabled, run Blender with --online-mode")
+        return 1
+
+    try:
+        loader_options = get_loader_options(args)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+    try:
+        jobs = read_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to read the manifest {args.manifest}: {e}")
+        return 1
+
+    set_request_rate_limit(args.rate_limit, args.burst)
+    start = time.perf_counter()
+    run_jobs(jobs, _get_api_key(args), args.concurrency,
+             args.bypass_cache, ROOT_MOTION_NONE if args.no_root_motion else args.root_motion,
+             loader_options)
+    total_seconds = time.perf_counter() - start
+
+    output = args.output or bpy.data.filepath
+    if output:
+        bpy.ops.wm.save_as_mainfile(filepath=output)
+    else:
+        logger.warning("No output .blend file, the generated actions are not saved")
+
+    failed_count = sum(1 for job in jobs if job.status != "ok")
+    report = {
+        "blend_file": output,
+        "total_seconds": total_seconds,
+        "job_count": len(jobs),
+        "failed_count": failed_count,
+        "jobs": [job.to_report() for job in jobs],
+    }
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 1 if failed_count else 0
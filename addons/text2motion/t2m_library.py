@@ -0,0 +1,140 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+
+from pydantic import BaseModel, Field
+
+from .t2m_animation import T2MFramesArrays
+from .t2m_save_file import read_save_file, write_binary
+
+logger = logging.getLogger("text2motion")
+
+LIBRARY_INDEX_FILE_NAME = "index.json"
+LIBRARY_INDEX_VERSION_1_0 = "1.0"
+CLIP_FILE_EXTENSION = ".t2m"
+
+
+class T2MLibraryEntry(BaseModel):
+    name: str
+    file_name: str
+    prompt: str = ""
+    duration: float
+    model_version: str = ""
+    bone_count: int
+    hash: str
+    created_at: float = 0.0
+
+
+class T2MLibraryIndex(BaseModel):
+    version: str = LIBRARY_INDEX_VERSION_1_0
+    entries: list[T2MLibraryEntry] = Field(default_factory=list)
+
+
+class T2MClipLibrary:
+    """Directory of saved generations with a small index for searching without opening clips
+
+    Clips are stored as version 2.0 save files named after the hash of their content, so
+    saving the same generation twice keeps a single copy.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._index: T2MLibraryIndex | None = None
+        self._index_mtime = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, LIBRARY_INDEX_FILE_NAME)
+
+    def _load_index(self) -> T2MLibraryIndex:
+        try:
+            mtime = os.path.getmtime(self.index_path)
+        except OSError:
+            self._index = T2MLibraryIndex()
+            self._index_mtime = None
+            return self._index
+
+        # only re-read the index when another session has changed it
+        if self._index is None or mtime != self._index_mtime:
+            with open(self.index_path, encoding="utf-8") as index_file:
+                self._index = T2MLibraryIndex.model_validate_json(index_file.read())
+            self._index_mtime = mtime
+        return self._index
+
+    def _save_index(self, index: T2MLibraryIndex):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            index_file.write(index.model_dump_json(indent=1))
+        os.replace(temp_path, self.index_path)
+        self._index = index
+        self._index_mtime = os.path.getmtime(self.index_path)
+
+    def get_entries(self) -> list[T2MLibraryEntry]:
+        with self._lock:
+            return list(self._load_index().entries)
+
+    def search(self, query: str = "") -> list[T2MLibraryEntry]:
+        """Entries whose name or prompt contains every word of `query`, newest first"""
+        words = query.lower().split()
+        entries = [
+            entry for entry in self.get_entries()
+            if all(word in f"{entry.name} {entry.prompt}".lower() for word in words)
+        ]
+        return sorted(entries, key=lambda entry: entry.created_at, reverse=True)
+
+    def get_entry(self, clip_hash: str) -> T2MLibraryEntry | None:
+        return next((entry for entry in self.get_entries() if entry.hash == clip_hash), None)
+
+    def add_clip(
+            self,
+            frames: T2MFramesArrays,
+            name: str,
+            prompt: str | None = None,
+            model_version: str = "") -> T2MLibraryEntry:
+        buffer = io.BytesIO()
+        write_binary(buffer, frames)
+        content = buffer.getvalue()
+        clip_hash = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            index = self._load_index()
+            existing_entry = next(
+                (entry for entry in index.entries if entry.hash == clip_hash), None)
+            if existing_entry:
+                logger.info(f"Clip {name} is already in the library as {existing_entry.name}")
+                return existing_entry
+
+            entry = T2MLibraryEntry(
+                name=name,
+                file_name=clip_hash[:32] + CLIP_FILE_EXTENSION,
+                prompt=prompt or frames.prompt or "",
+                duration=frames.duration,
+                model_version=model_version,
+                bone_count=len(frames.bones),
+                hash=clip_hash,
+                created_at=time.time(),
+            )
+            with open(os.path.join(self.directory, entry.file_name), "wb") as clip_file:
+                clip_file.write(content)
+            index.entries.append(entry)
+            self._save_index(index)
+            return entry
+
+    def read_clip(self, entry: T2MLibraryEntry) -> T2MFramesArrays:
+        return read_save_file(os.path.join(self.directory, entry.file_name))
+
+    def remove_clip(self, entry: T2MLibraryEntry):
+        with self._lock:
+            index = self._load_index()
+            index.entries = [
+                other for other in index.entries if other.hash != entry.hash]
+            self._save_index(index)
+            try:
+                os.remove(os.path.join(self.directory, entry.file_name))
+            except OSError as e:
+                logger.warning(f"Failed to remove clip file {entry.file_name}: {e}")
@@ -0,0 +1,74 @@
+"""Keyframe reduction of generated curves
+
+The server returns a sample for every frame. Samples that linear interpolation between their
+neighbouring keys reproduces within a tolerance are dropped with Ramer-Douglas-Peucker, refining
+every segment of a curve at once instead of recursing one segment at a time.
+"""
+from collections.abc import Callable
+
+import numpy
+
+DEFAULT_ANGLE_TOLERANCE_RADIANS = numpy.radians(0.5)
+DEFAULT_LOCATION_TOLERANCE = 0.001
+
+
+def _lerp(start_values, end_values, factors):
+    return start_values + (end_values - start_values) * factors[:, None]
+
+
+def rotation_errors(quaternions: numpy.ndarray, interpolated: numpy.ndarray) -> numpy.ndarray:
+    """Angle in radians between (N, 4) quaternions and component-wise interpolated ones
+
+    Blender interpolates every quaternion channel on its own and normalizes the result, so the
+    interpolated quaternions are normalized before comparing.
+    """
+    norms = numpy.linalg.norm(interpolated, axis=1)
+    dots = numpy.abs(numpy.einsum("ij,ij->i", quaternions, interpolated))
+    cosines = numpy.divide(dots, norms, out=numpy.zeros_like(dots), where=norms > 0)
+    return 2 * numpy.arccos(numpy.clip(cosines, 0.0, 1.0))
+
+
+def location_errors(locations: numpy.ndarray, interpolated: numpy.ndarray) -> numpy.ndarray:
+    return numpy.linalg.norm(locations - interpolated, axis=1)
+
+
+def reduce_keyframes_mask(
+        times: numpy.ndarray,
+        values: numpy.ndarray,
+        tolerance: float,
+        error_fn: Callable = location_errors) -> numpy.ndarray:
+    """Boolean mask of the samples to keep so every dropped sample is within `tolerance`"""
+    sample_count = len(times)
+    keep = numpy.zeros(sample_count, dtype=bool)
+    if sample_count <= 2:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+
+    times = numpy.asarray(times, dtype=numpy.float64)
+    values = numpy.asarray(values, dtype=numpy.float64)
+    sample_indices = numpy.arange(sample_count)
+    while True:
+        # every sample is interpolated between the kept keys around it
+        kept_indices = numpy.flatnonzero(keep)
+        segments = numpy.minimum(
+            numpy.searchsorted(kept_indices, sample_indices, side="right") - 1,
+            len(kept_indices) - 2)
+        starts = kept_indices[segments]
+        ends = kept_indices[segments + 1]
+        spans = times[ends] - times[starts]
+        factors = numpy.divide(times - times[starts], spans,
+                               out=numpy.zeros_like(times), where=spans > 0)
+        errors = error_fn(values, _lerp(values[starts], values[ends], factors))
+        errors[keep] = 0
+
+        # keep the worst sample of every segment that is out of tolerance
+        order = numpy.lexsort((-errors, segments))
+        ordered_segments = segments[order]
+        is_segment_start = numpy.ones(sample_count, dtype=bool)
+        is_segment_start[1:] = ordered_segments[1:] != ordered_segments[:-1]
+        worst_samples = order[is_segment_start]
+        worst_samples = worst_samples[errors[worst_samples] > tolerance]
+        if len(worst_samples) == 0:
+            return keep
+        keep[worst_samples] = True
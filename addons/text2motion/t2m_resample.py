@@ -0,0 +1,59 @@
+"""Resampling of generated tracks onto a fixed sampling rate
+
+Server timestamps do not have to line up with the scene's frames. Tracks are resampled onto
+multiples of 1 / fps seconds, so with the scene frame rate every key lands on a whole frame.
+"""
+import numpy
+
+from .t2m_animation import T2MTrackArrays
+from .t2m_math import slerp_quaternions
+
+
+def get_sample_times(times: numpy.ndarray, fps: float) -> numpy.ndarray:
+    """Multiples of 1 / fps covering the time range of `times`"""
+    if len(times) == 0:
+        return numpy.empty(0, dtype=numpy.float64)
+    # tolerate timestamps rounded by the server, e.g. 0.0333 for frame 1 at 30 fps
+    first_frame = numpy.ceil(times[0] * fps - 1e-3)
+    last_frame = numpy.floor(times[-1] * fps + 1e-3)
+    # + 0.0 turns a -0.0 first frame into 0.0
+    return numpy.arange(first_frame, last_frame + 1) / fps + 0.0
+
+
+def _get_segments(times: numpy.ndarray, sample_times: numpy.ndarray):
+    """Index of the sample before every new time and the interpolation factor from it"""
+    starts = numpy.clip(numpy.searchsorted(times, sample_times, side="right") - 1,
+                        0, max(0, len(times) - 2))
+    ends = numpy.minimum(starts + 1, len(times) - 1)
+    spans = times[ends] - times[starts]
+    factors = numpy.divide(sample_times - times[starts], spans,
+                           out=numpy.zeros_like(sample_times), where=spans > 0)
+    return starts, ends, numpy.clip(factors, 0.0, 1.0)
+
+
+def resample_positions(
+        times: numpy.ndarray, values: numpy.ndarray, sample_times: numpy.ndarray) -> numpy.ndarray:
+    if len(times) == 0:
+        return numpy.empty((0, values.shape[1]), dtype=values.dtype)
+    starts, ends, factors = _get_segments(times, sample_times)
+    return values[starts] + (values[ends] - values[starts]) * factors[:, None]
+
+
+def resample_rotations(
+        times: numpy.ndarray, values: numpy.ndarray, sample_times: numpy.ndarray) -> numpy.ndarray:
+    if len(times) == 0:
+        return numpy.empty((0, values.shape[1]), dtype=values.dtype)
+    starts, ends, factors = _get_segments(times, sample_times)
+    return slerp_quaternions(values[starts], values[ends], factors)
+
+
+def resample_track(track: T2MTrackArrays, fps: float) -> T2MTrackArrays:
+    """Slerp the rotations and lerp the positions of `track` onto multiples of 1 / fps"""
+    rotation_times = get_sample_times(track.rotation_times, fps)
+    position_times = get_sample_times(track.position_times, fps)
+    return T2MTrackArrays(
+        rotation_times,
+        resample_rotations(track.rotation_times, track.rotation_values, rotation_times),
+        position_times,
+        resample_positions(track.position_times, track.position_values, position_times),
+    )
@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
+from text2motion_client_api.exceptions import ApiException
+
+logger = logging.getLogger("text2motion")
+
+RETRYABLE_STATUSES = frozenset((
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+))
+
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY_SECONDS = 2.0
+RETRY_MAX_DELAY_SECONDS = 60.0
+RETRY_DEADLINE_SECONDS = 180.0
+# client side quota, a full batch can start at once and then settles at the sustained rate
+REQUEST_RATE_PER_SECOND = 1.0
+REQUEST_BURST = 16
+
+
+def parse_retry_after(headers) -> float | None:
+    """Seconds to wait from a Retry-After header, either delta-seconds or an HTTP date"""
+    if not headers:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+class T2MTokenBucket:
+    """Thread-safe token bucket limiting how fast requests are sent"""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available, otherwise return the seconds until one is"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate_per_second
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Block until a token is taken, returns False if that would take longer than `timeout`"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def make_token_bucket(rate_per_second: float, capacity: int) -> T2MTokenBucket | None:
+    """Token bucket for a request rate, None when `rate_per_second` is 0 and requests are not limited"""
+    if rate_per_second <= 0:
+        return None
+    return T2MTokenBucket(rate_per_second, max(1, capacity))
+
+
+class T2MRetryPolicy:
+    """Retries throttled and failed server requests with jittered exponential backoff
+
+    The server's Retry-After header takes precedence over the backoff delay. Retrying stops after
+    `max_attempts` or once the next attempt would start after `deadline_seconds`. Every attempt
+    takes a token from `token_bucket` first, so concurrent callers share one request rate.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = RETRY_MAX_ATTEMPTS,
+            base_delay_seconds: float = RETRY_BASE_DELAY_SECONDS,
+            max_delay_seconds: float = RETRY_MAX_DELAY_SECONDS,
+            deadline_seconds: float = RETRY_DEADLINE_SECONDS,
+            token_bucket: T2MTokenBucket | None = None):
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.deadline_seconds = deadline_seconds
+        self.token_bucket = token_bucket
+
+    def get_delay(self, attempt: int, error: ApiException) -> float:
+        retry_after = parse_retry_after(error.headers)
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def call(self, request_fn: Callable, on_retry: Callable | None = None):
+        """Call `request_fn()` until it succeeds or the budget runs out
+
+        `on_retry(attempt, delay, error)` is called before waiting for the next attempt.
+        """
+        deadline = time.monotonic() + self.deadline_seconds
+        for attempt in range(self.max_attempts):
+            if self.token_bucket and not self.token_bucket.acquire(deadline - time.monotonic()):
+                raise TimeoutError("Text2Motion request rate limit exceeded the retry deadline")
+            try:
+                return request_fn()
+            except ApiException as e:
+                if e.status not in RETRYABLE_STATUSES or attempt + 1 >= self.max_attempts:
+                    raise
+                delay = self.get_delay(attempt, e)
+                if time.monotonic() + delay > deadline:
+                    raise
+                logger.info(
+                    f"Request failed with HTTPStatus {e.status}, retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1} of {self.max_attempts})")
+                if on_retry:
+                    on_retry(attempt, delay, e)
+                time.sleep(delay)
@@ -0,0 +1,197 @@
+"""Reading and writing T2MSaveFile
+
+Version 1.0 is a JSON T2MSaveFile whose content is the T2MFrames JSON.
+
+Version 2.0 is a little-endian binary container:
+
+    header      magic b"T2MB", major u16, minor u16, duration f64, bone count u32,
+                prompt size u32, followed by the utf-8 prompt
+    bone index  per bone: name size u16, utf-8 name, then offset u64 and sample count u32
+                of the rotation track and of the position track
+    data        per track: float64 times followed by float32 values, every block is
+                aligned to 8 bytes and offsets are relative to the start of the file
+
+Version 2.0 files are memory-mapped and every array is a zero-copy read-only view.
+"""
+import base64
+import binascii
+import io
+import mmap
+import struct
+import zlib
+from typing import BinaryIO
+
+import numpy
+
+from .t2m_animation import (
+    POSITION_WIDTH,
+    ROTATION_WIDTH,
+    T2M_SAVE_FILE_VERSION_1_0,
+    T2M_SAVE_FILE_VERSION_2_0,
+    T2MFramesArrays,
+    T2MSaveFile,
+    T2MTrackArrays,
+)
+from .t2m_stream import decode_frames
+
+BINARY_MAGIC = b"T2MB"
+BINARY_VERSION = (2, 0)
+_HEADER = struct.Struct("<4sHHdII")
+_NAME_SIZE = struct.Struct("<H")
+_TRACK_ENTRY = struct.Struct("<QIQI")
+_TIME_DTYPE = numpy.dtype("<f8")
+_VALUE_DTYPE = numpy.dtype("<f4")
+_ALIGNMENT = 8
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _track_block_size(count: int, width: int) -> int:
+    return _align(count * _TIME_DTYPE.itemsize) + _align(count * width * _VALUE_DTYPE.itemsize)
+
+
+def _write_block(file: BinaryIO, array: numpy.ndarray, dtype: numpy.dtype):
+    data = numpy.ascontiguousarray(array, dtype=dtype).tobytes()
+    file.write(data)
+    file.write(b"\0" * (_align(len(data)) - len(data)))
+
+
+def write_binary(file: BinaryIO, frames: T2MFramesArrays):
+    prompt = (frames.prompt or "").encode("utf-8")
+    names = [bone_name.encode("utf-8") for bone_name in frames.bones]
+
+    index_size = sum(_NAME_SIZE.size + len(name) + _TRACK_ENTRY.size for name in names)
+    offset = _align(_HEADER.size + len(prompt) + index_size)
+
+    # the index is written before the data, so every offset is computed up front
+    entries = []
+    for track in frames.bones.values():
+        rotation_count = len(track.rotation_times)
+        position_count = len(track.position_times)
+        rotation_offset = offset
+        offset += _track_block_size(rotation_count, ROTATION_WIDTH)
+        position_offset = offset
+        offset += _track_block_size(position_count, POSITION_WIDTH)
+        entries.append((rotation_offset, rotation_count, position_offset, position_count))
+
+    file.write(_HEADER.pack(BINARY_MAGIC, *BINARY_VERSION,
+               frames.duration, len(names), len(prompt)))
+    file.write(prompt)
+    for name, entry in zip(names, entries):
+        file.write(_NAME_SIZE.pack(len(name)))
+        file.write(name)
+        file.write(_TRACK_ENTRY.pack(*entry))
+    written = _HEADER.size + len(prompt) + index_size
+    file.write(b"\0" * (_align(written) - written))
+
+    for track in frames.bones.values():
+        _write_block(file, track.rotation_times, _TIME_DTYPE)
+        _write_block(file, track.rotation_values, _VALUE_DTYPE)
+        _write_block(file, track.position_times, _TIME_DTYPE)
+        _write_block(file, track.position_values, _VALUE_DTYPE)
+
+
+def _check_range(buffer, offset: int, size: int):
+    # a truncated or corrupt file must not read past the end of the buffer
+    if offset < 0 or offset + size > len(buffer):
+        raise ValueError("Corrupt Text2Motion save file")
+
+
+def _unpack_from(layout: struct.Struct, buffer, offset: int) -> tuple:
+    _check_range(buffer, offset, layout.size)
+    return layout.unpack_from(buffer, offset)
+
+
+def _read_string(buffer, offset: int, size: int) -> str:
+    _check_range(buffer, offset, size)
+    try:
+        return bytes(buffer[offset:offset + size]).decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValueError("Corrupt Text2Motion save file") from None
+
+
+def _read_track(buffer, offset: int, count: int, width: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+    _check_range(buffer, offset, _track_block_size(count, width))
+    times = numpy.frombuffer(buffer, dtype=_TIME_DTYPE, count=count, offset=offset)
+    offset += _align(count * _TIME_DTYPE.itemsize)
+    values = numpy.frombuffer(
+        buffer, dtype=_VALUE_DTYPE, count=count * width, offset=offset).reshape(count, width)
+    return times, values
+
+
+def read_binary(buffer) -> T2MFramesArrays:
+    """Decode a version 2.0 buffer, the arrays reference `buffer` without copying it
+
+    Raises ValueError if the buffer is truncated or its index points outside of it.
+    """
+    magic, major, minor, duration, bone_count, prompt_size = _unpack_from(_HEADER, buffer, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary Text2Motion save file")
+    if major != BINARY_VERSION[0]:
+        raise ValueError(f"Unsupported Text2Motion save file version {major}.{minor}")
+
+    offset = _HEADER.size
+    prompt = _read_string(buffer, offset, prompt_size)
+    offset += prompt_size
+
+    entries: list[tuple[str, tuple[int, int, int, int]]] = []
+    for _ in range(bone_count):
+        (name_size,) = _unpack_from(_NAME_SIZE, buffer, offset)
+        offset += _NAME_SIZE.size
+        name = _read_string(buffer, offset, name_size)
+        offset += name_size
+        entries.append((name, _unpack_from(_TRACK_ENTRY, buffer, offset)))
+        offset += _TRACK_ENTRY.size
+
+    bones = {}
+    for name, (rotation_offset, rotation_count, position_offset, position_count) in entries:
+        rotation_times, rotation_values = _read_track(
+            buffer, rotation_offset, rotation_count, ROTATION_WIDTH)
+        position_times, position_values = _read_track(
+            buffer, position_offset, position_count, POSITION_WIDTH)
+        bones[name] = T2MTrackArrays(
+            rotation_times, rotation_values, position_times, position_values)
+    return T2MFramesArrays(duration, bones, prompt or None)
+
+
+def pack_frames(frames: T2MFramesArrays) -> str:
+    """Compressed version 2.0 buffer as text, small enough to keep in a string property"""
+    buffer = io.BytesIO()
+    write_binary(buffer, frames)
+    return base64.b64encode(zlib.compress(buffer.getvalue())).decode("ascii")
+
+
+def unpack_frames(text: str) -> T2MFramesArrays:
+    try:
+        buffer = zlib.decompress(base64.b64decode(text, validate=True))
+    except (binascii.Error, zlib.error):
+        raise ValueError("Corrupt Text2Motion save file") from None
+    return read_binary(buffer)
+
+
+def write_save_file(path: str, frames: T2MFramesArrays, version: str = T2M_SAVE_FILE_VERSION_2_0):
+    if version == T2M_SAVE_FILE_VERSION_2_0:
+        with open(path, "wb") as file:
+            write_binary(file, frames)
+    elif version == T2M_SAVE_FILE_VERSION_1_0:
+        save_file = T2MSaveFile(version=version, content=frames.to_json())
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(save_file.model_dump_json())
+    else:
+        raise ValueError(f"Unsupported Text2Motion save file version {version}")
+
+
+def read_save_file(path: str) -> T2MFramesArrays:
+    """Read a save file of any supported version"""
+    with open(path, "rb") as file:
+        if file.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            # the mapping stays alive as long as an array references it
+            return read_binary(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+        file.seek(0)
+        save_file = T2MSaveFile.model_validate_json(file.read())
+    if save_file.version != T2M_SAVE_FILE_VERSION_1_0:
+        raise ValueError(f"Unsupported Text2Motion save file version {save_file.version}")
+    return decode_frames(save_file.content)
@@ -0,0 +1,193 @@
+"""Sequencing of consecutive generations into one continuous motion
+
+A single generation is capped at MAX_DURATION_SECONDS, so longer motions are generated one
+prompt at a time and joined here. Every clip is resampled onto whole frames, turned and moved so
+its root starts where and facing the way the previous clip is at the start of their overlap, and
+then crossfaded into it with slerp over the overlapping frames. Rotations are in the server's
+(x, y, z, w) order and space, where Y is up.
+"""
+
+import numpy
+
+from .t2m_animation import T2MFramesArrays, T2MTrackArrays
+from .t2m_math import multiply_quaternions, slerp_quaternions, xyzw_to_wxyz
+from .t2m_resample import resample_positions, resample_rotations
+
+DEFAULT_BLEND_SECONDS = 0.5
+IDENTITY_QUATERNION_XYZW = (0.0, 0.0, 0.0, 1.0)
+# the axis the heading of the root is measured from, it is never vertical for an upright root
+FORWARD_AXIS = numpy.array([0.0, 0.0, 1.0])
+
+
+def get_headings(rotations_xyzw: numpy.ndarray) -> numpy.ndarray:
+    """Angle around the vertical axis that (N, 4) rotations turn the forward axis to"""
+    vectors = rotations_xyzw[:, :3]
+    cross = numpy.cross(vectors, FORWARD_AXIS)
+    forward = (FORWARD_AXIS + 2 * rotations_xyzw[:, 3:] * cross +
+               2 * numpy.cross(vectors, cross))
+    return numpy.arctan2(forward[:, 0], forward[:, 2])
+
+
+def rotate_heading(
+        rotations_xyzw: numpy.ndarray, positions: numpy.ndarray, angle: float):
+    """Turn (N, 4) rotations and (M, 3) positions by `angle` around the vertical axis"""
+    half_angle = angle / 2
+    yaw_wxyz = (numpy.cos(half_angle), 0.0, numpy.sin(half_angle), 0.0)
+    rotations = multiply_quaternions(yaw_wxyz, xyzw_to_wxyz(rotations_xyzw))[:, [1, 2, 3, 0]]
+    cos_angle, sin_angle = numpy.cos(angle), numpy.sin(angle)
+    yaw_matrix = numpy.array([[cos_angle, 0.0, sin_angle],
+                              [0.0, 1.0, 0.0],
+                              [-sin_angle, 0.0, cos_angle]])
+    return rotations, positions @ yaw_matrix.T
+
+
+def _resample_clip(clip: T2MFramesArrays, fps: float) -> T2MFramesArrays:
+    # one sample per frame from 0, so clips can be placed on the timeline by frame index
+    frame_count = int(numpy.floor(clip.duration * fps + 1e-3)) + 1
+    times = numpy.arange(frame_count) / fps
+    empty_times = numpy.empty(0, dtype=numpy.float64)
+    bones = {}
+    for bone_name, track in clip.bones.items():
+        has_rotations = len(track.rotation_times) > 0
+        has_positions = len(track.position_times) > 0
+        bones[bone_name] = T2MTrackArrays(
+            times if has_rotations else empty_times,
+            resample_rotations(track.rotation_times, track.rotation_values, times)
+            if has_rotations else numpy.empty((0, 4)),
+            times if has_positions else empty_times,
+            resample_positions(track.position_times, track.position_values, times)
+            if has_positions else numpy.empty((0, 3)),
+        )
+    return T2MFramesArrays((frame_count - 1) / fps, bones, clip.prompt)
+
+
+def _get_frame_count(clip: T2MFramesArrays, fps: float) -> int:
+    return round(clip.duration * fps) + 1
+
+
+def _get_root_name(clip: T2MFramesArrays) -> str | None:
+    # only the root bone has positions
+    return next((bone_name for bone_name, track in clip.bones.items()
+                 if len(track.position_times) > 0), None)
+
+
+def _align_clip(clip: T2MFramesArrays, previous_clip: T2MFramesArrays, reference_frame: int):
+    """Move and turn the root of `clip` so its first frame continues `previous_clip`"""
+    root_name = _get_root_name(clip)
+    previous_track = previous_clip.bones.get(root_name)
+    if root_name is None or previous_track is None:
+        return
+    track = clip.bones[root_name]
+
+    angle = 0.0
+    if len(track.rotation_values) > 0 and len(previous_track.rotation_values) > 0:
+        angle = (get_headings(previous_track.rotation_values[reference_frame:reference_frame + 1])[0] -
+                 get_headings(track.rotation_values[:1])[0])
+    start_position = track.position_values[0]
+    rotations, positions = rotate_heading(
+        track.rotation_values, track.position_values - start_position, angle)
+    offset = previous_track.position_values[reference_frame].copy()
+    # the height is left as generated, only the horizontal position continues
+    offset[1] = start_position[1]
+    clip.bones[root_name] = T2MTrackArrays(
+        track.rotation_times, rotations, track.position_times, positions + offset)
+
+
+class T2MSequence:
+    """Clips placed one after the other on a timeline of whole frames
+
+    Every clip starts `blend_frames` before the previous one ends, the first clip has no blend.
+    """
+
+    def __init__(self, clips: list[T2MFramesArrays], fps: float,
+                 blend_seconds: float = DEFAULT_BLEND_SECONDS):
+        self.fps = fps
+        self.clips = []
+        self.start_frames = []
+        self.blend_frames = []
+        next_start_frame = 0
+        for clip in clips:
+            clip = _resample_clip(clip, fps)
+            frame_count = _get_frame_count(clip, fps)
+            blend_frames = 0
+            if self.clips:
+                previous_frame_count = _get_frame_count(self.clips[-1], fps)
+                # half of either clip at most, so a clip never overlaps two other clips at once
+                blend_frames = max(0, min(round(blend_seconds * fps),
+                                          previous_frame_count // 2, frame_count // 2))
+                next_start_frame -= blend_frames
+                _align_clip(clip, self.clips[-1], previous_frame_count - max(1, blend_frames))
+            self.clips.append(clip)
+            self.start_frames.append(next_start_frame)
+            self.blend_frames.append(blend_frames)
+            next_start_frame += frame_count
+
+    @property
+    def frame_count(self) -> int:
+        if not self.clips:
+            return 0
+        return self.start_frames[-1] + _get_frame_count(self.clips[-1], self.fps)
+
+    def get_root_origin(self) -> numpy.ndarray | None:
+        """First root position of the sequence, the root motion of every clip is relative to it"""
+        root_name = _get_root_name(self.clips[0]) if self.clips else None
+        if root_name is None:
+            return None
+        return self.clips[0].bones[root_name].position_values[0]
+
+    def get_bone_names(self) -> list[str]:
+        bone_names = {}
+        for clip in self.clips:
+            bone_names.update(dict.fromkeys(clip.bones))
+        return list(bone_names)
+
+    def _stitch_values(self, bone_name: str, width: int, is_rotation: bool) -> numpy.ndarray | None:
+        result = None
+        for clip, start_frame, blend_frames in zip(self.clips, self.start_frames, self.blend_frames):
+            frame_count = _get_frame_count(clip, self.fps)
+            track = clip.bones.get(bone_name)
+            values = None
+            if track is not None:
+                values = track.rotation_values if is_rotation else track.position_values
+            if values is None or len(values) == 0:
+                if result is None:
+                    continue
+                # a bone missing from a clip rests, a missing root holds the previous position
+                values = numpy.empty((frame_count, width))
+                values[:] = (IDENTITY_QUATERNION_XYZW if is_rotation
+                             else result[max(0, start_frame - 1)])
+            if result is None:
+                result = numpy.empty((self.frame_count, width))
+                result[:] = IDENTITY_QUATERNION_XYZW if is_rotation else values[0]
+
+            # ease in over the overlap, the first and last frames are never fully either clip
+            factors = numpy.arange(1, blend_frames + 1) / (blend_frames + 1)
+            factors = factors * factors * (3 - 2 * factors)
+            blend_end = start_frame + blend_frames
+            previous_values = result[start_frame:blend_end]
+            if is_rotation:
+                result[start_frame:blend_end] = slerp_quaternions(
+                    previous_values, values[:blend_frames], factors)
+            else:
+                result[start_frame:blend_end] = previous_values + \
+                    (values[:blend_frames] - previous_values) * factors[:, None]
+            result[blend_end:start_frame + frame_count] = values[blend_frames:]
+        return result
+
+    def stitch(self) -> T2MFramesArrays:
+        """Join the clips into one clip, keyed on every frame"""
+        times = numpy.arange(self.frame_count) / self.fps
+        empty_times = numpy.empty(0, dtype=numpy.float64)
+        bones: dict[str, T2MTrackArrays] = {}
+        for bone_name in self.get_bone_names():
+            rotations = self._stitch_values(bone_name, 4, True)
+            positions = self._stitch_values(bone_name, 3, False)
+            bones[bone_name] = T2MTrackArrays(
+                times if rotations is not None else empty_times,
+                rotations if rotations is not None else numpy.empty((0, 4)),
+                times if positions is not None else empty_times,
+                positions if positions is not None else numpy.empty((0, 3)),
+            )
+        prompts = [clip.prompt for clip in self.clips if clip.prompt]
+        return T2MFramesArrays(
+            max(0, self.frame_count - 1) / self.fps, bones, "; ".join(prompts) or None)
@@ -1,188 +1,625 @@
+from contextlib import contextmanager
 from enum import Enum
 import math
-from .t2m_animation import T2MFrames
+import os
+import queue
+import threading
+from collections.abc import Callable
+from .t2m_animation import T2MFramesArrays, T2MTrackArrays
+from .t2m_stream import T2MFramesStreamDecoder
+from .t2m_jobs import tag_redraw_view3d
+from .t2m_cache import T2MResponseCache, make_cache_key
+from .t2m_skeleton_cache import T2MSkeletonCache
+from .t2m_bone_map import T2MBoneMap, T2MBoneMapProfile, compile_bone_map
+from .t2m_timing import T2MGenerationTimings, timing_span
+from .t2m_reduce import (DEFAULT_ANGLE_TOLERANCE_RADIANS, DEFAULT_LOCATION_TOLERANCE,
+                         reduce_keyframes_mask, rotation_errors)
+from .t2m_resample import resample_track
+from .t2m_root_motion import ROOT_MOTION_GROUNDED, extract_root_motion, to_object_space
+from .t2m_retry import REQUEST_BURST, REQUEST_RATE_PER_SECOND, T2MRetryPolicy, make_token_bucket
+from .t2m_math import retarget_rotations
+from .t2m_single_flight import T2MSingleFlight
+from .t2m_save_file import pack_frames, unpack_frames
+from .t2m_http import T2MRestClient
+from . import t2m_skeleton
 import logging
 import bpy
-import bpy_extras
-import mathutils
+import numpy
 
 import text2motion_client_api.api
 import text2motion_client_api.api.generate_api
 import text2motion_client_api.models
 from text2motion_client_api.models.skeleton import Skeleton
-from text2motion_client_api.models.bone import Bone
 
 
 logger = logging.getLogger("text2motion")
 
 
-def matrix_to_list(matrix: mathutils.Matrix):
-    result = [0]*16
-    for i in range(4):
-        for j in range(4):
-            result[i+j*4] = matrix[i][j]
-    return result
+skeleton_cache = T2MSkeletonCache()
+response_cache: T2MResponseCache | None = None
+# shared by every request so concurrent generations stay under one request rate, see
+# set_request_rate_limit
+retry_policy = T2MRetryPolicy(token_bucket=make_token_bucket(REQUEST_RATE_PER_SECOND, REQUEST_BURST))
+# decimals of the skeleton matrices sent to the server, see the add-on preferences
+skeleton_matrix_precision = t2m_skeleton.DEFAULT_MATRIX_PRECISION
+# identical requests in flight at the same time, e.g. one prompt on several identical rigs, share one call
+request_flight = T2MSingleFlight()
+# action property with the packed frames the action was keyed from, see get_generated_frames
+GENERATED_FRAMES_PROPERTY = "t2m_frames"
+# the object property ROOT_MOTION_OBJECT keys, offsetting the object from its own location
+OBJECT_TRANSLATION_DATA_PATH = "delta_location"
 
+class ModelVersion(str, Enum):
+    STABLE = 'stable'
+    LAB_V_0_1_0 = 'labs (0.1.0)'
 
-BLENDER_FORWARD = "Y"
-BLENDER_UP = "Z"
-T2M_FORWARD = "-Z"
-T2M_UP = "Y"
-blender_to_t2m_matrix = bpy_extras.io_utils.axis_conversion(from_forward=BLENDER_FORWARD, from_up=BLENDER_UP,
-                                                            to_forward=T2M_FORWARD, to_up=T2M_UP).to_4x4()
 
-t2m_to_blender_matrix = bpy_extras.io_utils.axis_conversion(from_forward=T2M_FORWARD, from_up=T2M_UP,
-                                                            to_forward=BLENDER_FORWARD, to_up=BLENDER_UP).to_4x4()
+def _read_bone_rest_data(armature_data):
+    """Read bone names, parent indices and (N, 4, 4) row-major matrix_local from armature data"""
+    bones = armature_data.bones
+    matrices = numpy.empty(len(bones) * 16, dtype=numpy.float32)
+    bones.foreach_get("matrix_local", matrices)
+    # blender matrices are stored column-major
+    matrices = matrices.reshape(-1, 4, 4).transpose(0, 2, 1)
 
-cached_target_skeleton = None
-cached_active_object = None
+    names = [bone.name for bone in bones]
+    bone_indices = {name: index for index, name in enumerate(names)}
+    parent_indices = [bone_indices[bone.parent.name] if bone.parent else -1
+                      for bone in bones]
+    return names, parent_indices, matrices
 
-class ModelVersion(str, Enum):
-    STABLE = 'stable'
-    LAB_V_0_1_0 = 'labs (0.1.0)'
 
+def get_skeleton_fingerprint(armature_data) -> str:
+    """Cheap hash of the bone names, parents and rest matrices of an armature"""
+    return t2m_skeleton.get_skeleton_fingerprint(*_read_bone_rest_data(armature_data))
 
-def get_target_skeleton(active_object):
-    global cached_target_skeleton, cached_active_object
-    if active_object.type != 'ARMATURE':
+
+def group_armatures_by_skeleton(objects) -> list[list]:
+    """Group the armature objects whose skeletons match, one generation can animate a whole group"""
+    groups = {}
+    # armatures sharing the same data only need to be hashed once
+    fingerprints = {}
+    for obj in objects:
+        if obj.type != 'ARMATURE':
+            continue
+        armature_key = obj.data.name_full
+        if armature_key not in fingerprints:
+            fingerprints[armature_key] = get_skeleton_fingerprint(obj.data)
+        groups.setdefault(fingerprints[armature_key], []).append(obj)
+    return list(groups.values())
+
+
+def get_matching_armatures(target_object, candidates) -> list:
+    """Armatures among `candidates`, other than `target_object`, with the same skeleton"""
+    for group in group_armatures_by_skeleton([target_object, *candidates]):
+        if target_object in group:
+            return [obj for obj in group if obj != target_object]
+    return []
+
+
+def get_object_action(action, source_object, target_object):
+    """`action` as `target_object` should play it
+
+    Bone curves are in armature space and play the same on every armature, but the object
+    translation of ROOT_MOTION_OBJECT is keyed in the parent space of `source_object`, the object
+    the action was loaded on. A target rotated or scaled differently gets a copy of the action with
+    that translation mapped through its own transform, so it travels along its own forward axis.
+    """
+    fcurves = [action.fcurves.find(OBJECT_TRANSLATION_DATA_PATH, index=index) for index in range(3)]
+    if any(fcurve is None for fcurve in fcurves) or target_object == source_object:
+        return action
+    source_basis = numpy.array(source_object.matrix_basis.to_3x3())
+    target_basis = numpy.array(target_object.matrix_basis.to_3x3())
+    conversion = target_basis @ numpy.linalg.inv(source_basis)
+    if numpy.allclose(conversion, numpy.identity(3), atol=1e-6):
+        return action
+
+    key_counts = {len(fcurve.keyframe_points) for fcurve in fcurves}
+    if len(key_counts) != 1:
+        logger.warning(f"Object translation of {action.name} is keyed per axis, sharing it unchanged")
+        return action
+    key_count = key_counts.pop()
+
+    object_action = action.copy()
+    object_action.name = f"{action.name}_{target_object.name}"
+    object_action.use_fake_user = action.use_fake_user
+    # generated keys are written for all three axes at once, so their frames line up
+    co = numpy.empty((3, key_count * 2), dtype=numpy.float32)
+    for index, fcurve in enumerate(fcurves):
+        fcurve.keyframe_points.foreach_get("co", co[index])
+    co[:, 1::2] = conversion @ co[:, 1::2]
+    for index in range(3):
+        fcurve = object_action.fcurves.find(OBJECT_TRANSLATION_DATA_PATH, index=index)
+        fcurve.keyframe_points.foreach_set("co", co[index])
+        fcurve.update()
+    return object_action
+
+
+def assign_shared_action(action, target_objects, source_object=None):
+    """Play `action`, loaded on `source_object`, on every object of `target_objects`
+
+    Root motion is keyed relative to the object, so every object moves from its own position.
+    """
+    for target_object in target_objects:
+        target_object.animation_data_create()
+        target_object.animation_data.action = action if source_object is None else \
+            get_object_action(action, source_object, target_object)
+
+
+class T2MTargetSkeleton:
+    """Everything derived from an armature's rest data, cached together per armature"""
+
+    def __init__(
+            self,
+            skeleton: Skeleton,
+            bone_names: list[str],
+            bone_map: T2MBoneMap,
+            rotation_corrections: numpy.ndarray):
+        self.skeleton = skeleton
+        self.bone_names = bone_names
+        self.bone_map = bone_map
+        # (N, 4) rest rotation of every bone relative to its parent, in armature bone order
+        self.rotation_corrections = rotation_corrections
+
+
+def get_target(
+        target_object,
+        bone_map_profile: T2MBoneMapProfile | None = None,
+        timings: T2MGenerationTimings | None = None) -> T2MTargetSkeleton:
+    if target_object.type != 'ARMATURE':
         raise ValueError("Active object is not an armature")
 
-    if active_object != cached_active_object:
-        cached_target_skeleton = None
+    with timing_span(timings, "skeleton"):
+        armature_key = target_object.data.name_full
+        names, parent_indices, matrices = _read_bone_rest_data(target_object.data)
+        fingerprint = t2m_skeleton.get_skeleton_fingerprint(names, parent_indices, matrices)
+        if bone_map_profile:
+            # the bone map changes the skeleton sent to the server
+            fingerprint += bone_map_profile.fingerprint
+        # so does the precision of its matrices
+        precision = skeleton_matrix_precision
+        fingerprint += f":{precision}"
+        cached_target = skeleton_cache.get(armature_key, fingerprint)
+        if cached_target is None:
+            # identical rigs with their own armature data share one target skeleton
+            cached_target = skeleton_cache.find(fingerprint)
+            if cached_target:
+                skeleton_cache.put(armature_key, fingerprint, cached_target)
+        if timings:
+            timings.set("skeleton_bone_count", len(names))
+            timings.set("skeleton_cache_hit", cached_target is not None)
+        if cached_target:
+            logger.debug("Using cached target skeleton")
+            return cached_target
 
-    if not cached_target_skeleton:
         logger.debug("Loading target skeleton")
+        bone_map = compile_bone_map(names, bone_map_profile)
+        result = T2MTargetSkeleton(
+            t2m_skeleton.build_skeleton(bone_map.t2m_names, parent_indices, matrices, precision),
+            names,
+            bone_map,
+            t2m_skeleton.get_rotation_corrections(parent_indices, matrices))
+        skeleton_cache.put(armature_key, fingerprint, result)
+        return result
+
+
+def get_target_skeleton(
+        active_object,
+        timings: T2MGenerationTimings | None = None,
+        bone_map_profile: T2MBoneMapProfile | None = None) -> Skeleton:
+    return get_target(active_object, bone_map_profile, timings).skeleton
+
+
+def get_rotation_corrections(armature_data) -> dict:
+    """Rest pose rotation of every bone relative to its parent, by bone name"""
+    names, parent_indices, matrices = _read_bone_rest_data(armature_data)
+    corrections = t2m_skeleton.get_rotation_corrections(parent_indices, matrices)
+    return dict(zip(names, corrections))
+
+
+def _get_interpolation_value(interpolation: str) -> int:
+    # foreach_set takes the enum's integer value, not its identifier
+    return bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items[interpolation].value
+
+
+def _insert_keyframes_per_key(action, owner, data_path: str, frames, values,
+                              interpolation: str | None = None):
+    for frame, value in zip(frames, values):
+        setattr(owner, data_path, value)
+        owner.keyframe_insert(data_path=data_path, frame=frame)
+    if interpolation is None or len(frames) == 0:
+        return
+    fcurve_data_path = owner.path_from_id(data_path)
+    for index in range(len(values[0])):
+        fcurve = action.fcurves.find(fcurve_data_path, index=index)
+        for keyframe in fcurve.keyframe_points:
+            keyframe.interpolation = interpolation
+
+
+def _insert_keyframes_bulk(action, owner, data_path: str, frames, values,
+                           action_group: str | None = None,
+                           interpolation: str | None = None):
+    """Key `data_path` of a pose bone or an object, the fcurves are grouped by the owner's name
+
+    Keys use the user's default interpolation unless `interpolation` is given.
+    """
+    action_group = action_group or owner.name
+    fcurve_data_path = owner.path_from_id(data_path)
+    frames = numpy.asarray(frames, dtype=numpy.float32)
+    values = numpy.asarray(values, dtype=numpy.float32)
+    key_count = len(frames)
+    if key_count == 0:
+        return
+
+    # keyframe_points.co is a flat array of interleaved (frame, value) pairs
+    co = numpy.empty(key_count * 2, dtype=numpy.float32)
+    co[0::2] = frames
+    if interpolation is not None:
+        interpolations = numpy.full(key_count, _get_interpolation_value(interpolation),
+                                    dtype=numpy.int32)
+    for index in range(values.shape[1]):
+        fcurve = action.fcurves.find(fcurve_data_path, index=index)
+        if fcurve is None:
+            fcurve = action.fcurves.new(
+                fcurve_data_path, index=index, action_group=action_group)
+        fcurve.keyframe_points.add(key_count)
+        co[1::2] = values[:, index]
+        fcurve.keyframe_points.foreach_set("co", co)
+        if interpolation is not None:
+            fcurve.keyframe_points.foreach_set("interpolation", interpolations)
+        # sort the keys and recalculate the handles, same as keyframe_insert does
+        fcurve.update()
+
+
+def _insert_keyframes(
+        action,
+        owner,
+        data_path: str,
+        frames,
+        values,
+        use_bulk_keyframe_insert: bool = True,
+        action_group: str | None = None,
+        interpolation: str | None = None):
+    if use_bulk_keyframe_insert:
+        _insert_keyframes_bulk(action, owner, data_path, frames, values, action_group,
+                               interpolation)
     else:
-        logger.debug("Using cached target skeleton")
-        return cached_target_skeleton
+        _insert_keyframes_per_key(action, owner, data_path, frames, values, interpolation)
+
+
+class T2MFramesLoader:
+    """Applies generated frames to an armature a few bones at a time
+
+    Response text is passed to `push_chunk` as it arrives, possibly from another thread, and
+    `step` keys every bone whose track is complete. This lets long clips be loaded from a timer
+    while Blender keeps redrawing, and lets chunked responses be applied before they finish.
+    Frames that are already decoded are passed to `push_frames` instead.
+    """
+
+    def __init__(
+            self,
+            action_name: str = "T2MGeneratedAction",
+            root_motion_mode: str = ROOT_MOTION_GROUNDED,
+            use_bulk_keyframe_insert: bool = True,
+            target_object=None,
+            timings: T2MGenerationTimings | None = None,
+            reduce_keyframes: bool = False,
+            angle_tolerance: float = DEFAULT_ANGLE_TOLERANCE_RADIANS,
+            location_tolerance: float = DEFAULT_LOCATION_TOLERANCE,
+            resample_fps: float | None = None,
+            bone_map_profile: T2MBoneMapProfile | None = None,
+            root_motion_origin=None,
+            store_frames: bool = False):
+        # without an explicit target the active object is animated and put in pose mode,
+        # an explicit target can be loaded from contexts without a 3D view, e.g. a timer
+        if target_object is None:
+            target_object = bpy.context.active_object
+            bpy.ops.object.mode_set(mode='POSE')
+        self.target_object = target_object
+        self.root_motion_mode = root_motion_mode
+        # None makes the root motion relative to the first root position of the clip
+        self.root_motion_origin = root_motion_origin
+        self.use_bulk_keyframe_insert = use_bulk_keyframe_insert
+        self.timings = timings
+        self.reduce_keyframes = reduce_keyframes
+        self.angle_tolerance = angle_tolerance
+        self.location_tolerance = location_tolerance
+        # the tolerances bound the error of linear interpolation between the kept keys, Bezier
+        # handles would overshoot them
+        self.interpolation = 'LINEAR' if reduce_keyframes else None
+        # None keeps the generated timestamps, which may fall between frames
+        self.resample_fps = resample_fps
+        # keyframe values before and after reduction, summed over every channel
+        self.sample_count = 0
+        self.key_count = 0
+
+        target_object.animation_data_create()
+        self.action = bpy.data.actions.new(name=action_name)
+        target_object.animation_data.action = self.action
+
+        self.applied_bone_count = 0
+        # the number of tracks is unknown until the response is complete, the rig is the upper bound
+        self.expected_bone_count = max(1, len(target_object.pose.bones))
+        target = get_target(target_object, bone_map_profile)
+        self._bone_map = target.bone_map
+        self._rotation_corrections = target.rotation_corrections
+        # resolved once, the per bone loop only indexes
+        self._pose_bones = [target_object.pose.bones[name] for name in target.bone_names]
+        self.is_finished = False
+        # the bpy.app.timers callback stepping the loader, see load_frames_incrementally
+        self.step_timer = None
+        # the generated tracks before any processing, kept with the action for the clip library
+        # when asked for, they add about a megabyte per 30 seconds to the .blend file
+        self._generated_bones = {} if store_frames else None
+        self._decoder = T2MFramesStreamDecoder()
+        self._chunks = queue.SimpleQueue()
+        self._frames = None
+        self._frames_tracks = None
+
+    @property
+    def progress(self) -> float:
+        if self.is_finished:
+            return 1.0
+        return min(1.0, self.applied_bone_count / self.expected_bone_count)
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.sample_count / self.key_count if self.key_count else 1.0
+
+    def push_frames(self, frames: T2MFramesArrays):
+        self._frames = frames
+        self._frames_tracks = iter(frames.bones.items())
+        self.expected_bone_count = max(1, len(frames.bones))
+
+    def push_chunk(self, chunk: str):
+        self._chunks.put(chunk)
+
+    def finish_stream(self):
+        self._chunks.put(None)
+
+    def _drain_chunks(self):
+        while True:
+            try:
+                chunk = self._chunks.get_nowait()
+            except queue.Empty:
+                return
+            if chunk is None:
+                self._decoder.close()
+            else:
+                self._decoder.feed(chunk)
+
+    def step(self, max_bones: int | None = None) -> bool:
+        """Apply up to `max_bones` decoded bones, returns True once every bone has been applied"""
+        timings = self.timings
+        if self._frames is None:
+            with timing_span(timings, "decode"):
+                self._drain_chunks()
+            tracks = self._decoder.iter_tracks()
+        else:
+            tracks = self._frames_tracks
+
+        applied_in_step = 0
+        is_exhausted = True
+        while True:
+            # tracks are decoded lazily, so the time spent getting the next one is decoding
+            with timing_span(timings, "decode"):
+                next_track = next(tracks, None)
+            if next_track is None:
+                break
+            bone_name, track = next_track
+            if self._generated_bones is not None:
+                self._generated_bones[bone_name] = track
+            self._apply_track(bone_name, track)
+            self.applied_bone_count += 1
+            applied_in_step += 1
+            if max_bones and applied_in_step >= max_bones:
+                is_exhausted = False
+                break
+
+        if self._frames is None:
+            is_exhausted = self._decoder.is_complete
+            duration = self._decoder.duration
+            prompt = self._decoder.prompt
+        else:
+            duration = self._frames.duration
+            prompt = self._frames.prompt
+
+        if is_exhausted:
+            if duration is None:
+                raise ValueError("Generated frames are missing the duration")
+            scene = bpy.context.scene
+            scene.frame_start = 0
+            scene.frame_end = int(
+                math.ceil(duration * bpy.context.scene.render.fps))
+            if self._generated_bones is not None:
+                with timing_span(timings, "store_frames"):
+                    self.action[GENERATED_FRAMES_PROPERTY] = pack_frames(
+                        T2MFramesArrays(duration, self._generated_bones, prompt))
+            self.is_finished = True
+        return self.is_finished
+
+    def _apply_object_translation(self, root_bone, times, translation):
+        """Key the root bone's horizontal travel on the object's delta location
+
+        Delta location offsets the object from wherever it stands, so an action shared by several
+        armatures moves each of them from its own position. The travel follows this object's
+        rotation and scale, see get_object_action for other objects.
+        """
+        target_object = self.target_object
+        values = to_object_space(
+            translation, root_bone.bone.matrix_local, target_object.matrix_basis)
+        if self.reduce_keyframes:
+            with timing_span(self.timings, "reduce"):
+                mask = reduce_keyframes_mask(times, values, self.location_tolerance)
+            times = times[mask]
+            values = values[mask]
+        _insert_keyframes(self.action, target_object, OBJECT_TRANSLATION_DATA_PATH,
+                          times * bpy.context.scene.render.fps, values,
+                          self.use_bulk_keyframe_insert, "Object Transforms", self.interpolation)
+
+    def _apply_track(self, bone_name: str, track: T2MTrackArrays):
+        action = self.action
+        use_bulk_keyframe_insert = self.use_bulk_keyframe_insert
+
+        bone_index = self._bone_map.get_index(bone_name)
+        if bone_index is None:
+            logger.warning(f"Bone {bone_name} not found in armature")
+            return
+
+        current_bone = self._pose_bones[bone_index]
+        bone_name = current_bone.name
+
+        # put the bone in t-pose
+        current_bone.matrix_basis.identity()
+
+        timings = self.timings
+        if self.resample_fps:
+            with timing_span(timings, "resample"):
+                track = resample_track(track, self.resample_fps)
+
+        with timing_span(timings, "retarget"):
+            rotation_values = retarget_rotations(
+                track.rotation_values, self._rotation_corrections[bone_index])
+
+        # only the root bone has positions
+        with timing_span(timings, "root_motion"):
+            position_values, object_translation = extract_root_motion(
+                track.position_values, self.root_motion_mode, self.root_motion_origin)
+        rotation_times = track.rotation_times
+        position_times = track.position_times[:len(position_values)]
+        sample_count = rotation_values.size + position_values.size
+        if self.reduce_keyframes:
+            with timing_span(timings, "reduce"):
+                rotation_mask = reduce_keyframes_mask(
+                    rotation_times, rotation_values, self.angle_tolerance, rotation_errors)
+                position_mask = reduce_keyframes_mask(
+                    position_times, position_values, self.location_tolerance)
+            rotation_times = rotation_times[rotation_mask]
+            rotation_values = rotation_values[rotation_mask]
+            position_times = position_times[position_mask]
+            position_values = position_values[position_mask]
+        key_count = rotation_values.size + position_values.size
+        self.sample_count += sample_count
+        self.key_count += key_count
+
+        with timing_span(timings, "keyframes"):
+            _insert_keyframes(action, current_bone, 'rotation_quaternion',
+                              rotation_times * bpy.context.scene.render.fps, rotation_values,
+                              use_bulk_keyframe_insert, interpolation=self.interpolation)
+            _insert_keyframes(action, current_bone, 'location',
+                              position_times * bpy.context.scene.render.fps, position_values,
+                              use_bulk_keyframe_insert, interpolation=self.interpolation)
+            if object_translation is not None:
+                self._apply_object_translation(
+                    current_bone, track.position_times, object_translation)
+        if timings:
+            timings.count("bone_count")
+            timings.count("sample_count", sample_count)
+            timings.count("key_count", key_count)
 
-    my_armature = bpy.data.armatures[active_object.data.name]
-    root_armature_bone = my_armature.bones[0]
 
-    stack = []
-    t2m_root_bone = None
-    stack.append((root_armature_bone, None))
+def load_frames(
+        frames_str: str | T2MFramesArrays,
+        action_name: str = "T2MGeneratedAction",
+        root_motion_mode: str = ROOT_MOTION_GROUNDED,
+        use_bulk_keyframe_insert: bool = True,
+        target_object=None,
+        timings: T2MGenerationTimings | None = None,
+        reduce_keyframes: bool = False,
+        angle_tolerance: float = DEFAULT_ANGLE_TOLERANCE_RADIANS,
+        location_tolerance: float = DEFAULT_LOCATION_TOLERANCE,
+        resample_fps: float | None = None,
+        bone_map_profile: T2MBoneMapProfile | None = None,
+        root_motion_origin=None,
+        store_frames: bool = False):
+    loader = T2MFramesLoader(
+        action_name=action_name,
+        root_motion_mode=root_motion_mode,
+        use_bulk_keyframe_insert=use_bulk_keyframe_insert,
+        target_object=target_object,
+        timings=timings,
+        reduce_keyframes=reduce_keyframes,
+        angle_tolerance=angle_tolerance,
+        location_tolerance=location_tolerance,
+        resample_fps=resample_fps,
+        bone_map_profile=bone_map_profile,
+        root_motion_origin=root_motion_origin,
+        store_frames=store_frames)
+    if isinstance(frames_str, T2MFramesArrays):
+        loader.push_frames(frames_str)
+    else:
+        loader.push_chunk(frames_str)
+        loader.finish_stream()
+    loader.step()
+    return loader.action
 
-    while len(stack) > 0:
-        current_armature_bone, parent = stack.pop()
 
-        current_bone_name = current_armature_bone.name.replace(
-            "mixamorig:", "mixamorig")
+def get_generated_frames(action) -> T2MFramesArrays | None:
+    """Generated frames an action was keyed from, None for actions keyed before they were stored
 
-        current_pose_bone = active_object.pose.bones[current_armature_bone.name]
+    Raises ValueError if the stored frames are corrupt.
+    """
+    if GENERATED_FRAMES_PROPERTY not in action:
+        return None
+    return unpack_frames(action[GENERATED_FRAMES_PROPERTY])
 
-        # set bone to reset pose before fetching the matrix
-        current_pose_bone.matrix_basis.identity()
 
-        if current_armature_bone.parent:
-            converted_m = current_armature_bone.parent.matrix_local.inverted_safe(
-            ) @ current_armature_bone.matrix_local
-        else:
-            converted_m = blender_to_t2m_matrix @ current_armature_bone.matrix_local
+def tag_generated_action(action, prompt: str, model_version: str, cache_key: str):
+    action["t2m_prompt"] = prompt
+    action["t2m_model_version"] = model_version
+    action["t2m_cache_key"] = cache_key
 
-        matrix = matrix_to_list(converted_m)
 
-        t2m_bone = Bone(
-            name=current_bone_name,
-            matrix=matrix,
-            children=[],
-        )
+INCREMENTAL_LOAD_BONES_PER_STEP = 4
+INCREMENTAL_LOAD_INTERVAL_SECONDS = 0.01
+active_loaders: list[T2MFramesLoader] = []
 
-        if parent:
-            parent.children.append(t2m_bone)
-        else:
-            t2m_root_bone = t2m_bone
 
-        for child in current_armature_bone.children:
-            stack.append((child, t2m_bone))
+def load_frames_incrementally(
+        loader: T2MFramesLoader,
+        bones_per_step: int = INCREMENTAL_LOAD_BONES_PER_STEP,
+        on_finished: Callable | None = None):
+    """Step `loader` from a `bpy.app.timers` callback so the viewport updates between steps
 
-    world_matrix = matrix_to_list(mathutils.Matrix.Identity(4))
+    `on_finished(loader, error)` is called once every bone has been applied or loading failed.
+    """
+    active_loaders.append(loader)
 
-    result = Skeleton(
-        root=t2m_root_bone,
-        world_matrix=world_matrix,
-    )
-    cached_active_object = active_object
-    cached_target_skeleton = result
-    return result
+    def step_loader():
+        error = None
+        try:
+            is_finished = loader.step(bones_per_step)
+        except Exception as e:
+            logger.exception("Failed to load generated frames")
+            is_finished = True
+            error = e
 
+        tag_redraw_view3d()
+        if not is_finished:
+            return INCREMENTAL_LOAD_INTERVAL_SECONDS
 
-def load_frames(
-        frames_str: str,
-        action_name: str = "T2MGeneratedAction",
-        apply_root_motion: bool = True):
-    active_object = bpy.context.active_object
-    active_object.animation_data_create()
-    active_object.animation_data.action = bpy.data.actions.new(
-        name=action_name)
-    bpy.ops.object.mode_set(mode='POSE')
-
-    frames: T2MFrames = T2MFrames.model_validate_json(frames_str)
-    scene = bpy.context.scene
-    scene.frame_start = 0
-    scene.frame_end = int(
-        math.ceil(frames.duration * bpy.context.scene.render.fps))
-
-    for bone_name, track in frames.bones.items():
-        bone_name = bone_name.replace("mixamorig", "mixamorig:")
-
-        if bone_name not in active_object.pose.bones:
-            logger.warning(f"Bone {bone_name} not found in armature")
-            continue
+        active_loaders.remove(loader)
+        loader.step_timer = None
+        if on_finished:
+            on_finished(loader, error)
+        return None
 
-        current_bone = active_object.pose.bones[bone_name]
-        current_armature_bone = active_object.data.bones[bone_name]
-
-        if not apply_root_motion:
-            # Assuming only root bone has both position and rotation transformation.
-            if len(track.position.items()) > 0 and len(track.rotation.items()) > 0:
-                logger.debug(
-                    f"Skipping frames for root bone {bone_name} as root motion is disabled")
-                continue
-
-        for frame_timestamp_str, quaternion_list in track.rotation.items():
-            frame = float(
-                frame_timestamp_str) * bpy.context.scene.render.fps
-
-            # server side is (x, y, z, w), blender is (w, x, y, z)
-            q = mathutils.Quaternion(
-                [
-                    quaternion_list[3],
-                    quaternion_list[0],
-                    quaternion_list[1],
-                    quaternion_list[2]
-                ])
-            m = q.normalized().to_matrix().to_4x4()
-
-            # put the bone in t-pose
-            current_bone.matrix_basis.identity()
-
-            if current_armature_bone.parent:
-                converted_m = current_armature_bone.matrix_local.inverted_safe(
-                ) @ current_armature_bone.parent.matrix_local @ m
-            else:
-                converted_m = m
+    loader.step_timer = step_loader
+    bpy.app.timers.register(step_loader)
 
-            current_bone.rotation_quaternion = converted_m.to_quaternion()
-            current_bone.keyframe_insert(
-                data_path='rotation_quaternion', frame=frame)
 
-        first_y = None
-        for frame_timestamp_str, vector3 in track.position.items():
-            if first_y is None:
-                first_y = vector3[1]
-                vector3[1] = 0.0
-            else:
-                vector3[1] = vector3[1] - first_y
+def stop_incremental_load(loader: T2MFramesLoader):
+    """Stop stepping `loader` without calling its `on_finished`, the bones keyed so far are kept"""
+    if loader in active_loaders:
+        active_loaders.remove(loader)
+    if loader.step_timer is not None and bpy.app.timers.is_registered(loader.step_timer):
+        bpy.app.timers.unregister(loader.step_timer)
+    loader.step_timer = None
 
-            frame = float(
-                frame_timestamp_str) * bpy.context.scene.render.fps
-            current_bone.location[0] = vector3[0]
-            current_bone.location[1] = vector3[1]
-            current_bone.location[2] = vector3[2]
 
-            current_bone.keyframe_insert(
-                data_path='location', frame=frame)
+def stop_incremental_loads():
+    for loader in active_loaders:
+        stop_incremental_load(loader)
 
 
 def make_server_request(
@@ -190,22 +627,195 @@ def make_server_request(
         target_skeleton: Skeleton, 
         seconds: int,
         api_key: str,
-        model_version: ModelVersion = ModelVersion.STABLE
+        model_version: ModelVersion = ModelVersion.STABLE,
+        bypass_cache: bool = False,
+        timings: T2MGenerationTimings | None = None,
+        request_retry_policy: T2MRetryPolicy | None = None
         ):
+    """Generated frames JSON for a prompt, from the response cache or the server
+
+    Requests are retried and rate limited by the shared `retry_policy` unless
+    `request_retry_policy` is given.
+    """
+    cache_key = get_request_cache_key(prompt, target_skeleton, seconds, model_version)
+    request_retry_policy = request_retry_policy or retry_policy
+    if bypass_cache:
+        # a request bypassing the cache asks for a new variation, so it is never shared
+        return _fetch_response(
+            prompt, target_skeleton, seconds, api_key, model_version, True, timings, cache_key,
+            request_retry_policy)
+
+    # the cache key hashes the skeleton's content, so identical rigs coalesce too
+    future, is_leader = request_flight.join(cache_key)
+    if is_leader:
+        return request_flight.resolve(cache_key, future, lambda: _fetch_response(
+            prompt, target_skeleton, seconds, api_key, model_version, False, timings, cache_key,
+            request_retry_policy))
+
+    logger.info(f"Sharing the identical request in flight for prompt: {prompt}")
+    with timing_span(timings, "request_wait"):
+        response = future.result()
+    if timings:
+        timings.set("coalesced", True)
+        timings.set("response_bytes", len(response or ""))
+    return response
+
+
+def _fetch_response(
+        prompt: str,
+        target_skeleton: Skeleton,
+        seconds: int,
+        api_key: str,
+        model_version: ModelVersion,
+        bypass_cache: bool,
+        timings: T2MGenerationTimings | None,
+        cache_key: str,
+        request_retry_policy: T2MRetryPolicy):
+    # bypassing the cache only skips the lookup, the new response still replaces the cached one
+    if response_cache is not None and not bypass_cache:
+        with timing_span(timings, "cache_lookup"):
+            cached_response = response_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Using cached Text2Motion response for prompt: {prompt}")
+            if timings:
+                timings.set("cache_hit", True)
+                timings.set("response_bytes", len(cached_response))
+            return cached_response
+
+    def on_retry(attempt, delay, error):
+        if timings:
+            timings.count("retries")
+
+    # the round trip includes generation on the server, the service reports no separate timing
+    with timing_span(timings, "request"):
+        response = request_retry_policy.call(
+            lambda: _request_server(prompt, target_skeleton, seconds, api_key, model_version),
+            on_retry=on_retry)
+    if timings:
+        timings.set("cache_hit", False)
+        timings.set("skeleton_bytes", len(target_skeleton.to_json()))
+        timings.set("response_bytes", len(response or ""))
+    if response_cache is not None and response:
+        with timing_span(timings, "cache_store"):
+            response_cache.put(cache_key, response)
+    return response
+
+
+def get_request_cache_key(
+        prompt: str,
+        target_skeleton: Skeleton,
+        seconds: int,
+        model_version: ModelVersion) -> str:
+    return make_cache_key(prompt, target_skeleton, seconds, ModelVersion(model_version).value)
+
+
+def get_cached_response(cache_key: str) -> str | None:
+    if response_cache is None:
+        return None
+    return response_cache.get(cache_key)
+
+
+def set_request_rate_limit(rate_per_second: float, burst: int = REQUEST_BURST):
+    """Limit the requests of every generation to `rate_per_second`, 0 removes the limit"""
+    retry_policy.token_bucket = make_token_bucket(rate_per_second, burst)
+
+
+def set_response_cache(cache: T2MResponseCache | None):
+    global response_cache
+    response_cache = cache
+
+
+# can be pointed at a local server, e.g. benchmarks/mock_server.py
+API_HOST = os.environ.get("T2M_API_HOST", "https://api.text2motion.ai")
+# enough keep-alive connections for the largest batch concurrency
+MAX_POOL_CONNECTIONS = 16
+
+
+class T2MClientManager:
+    """Owns a long lived ApiClient so its connection pool is reused across requests
+
+    The client is created on first use and replaced when the API key changes. Requests lease the
+    client with `generate_api`, and a replaced client is only closed once its last lease is
+    released, so a request in flight on a worker keeps its connections. Its transport sends
+    compressed request bodies while `compress_requests` is set, see t2m_http.
+    """
+
+    def __init__(self, host: str = API_HOST, compress_requests: bool = True):
+        self.host = host
+        self.compress_requests = compress_requests
+        self._api_key = None
+        self._api_client = None
+        # leases of every client still in use by id, replaced clients included
+        self._lease_counts = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def generate_api(self, api_key: str):
+        """GenerateApi of the pooled client for `api_key`, held for the duration of a request"""
+        with self._lock:
+            if self._api_client is None or api_key != self._api_key:
+                self._retire_client()
+                configuration = text2motion_client_api.Configuration(
+                    host=self.host
+                )
+                configuration.api_key['APIKeyHeader'] = api_key
+                configuration.connection_pool_maxsize = MAX_POOL_CONNECTIONS
+                self._api_client = text2motion_client_api.ApiClient(configuration)
+                self._api_client.rest_client = T2MRestClient(configuration, self.compress_requests)
+                self._api_key = api_key
+            api_client = self._api_client
+            self._lease_counts[id(api_client)] = self._lease_counts.get(id(api_client), 0) + 1
+        try:
+            yield text2motion_client_api.GenerateApi(api_client)
+        finally:
+            with self._lock:
+                self._lease_counts[id(api_client)] -= 1
+                is_retired = api_client is not self._api_client
+                if is_retired and not self._lease_counts[id(api_client)]:
+                    del self._lease_counts[id(api_client)]
+                    _close_api_client(api_client)
+
+    def set_compress_requests(self, compress_requests: bool):
+        with self._lock:
+            self.compress_requests = compress_requests
+            if self._api_client is not None:
+                self._api_client.rest_client.compress_requests = compress_requests
+
+    def _retire_client(self):
+        # new requests get a new client, one still leased is closed by its last request
+        api_client = self._api_client
+        self._api_client = None
+        self._api_key = None
+        if api_client is not None and not self._lease_counts.get(id(api_client)):
+            self._lease_counts.pop(id(api_client), None)
+            _close_api_client(api_client)
+
+    def close(self):
+        with self._lock:
+            self._retire_client()
+
+
+def _close_api_client(api_client):
+    api_client.rest_client.pool_manager.clear()
+
+
+client_manager = T2MClientManager()
+
+
+def _request_server(
+        prompt: str,
+        target_skeleton: Skeleton,
+        seconds: int,
+        api_key: str,
+        model_version: ModelVersion):
     logger.info(f"Requesting Text2Motion Server with prompt: {prompt}")
-    configuration = text2motion_client_api.Configuration(
-        host="https://api.text2motion.ai"
+    generate_request_body = text2motion_client_api.GenerateRequestBody(
+        prompt=prompt,
+        target_skeleton=target_skeleton,
+        seconds=seconds,
     )
-    configuration.api_key['APIKeyHeader'] = api_key
-
-    with text2motion_client_api.ApiClient(configuration) as api_client:
-        api_instance = text2motion_client_api.GenerateApi(api_client)
-        generate_request_body = text2motion_client_api.GenerateRequestBody(
-            prompt=prompt,
-            target_skeleton=target_skeleton,
-            seconds=seconds,
-        )
 
+    with client_manager.generate_api(api_key) as api_instance:
         match model_version:
             case ModelVersion.LAB_V_0_1_0:
                 api_response = api_instance.generate_api_labs010_generate_post(
@@ -213,4 +823,4 @@ def make_server_request(
             case _:
                 api_response = api_instance.generate_api_generate_post(
                     generate_request_body)
-        return api_response.result
+    return api_response.result
@@ -0,0 +1,147 @@
+"""Skeleton math shared by the add-on, benchmarks and tools, free of bpy
+
+Bone rest data is passed around as plain arrays: bone names, parent indices (-1 for roots)
+and (N, 4, 4) row-major `matrix_local` matrices.
+"""
+import functools
+import hashlib
+from collections.abc import Sequence
+
+import numpy
+from text2motion_client_api.models.bone import Bone
+from text2motion_client_api.models.skeleton import Skeleton
+
+from .t2m_math import IDENTITY_QUATERNION, matrices_to_quaternions
+
+BLENDER_FORWARD = "Y"
+BLENDER_UP = "Z"
+T2M_FORWARD = "-Z"
+T2M_UP = "Y"
+# decimals of the rest matrices sent to the server, below the precision of blender's float32 matrices
+DEFAULT_MATRIX_PRECISION = 6
+
+_AXES = {
+    "X": (1.0, 0.0, 0.0),
+    "Y": (0.0, 1.0, 0.0),
+    "Z": (0.0, 0.0, 1.0),
+    "-X": (-1.0, 0.0, 0.0),
+    "-Y": (0.0, -1.0, 0.0),
+    "-Z": (0.0, 0.0, -1.0),
+}
+
+
+def _axis_basis(forward: str, up: str) -> numpy.ndarray:
+    forward_vector = numpy.array(_AXES[forward])
+    up_vector = numpy.array(_AXES[up])
+    if forward.lstrip("-") == up.lstrip("-"):
+        raise ValueError("Invalid axis arguments passed, can't use up/forward on the same axis")
+    return numpy.column_stack((numpy.cross(forward_vector, up_vector), forward_vector, up_vector))
+
+
+@functools.cache
+def axis_conversion(
+        from_forward: str = "Y",
+        from_up: str = "Z",
+        to_forward: str = "Y",
+        to_up: str = "Z") -> numpy.ndarray:
+    """4x4 matrix converting between axis conventions, like bpy_extras.io_utils.axis_conversion"""
+    result = numpy.identity(4)
+    result[:3, :3] = _axis_basis(to_forward, to_up) @ _axis_basis(from_forward, from_up).T
+    result.flags.writeable = False
+    return result
+
+
+def get_blender_to_t2m_matrix() -> numpy.ndarray:
+    return axis_conversion(BLENDER_FORWARD, BLENDER_UP, T2M_FORWARD, T2M_UP)
+
+
+def get_t2m_to_blender_matrix() -> numpy.ndarray:
+    return axis_conversion(T2M_FORWARD, T2M_UP, BLENDER_FORWARD, BLENDER_UP)
+
+
+def matrix_to_list(matrix) -> list[float]:
+    """Flatten a 4x4 matrix column by column, the layout the server expects"""
+    return numpy.asarray(matrix, dtype=numpy.float64).T.reshape(16).tolist()
+
+
+def get_skeleton_fingerprint(
+        names: Sequence[str],
+        parent_indices: Sequence[int],
+        matrices: numpy.ndarray) -> str:
+    """Cheap hash of the bone names, parents and rest matrices of a skeleton"""
+    fingerprint = hashlib.sha1(numpy.ascontiguousarray(matrices, dtype=numpy.float32).tobytes())
+    fingerprint.update(numpy.asarray(parent_indices, dtype=numpy.int32).tobytes())
+    fingerprint.update("\0".join(names).encode())
+    return fingerprint.hexdigest()
+
+
+def build_skeleton(
+        names: Sequence[str],
+        parent_indices: Sequence[int],
+        matrices: numpy.ndarray,
+        precision: int | None = DEFAULT_MATRIX_PRECISION) -> Skeleton:
+    """Build the target skeleton from rest data only, the pose is never read or modified
+
+    `names` are the Text2Motion names of the bones, see t2m_bone_map. The matrices are rounded to
+    `precision` decimals, which keeps the request small, None sends them unrounded.
+    """
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)
+    parent_indices = numpy.asarray(parent_indices)
+    has_parent = parent_indices >= 0
+
+    # parent relative matrices for every bone in one batch, the root is converted to T2M axes
+    local_matrices = numpy.empty_like(matrices)
+    local_matrices[has_parent] = numpy.linalg.inv(
+        matrices[parent_indices[has_parent]]) @ matrices[has_parent]
+    local_matrices[~has_parent] = get_blender_to_t2m_matrix() @ matrices[~has_parent]
+    if precision is not None:
+        # + 0.0 turns -0.0 into 0.0
+        local_matrices = numpy.round(local_matrices, precision) + 0.0
+    # same column-major layout as matrix_to_list
+    matrix_lists = local_matrices.transpose(0, 2, 1).reshape(-1, 16).tolist()
+
+    children = [[] for _ in names]
+    for index, parent_index in enumerate(parent_indices):
+        if parent_index >= 0:
+            children[parent_index].append(index)
+
+    stack = []
+    t2m_root_bone = None
+    stack.append((0, None))
+
+    while len(stack) > 0:
+        index, parent = stack.pop()
+
+        t2m_bone = Bone(
+            name=names[index],
+            matrix=matrix_lists[index],
+            children=[],
+        )
+
+        if parent:
+            parent.children.append(t2m_bone)
+        else:
+            t2m_root_bone = t2m_bone
+
+        for child_index in children[index]:
+            stack.append((child_index, t2m_bone))
+
+    return Skeleton(
+        root=t2m_root_bone,
+        world_matrix=matrix_to_list(numpy.identity(4)),
+    )
+
+
+def get_rotation_corrections(
+        parent_indices: Sequence[int],
+        matrices: numpy.ndarray) -> numpy.ndarray:
+    """(N, 4) rotation of every bone relative to its parent's rest pose, identity for roots"""
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)
+    parent_indices = numpy.asarray(parent_indices)
+    has_parent = parent_indices >= 0
+
+    corrections = numpy.tile(IDENTITY_QUATERNION, (len(matrices), 1))
+    if has_parent.any():
+        corrections[has_parent] = matrices_to_quaternions(
+            numpy.linalg.inv(matrices[has_parent]) @ matrices[parent_indices[has_parent]])
+    return corrections
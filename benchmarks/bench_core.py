@@ -0,0 +1,96 @@
+"""Benchmark of the bpy-free core, runs in plain CPython
+
+    python benchmarks/bench_core.py --durations 1 5 10 30
+
+Measures decoding, retargeting and skeleton building on synthetic data without Blender, so it
+can run on CI machines. The add-on package is imported without running its __init__, which
+registers Blender classes.
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from functools import partial
+
+import numpy
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIRECTORY = os.path.join(os.path.dirname(BENCHMARKS_DIRECTORY), "addons", "text2motion")
+sys.path.insert(0, BENCHMARKS_DIRECTORY)
+
+
+def import_core_package():
+    spec = importlib.machinery.ModuleSpec("text2motion", None, is_package=True)
+    spec.submodule_search_locations = [ADDON_DIRECTORY]
+    sys.modules["text2motion"] = importlib.util.module_from_spec(spec)
+
+
+import_core_package()
+
+from mock_server import make_synthetic_frames
+
+from text2motion.t2m_bone_map import compile_bone_map
+from text2motion.t2m_math import retarget_rotations
+from text2motion.t2m_skeleton import build_skeleton, get_rotation_corrections
+from text2motion.t2m_stream import decode_frames
+
+DEFAULT_DURATIONS = [1, 5, 10, 30]
+DEFAULT_BONE_COUNT = 65
+
+
+def make_rest_data(bone_count: int):
+    """Binary tree of bones with random rest rotations, same layout as bench_hot_path"""
+    rng = numpy.random.default_rng(0)
+    names = [f"mixamorig:Bone{index}" for index in range(bone_count)]
+    parent_indices = [(index - 1) // 2 if index > 0 else -1 for index in range(bone_count)]
+    matrices = numpy.tile(numpy.identity(4, dtype=numpy.float32), (bone_count, 1, 1))
+    # orthonormal rest rotations from random matrices
+    rotations, _ = numpy.linalg.qr(rng.normal(size=(bone_count, 3, 3)))
+    matrices[:, :3, :3] = rotations * numpy.sign(numpy.linalg.det(rotations))[:, None, None]
+    matrices[:, :3, 3] = rng.normal(size=(bone_count, 3))
+    return names, parent_indices, matrices
+
+
+def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bpy-free Text2Motion core")
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS)
+    parser.add_argument("--bone-count", type=int, default=DEFAULT_BONE_COUNT)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names, parent_indices, matrices = make_rest_data(args.bone_count)
+    skeleton_ms = measure(
+        lambda: build_skeleton(compile_bone_map(names).t2m_names, parent_indices, matrices),
+        args.repeat)
+    print(f"build skeleton ({args.bone_count} bones): {skeleton_ms:.2f}ms")
+
+    corrections = dict(zip(
+        compile_bone_map(names).t2m_names, get_rotation_corrections(parent_indices, matrices)))
+    for duration in args.durations:
+        frames_str = json.dumps(make_synthetic_frames(list(corrections), duration))
+        decode_ms = measure(partial(decode_frames, frames_str), args.repeat)
+        frames = decode_frames(frames_str)
+
+        def retarget(frames=frames):
+            for bone_name, track in frames.bones.items():
+                retarget_rotations(track.rotation_values, corrections[bone_name])
+        retarget_ms = measure(retarget, args.repeat)
+        print(f"{duration:>4}s {len(frames_str) / 1e6:.2f}MB: "
+              f"decode {decode_ms:.1f}ms, retarget {retarget_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""End-to-end latency benchmark of the generate hot path
+
+Runs inside Blender against benchmarks/mock_server.py, so the numbers cover only the add-on:
+
+    blender -b --factory-startup --python benchmarks/bench_hot_path.py -- \\
+        --durations 1 5 10 30 --repeat 5 --output bench.json
+
+Every clip duration is measured in separate phases so regressions can be attributed:
+request (client serialization, HTTP round trip and response parsing with zero server latency),
+decode (response JSON to columnar frames), retarget (quaternion conversion of every track)
+and keyframes (writing the fcurves, bulk and per key).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from functools import partial
+
+import bpy
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIRECTORY)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIRECTORY), "addons"))
+
+from mock_server import start_mock_server
+
+from text2motion import t2m_server_request_wrapper as wrapper
+from text2motion.t2m_math import retarget_rotations
+from text2motion.t2m_retry import T2MRetryPolicy
+from text2motion.t2m_stream import decode_frames
+
+DEFAULT_DURATIONS = [1, 5, 10, 30]
+# roughly the size of a mixamo rig
+DEFAULT_BONE_COUNT = 65
+
+
+def create_armature(bone_count: int):
+    """A binary tree of mixamo named bones, deep enough to exercise the rotation corrections"""
+    armature = bpy.data.armatures.new("T2MBenchmarkArmature")
+    armature_object = bpy.data.objects.new("T2MBenchmarkArmature", armature)
+    bpy.context.scene.collection.objects.link(armature_object)
+    bpy.context.view_layer.objects.active = armature_object
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = []
+    for index in range(bone_count):
+        edit_bone = armature.edit_bones.new(f"mixamorig:Bone{index}")
+        if index == 0:
+            edit_bone.head = (0, 0, 1)
+        else:
+            parent = edit_bones[(index - 1) // 2]
+            edit_bone.parent = parent
+            edit_bone.head = parent.tail
+        edit_bone.tail = (edit_bone.head[0] + 0.05 * (index % 3 - 1),
+                          edit_bone.head[1] + 0.05 * (index % 2),
+                          edit_bone.head[2] + 0.1)
+        edit_bone.roll = 0.1 * index
+        edit_bones.append(edit_bone)
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return armature_object
+
+
+def measure(fn, repeat: int) -> dict:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+    }, result
+
+
+def remove_action(armature_object, action):
+    armature_object.animation_data.action = None
+    bpy.data.actions.remove(action)
+
+
+def run_benchmark(durations, bone_count: int, repeat: int, per_key_max_duration: float) -> dict:
+    server = start_mock_server()
+    wrapper.client_manager.close()
+    wrapper.client_manager.host = server.url
+    # the response cache would turn every repeat into a disk read
+    wrapper.set_response_cache(None)
+
+    armature_object = create_armature(bone_count)
+    target_skeleton = wrapper.get_target_skeleton(armature_object)
+    corrections = {
+        name.replace("mixamorig:", "mixamorig"): correction
+        for name, correction in wrapper.get_rotation_corrections(armature_object.data).items()
+    }
+
+    results = []
+    for duration in durations:
+        row = {"duration_seconds": duration, "bone_count": bone_count}
+
+        # without a token bucket, the add-on's request rate limit would be measured as request time
+        row["request"], frames_str = measure(
+            partial(wrapper.make_server_request,
+                    "benchmark", target_skeleton, duration, "benchmark-key", bypass_cache=True,
+                    request_retry_policy=T2MRetryPolicy()),
+            repeat)
+        row["response_bytes"] = len(frames_str)
+
+        row["decode"], frames = measure(partial(decode_frames, frames_str), repeat)
+
+        def retarget(frames=frames):
+            for bone_name, track in frames.bones.items():
+                retarget_rotations(track.rotation_values, corrections[bone_name])
+        row["retarget"], _ = measure(retarget, repeat)
+
+        def insert_keyframes(use_bulk_keyframe_insert: bool, frames=frames):
+            action = wrapper.load_frames(
+                frames, action_name="T2MBenchmarkAction",
+                use_bulk_keyframe_insert=use_bulk_keyframe_insert,
+                target_object=armature_object, store_frames=False)
+            remove_action(armature_object, action)
+        row["keyframes_bulk"], _ = measure(partial(insert_keyframes, True), repeat)
+        # inserting key by key is orders of magnitude slower, long clips would dominate the run
+        if duration <= per_key_max_duration:
+            row["keyframes_per_key"], _ = measure(partial(insert_keyframes, False), repeat)
+
+        results.append(row)
+        print(format_row(row), flush=True)
+
+    server.shutdown()
+    wrapper.client_manager.close()
+    return {
+        "blender_version": bpy.app.version_string,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+PHASES = ["request", "decode", "retarget", "keyframes_bulk", "keyframes_per_key"]
+
+
+def format_row(row: dict) -> str:
+    phases = ", ".join(
+        f"{phase} {row[phase]['median_ms']:.1f}ms" for phase in PHASES if phase in row)
+    return f"{row['duration_seconds']:>4}s {row['response_bytes'] / 1e6:.2f}MB: {phases}"
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark the Text2Motion generate hot path")
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS)
+    parser.add_argument("--bone-count", type=int, default=DEFAULT_BONE_COUNT)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--per-key-max-duration", type=float, default=10,
+                        help="Skip the per key insertion benchmark for longer clips")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.durations, args.bone_count, args.repeat,
+                           args.per_key_max_duration)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Local stand-in for the Text2Motion generate endpoints
+
+Serves /api/generate and /api/labs/0.1.0/generate with synthetic T2MFrames for every bone of
+the requested target skeleton. Point the add-on at it with T2M_API_HOST:
+
+    python benchmarks/mock_server.py --port 8642 --latency 0.5
+    T2M_API_HOST=http://127.0.0.1:8642 blender ...
+"""
+import argparse
+import gzip
+import json
+import math
+import threading
+import time
+import uuid
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+GENERATE_PATHS = ("/api/generate", "/api/labs/0.1.0/generate")
+DEFAULT_FPS = 30
+DEFAULT_DURATION_SECONDS = 5
+
+
+def get_bone_names(target_skeleton: dict) -> list[str]:
+    names = []
+    stack = [target_skeleton["root"]]
+    while stack:
+        bone = stack.pop()
+        names.append(bone["name"])
+        stack.extend(reversed(bone.get("children") or []))
+    return names
+
+
+def make_synthetic_frames(
+        bone_names: list[str],
+        duration: float,
+        fps: int = DEFAULT_FPS,
+        prompt: str | None = None) -> dict:
+    """Smooth per-bone rotations for every frame, the first bone also gets root motion"""
+    frame_count = math.ceil(duration * fps) + 1
+    bones = {}
+    for bone_index, bone_name in enumerate(bone_names):
+        rotation = {}
+        position = {}
+        for frame in range(frame_count):
+            timestamp = frame / fps
+            angle = 0.3 * math.sin(2 * math.pi * timestamp + bone_index)
+            # rotation around a per-bone axis, server quaternions are (x, y, z, w)
+            axis = (math.sin(bone_index), math.cos(bone_index), 0.5)
+            axis_length = math.sqrt(sum(component * component for component in axis))
+            sin_half = math.sin(angle / 2) / axis_length
+            rotation[f"{timestamp:.6f}"] = [
+                axis[0] * sin_half, axis[1] * sin_half, axis[2] * sin_half, math.cos(angle / 2)]
+            if bone_index == 0:
+                position[f"{timestamp:.6f}"] = [
+                    0.1 * math.sin(timestamp), 1.0 + 0.05 * math.sin(4 * timestamp), timestamp]
+        bones[bone_name] = {"rotation": rotation, "position": position}
+    return {"duration": duration, "bones": bones, "prompt": prompt}
+
+
+class T2MMockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+            self,
+            address,
+            latency: float = 0.0,
+            fps: int = DEFAULT_FPS,
+            default_duration: float = DEFAULT_DURATION_SECONDS,
+            bone_count: int | None = None,
+            throttle_every: int = 0,
+            accepts_compressed_requests: bool = True):
+        super().__init__(address, T2MMockRequestHandler)
+        self.latency = latency
+        self.fps = fps
+        self.default_duration = default_duration
+        self.bone_count = bone_count
+        self.throttle_every = throttle_every
+        self.accepts_compressed_requests = accepts_compressed_requests
+        self.request_count = 0
+        # body bytes as sent over the wire, after any compression
+        self.received_bytes = 0
+        self.sent_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_request_number(self) -> int:
+        with self._lock:
+            self.request_count += 1
+            return self.request_count
+
+    def add_bytes(self, received_bytes: int = 0, sent_bytes: int = 0):
+        with self._lock:
+            self.received_bytes += received_bytes
+            self.sent_bytes += sent_bytes
+
+
+class T2MMockRequestHandler(BaseHTTPRequestHandler):
+    server: T2MMockServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: HTTPStatus, body: dict, headers: dict | None = None):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            content = gzip.compress(content)
+            self.send_header("Content-Encoding", "gzip")
+        self.server.add_bytes(sent_bytes=len(content))
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        if self.path not in GENERATE_PATHS:
+            self._send_json(HTTPStatus.NOT_FOUND, {"detail": "Not Found"})
+            return
+
+        request_number = self.server.next_request_number()
+        content = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.add_bytes(received_bytes=len(content))
+        content_encoding = self.headers.get("Content-Encoding", "identity")
+        if content_encoding != "identity" and not self.server.accepts_compressed_requests:
+            self._send_json(HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                            {"detail": f"Unsupported Content-Encoding {content_encoding}"})
+            return
+        if content_encoding == "gzip":
+            content = gzip.decompress(content)
+        elif content_encoding == "deflate":
+            content = zlib.decompress(content)
+        body = json.loads(content)
+        if self.server.throttle_every and request_number % self.server.throttle_every == 0:
+            self._send_json(HTTPStatus.TOO_MANY_REQUESTS,
+                            {"detail": "Too Many Requests"}, {"Retry-After": "1"})
+            return
+
+        time.sleep(self.server.latency)
+        bone_names = get_bone_names(body["target_skeleton"])
+        if self.server.bone_count:
+            bone_names = bone_names[:self.server.bone_count]
+        duration = body.get("seconds") or self.server.default_duration
+        frames = make_synthetic_frames(bone_names, duration, self.server.fps, body.get("prompt"))
+        self._send_json(HTTPStatus.OK, {
+            "result": json.dumps(frames),
+            "request_id": str(uuid.uuid4()),
+        })
+
+
+def start_mock_server(port: int = 0, **kwargs) -> T2MMockServer:
+    """Serve on a daemon thread, port 0 picks a free port"""
+    server = T2MMockServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Text2Motion generate API")
+    parser.add_argument("--port", type=int, default=8642)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds to wait before answering, simulates generation time")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION_SECONDS,
+                        help="Duration used when the request asks for automatic duration")
+    parser.add_argument("--bone-count", type=int,
+                        help="Only animate the first N bones of the target skeleton")
+    parser.add_argument("--throttle-every", type=int, default=0,
+                        help="Answer every Nth request with 429 Too Many Requests")
+    parser.add_argument("--no-compressed-requests", action="store_true",
+                        help="Answer compressed request bodies with 415 Unsupported Media Type")
+    args = parser.parse_args()
+
+    server = T2MMockServer(("127.0.0.1", args.port), latency=args.latency, fps=args.fps,
+                           default_duration=args.duration, bone_count=args.bone_count,
+                           throttle_every=args.throttle_every,
+                           accepts_compressed_requests=not args.no_compressed_requests)
+    print(f"Serving mock Text2Motion API on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
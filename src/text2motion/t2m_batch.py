@@ -0,0 +1,40 @@
+import logging
+import re
+
+logger = logging.getLogger("text2motion")
+
+
+class T2MBatchItem:
+    def __init__(self, prompt: str, target_object_name: str, action_name: str):
+        self.prompt = prompt
+        self.target_object_name = target_object_name
+        # armatures with the same skeleton that share the generated action
+        self.shared_object_names = []
+        self.action_name = action_name
+        self.cache_key = None
+        self.job = None
+        # decoded frames of a sequence item, kept until every prompt of the sequence is generated
+        self.frames = None
+        self.timings = None
+        # frames loader options when the item was submitted, the panel may change before it completes
+        self.loader_options = None
+
+
+def read_prompts(text: str) -> list[str]:
+    """One prompt per line, blank lines and lines starting with '#' are ignored"""
+    prompts = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            prompts.append(line)
+    return prompts
+
+
+def make_action_name(base_name: str, target_object_name: str, prompt_index: int) -> str:
+    name = f"{base_name}_{target_object_name}_{prompt_index:03d}"
+    # action names are limited to 63 bytes, keep the unique index at the end
+    if len(name.encode()) > 63:
+        suffix = f"_{prompt_index:03d}"
+        name = name.encode()[:63 - len(suffix)].decode(errors="ignore") + suffix
+    return re.sub(r"\s+", "_", name)
+
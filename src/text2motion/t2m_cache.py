@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger("text2motion")
+
+CACHE_FILE_EXTENSION = ".json"
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024
+
+
+def make_cache_key(prompt: str, target_skeleton, seconds: int, model_version: str) -> str:
+    """Stable content hash of everything that decides the generated animation"""
+    key_content = json.dumps(
+        {
+            "prompt": prompt,
+            "target_skeleton": target_skeleton.to_dict(),
+            "seconds": seconds,
+            "model_version": model_version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(key_content.encode("utf-8")).hexdigest()
+
+
+class T2MResponseCache:
+    """Size bounded on-disk LRU cache of raw T2MFrames JSON responses
+
+    Entries are plain files named after their key. The modification time of a file is
+    refreshed on every hit and the least recently used files are evicted first.
+    """
+
+    def __init__(self, directory: str, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        self.directory = directory
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                value = cache_file.read()
+            if not value:
+                raise ValueError("empty entry")
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except ValueError as e:
+            # entries are replaced atomically, so this is damage from outside, e.g. a full disk
+            logger.warning(f"Removing corrupt response cache entry {path}: {e}")
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: str):
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                cache_file.write(value)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write response cache entry {path}: {e}")
+            return
+        self.evict()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove response cache entry {path}: {e}")
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(CACHE_FILE_EXTENSION):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        with self._lock:
+            entries = self._entries()
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except OSError as e:
+                    logger.warning(f"Failed to evict response cache entry {path}: {e}")
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self.hits = 0
+            self.misses = 0
+
+    def get_size_bytes(self) -> int:
+        with self._lock:
+            return sum(size for _, size, _ in self._entries())
@@ -0,0 +1,71 @@
+"""Compressed transport for the generated API client
+
+Responses are requested with gzip or deflate encoding, urllib3 decodes them when they are read.
+JSON request bodies are serialized without whitespace and, from COMPRESSION_MIN_BYTES up, sent
+gzip compressed. A server that does not accept compressed bodies answers 415 Unsupported Media
+Type, the request is then sent again uncompressed and the client stops compressing.
+"""
+import gzip
+import json
+import logging
+from http import HTTPStatus
+
+import urllib3
+from text2motion_client_api import rest
+from text2motion_client_api.exceptions import ApiException
+
+logger = logging.getLogger("text2motion")
+
+ACCEPT_ENCODING = "gzip, deflate"
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_LEVEL = 6
+
+
+def encode_json_body(body) -> bytes:
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def _get_timeout(request_timeout):
+    # same conventions as rest.RESTClientObject.request
+    if isinstance(request_timeout, (int, float)) and request_timeout:
+        return urllib3.Timeout(total=request_timeout)
+    if isinstance(request_timeout, tuple) and len(request_timeout) == 2:
+        return urllib3.Timeout(connect=request_timeout[0], read=request_timeout[1])
+    return None
+
+
+class T2MRestClient(rest.RESTClientObject):
+    """REST client of the generated API with compact, compressed JSON bodies"""
+
+    def __init__(self, configuration, compress_requests: bool = True):
+        super().__init__(configuration)
+        self.compress_requests = compress_requests
+        self.sent_bytes = 0
+
+    def request(self, method, url, headers=None, body=None, post_params=None, _request_timeout=None):
+        headers = {**(headers or {}), "Accept-Encoding": ACCEPT_ENCODING}
+        content_type = headers.get("Content-Type") or ""
+        if body is None or post_params or "json" not in content_type.lower():
+            return super().request(method, url, headers, body, post_params, _request_timeout)
+
+        encoded_body = encode_json_body(body)
+        if self.compress_requests and len(encoded_body) >= COMPRESSION_MIN_BYTES:
+            response = self._send(
+                method, url, {**headers, "Content-Encoding": "gzip"},
+                gzip.compress(encoded_body, COMPRESSION_LEVEL), _request_timeout)
+            if response.status != HTTPStatus.UNSUPPORTED_MEDIA_TYPE:
+                return response
+            response.response.drain_conn()
+            logger.info("Server does not accept compressed requests, sending them uncompressed")
+            self.compress_requests = False
+        return self._send(method, url, headers, encoded_body, _request_timeout)
+
+    def _send(self, method, url, headers, body: bytes, request_timeout) -> rest.RESTResponse:
+        self.sent_bytes += len(body)
+        try:
+            response = self.pool_manager.request(
+                method.upper(), url, body=body, headers=headers,
+                timeout=_get_timeout(request_timeout), preload_content=False)
+        except urllib3.exceptions.SSLError as e:
+            raise ApiException(status=0, reason="\n".join([type(e).__name__, str(e)]))
+        return rest.RESTResponse(response)
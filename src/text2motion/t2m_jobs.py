@@ -0,0 +1,138 @@
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import bpy
+
+logger = logging.getLogger("text2motion")
+
+POLL_INTERVAL_SECONDS = 0.1
+MAX_WORKERS = 4
+
+_executor: ThreadPoolExecutor | None = None
+_jobs: list["T2MJob"] = []
+
+
+class T2MJob:
+    """Work running on a background thread whose result is handled on Blender's main thread"""
+
+    def __init__(
+            self,
+            name: str,
+            future: Future,
+            on_success: Callable | None = None,
+            on_error: Callable | None = None):
+        self.name = name
+        self.future = future
+        self.on_success = on_success
+        self.on_error = on_error
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.is_cancelled = False
+        self.error = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def cancel(self):
+        # a request already in flight cannot be interrupted, its result is discarded instead
+        self.is_cancelled = True
+        self.future.cancel()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=MAX_WORKERS, thread_name_prefix="text2motion")
+    return _executor
+
+
+def tag_redraw_view3d():
+    window_manager = bpy.context.window_manager
+    if not window_manager:
+        return
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def _finish_job(job: T2MJob):
+    job.finished_at = time.monotonic()
+    if job.is_cancelled:
+        logger.info(f"Discarding result of cancelled job {job.name}")
+        return
+
+    try:
+        result = job.future.result()
+    except Exception as e:  # noqa: BLE001 - any failure of the job goes to its on_error
+        job.error = e
+        if job.on_error:
+            job.on_error(job, e)
+        return
+
+    try:
+        if job.on_success:
+            job.on_success(job, result)
+    except Exception as e:
+        logger.exception(f"Failed to handle result of job {job.name}")
+        job.error = e
+
+
+def _poll_jobs() -> float | None:
+    for job in list(_jobs):
+        if job.is_cancelled or job.future.done():
+            _jobs.remove(job)
+            _finish_job(job)
+
+    tag_redraw_view3d()
+    if not _jobs:
+        # unregister the timer until the next job is submitted
+        return None
+    return POLL_INTERVAL_SECONDS
+
+
+def submit_job(
+        name: str,
+        fn: Callable,
+        *args,
+        on_success: Callable | None = None,
+        on_error: Callable | None = None,
+        executor: ThreadPoolExecutor | None = None,
+        **kwargs) -> T2MJob:
+    """Run `fn` on a worker thread
+
+    `on_success(job, result)` or `on_error(job, exception)` is called from a `bpy.app.timers`
+    callback once `fn` returns, so it is safe to modify Blender data from them.
+    Pass an `executor` to bound the concurrency of a group of jobs separately.
+    """
+    future = (executor or _get_executor()).submit(fn, *args, **kwargs)
+    job = T2MJob(name, future, on_success=on_success, on_error=on_error)
+    _jobs.append(job)
+    if not bpy.app.timers.is_registered(_poll_jobs):
+        bpy.app.timers.register(_poll_jobs, first_interval=POLL_INTERVAL_SECONDS)
+    return job
+
+
+def get_active_jobs() -> list[T2MJob]:
+    return list(_jobs)
+
+
+def shutdown():
+    global _executor
+    for job in _jobs:
+        job.cancel()
+    _jobs.clear()
+    if bpy.app.timers.is_registered(_poll_jobs):
+        bpy.app.timers.unregister(_poll_jobs)
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,96 @@
+import numpy
+
+IDENTITY_QUATERNION = (1.0, 0.0, 0.0, 0.0)
+
+
+def xyzw_to_wxyz(quaternions: numpy.ndarray) -> numpy.ndarray:
+    # server side is (x, y, z, w), blender is (w, x, y, z)
+    return quaternions[:, [3, 0, 1, 2]]
+
+
+def normalize_quaternions(quaternions: numpy.ndarray) -> numpy.ndarray:
+    norms = numpy.linalg.norm(quaternions, axis=1, keepdims=True)
+    result = numpy.divide(quaternions, norms,
+                          out=numpy.zeros_like(quaternions), where=norms != 0)
+    # degenerate samples fall back to the identity rotation
+    result[norms[:, 0] == 0] = IDENTITY_QUATERNION
+    return result
+
+
+def multiply_quaternions(a: numpy.ndarray, b: numpy.ndarray) -> numpy.ndarray:
+    """Hamilton product of (w, x, y, z) quaternions, broadcasting over the leading axis"""
+    aw, ax, ay, az = numpy.moveaxis(numpy.asarray(a, dtype=numpy.float64), -1, 0)
+    bw, bx, by, bz = numpy.moveaxis(numpy.asarray(b, dtype=numpy.float64), -1, 0)
+    return numpy.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def canonicalize_quaternions(quaternions: numpy.ndarray) -> numpy.ndarray:
+    # same convention as mathutils.Matrix.to_quaternion, w is never negative
+    return numpy.where(quaternions[:, :1] < 0, -quaternions, quaternions)
+
+
+def retarget_rotations(
+        rotations_xyzw: numpy.ndarray,
+        correction_wxyz=IDENTITY_QUATERNION) -> numpy.ndarray:
+    """Convert (N, 4) server rotations into (N, 4) blender pose bone rotations
+
+    `correction_wxyz` is the constant rotation of the bone relative to its parent's rest pose,
+    applied on the left of every sample.
+    """
+    rotations = normalize_quaternions(xyzw_to_wxyz(rotations_xyzw))
+    rotations = multiply_quaternions(correction_wxyz, rotations)
+    return canonicalize_quaternions(rotations)
+
+
+def matrices_to_quaternions(matrices: numpy.ndarray) -> numpy.ndarray:
+    """Convert (N, 3, 3) row-major rotation matrices into (N, 4) (w, x, y, z) quaternions
+
+    Scale is removed first like mathutils.Matrix.to_quaternion does.
+    """
+    matrices = numpy.asarray(matrices, dtype=numpy.float64)[:, :3, :3]
+    matrices = matrices / numpy.linalg.norm(matrices, axis=1, keepdims=True)
+    m00, m01, m02 = matrices[:, 0, 0], matrices[:, 0, 1], matrices[:, 0, 2]
+    m10, m11, m12 = matrices[:, 1, 0], matrices[:, 1, 1], matrices[:, 1, 2]
+    m20, m21, m22 = matrices[:, 2, 0], matrices[:, 2, 1], matrices[:, 2, 2]
+
+    # one candidate per largest component keeps the division well conditioned
+    candidates = numpy.stack((
+        (1 + m00 + m11 + m22, m21 - m12, m02 - m20, m10 - m01),
+        (m21 - m12, 1 + m00 - m11 - m22, m01 + m10, m02 + m20),
+        (m02 - m20, m01 + m10, 1 - m00 + m11 - m22, m12 + m21),
+        (m10 - m01, m02 + m20, m12 + m21, 1 - m00 - m11 + m22),
+    ))
+    # candidates is (case, component, N), the diagonal of each case is its largest component
+    traces = numpy.stack([candidates[case, case] for case in range(4)])
+    best_case = numpy.argmax(traces, axis=0)
+    indices = numpy.arange(len(matrices))
+    quaternions = candidates[best_case, :, indices]
+    quaternions /= 2 * numpy.sqrt(traces[best_case, indices])[:, None]
+    return canonicalize_quaternions(normalize_quaternions(quaternions))
+
+
+def slerp_quaternions(a: numpy.ndarray, b: numpy.ndarray, factors: numpy.ndarray) -> numpy.ndarray:
+    """Spherical interpolation between (N, 4) quaternions along the shorter arc
+
+    Works for either component order, nearly identical pairs fall back to normalized lerp.
+    """
+    a = numpy.asarray(a, dtype=numpy.float64)
+    b = numpy.asarray(b, dtype=numpy.float64)
+    factors = numpy.asarray(factors, dtype=numpy.float64)[:, None]
+    dots = numpy.einsum("ij,ij->i", a, b)[:, None]
+    b = numpy.where(dots < 0, -b, b)
+    dots = numpy.clip(numpy.abs(dots), 0.0, 1.0)
+
+    angles = numpy.arccos(dots)
+    sin_angles = numpy.sin(angles)
+    is_small = sin_angles < 1e-6
+    safe_sin_angles = numpy.where(is_small, 1.0, sin_angles)
+    weights_a = numpy.where(is_small, 1 - factors,
+                            numpy.sin((1 - factors) * angles) / safe_sin_angles)
+    weights_b = numpy.where(is_small, factors, numpy.sin(factors * angles) / safe_sin_angles)
+    return normalize_quaternions(weights_a * a + weights_b * b)
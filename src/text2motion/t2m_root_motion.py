@@ -0,0 +1,74 @@
+"""Root motion of generated animations
+
+The root bone is the only bone with a position track. Its positions are in the root bone's
+location space, where Y is up for Mixamo-like rigs. A mode decides how much of that motion the
+root bone keeps, and the OBJECT mode moves the horizontal travel onto the object instead.
+"""
+
+import numpy
+
+ROOT_MOTION_FULL = "FULL"
+ROOT_MOTION_GROUNDED = "GROUNDED"
+ROOT_MOTION_HORIZONTAL = "HORIZONTAL"
+ROOT_MOTION_IN_PLACE = "IN_PLACE"
+ROOT_MOTION_OBJECT = "OBJECT"
+ROOT_MOTION_NONE = "NONE"
+
+ROOT_MOTION_MODES = (
+    ROOT_MOTION_FULL,
+    ROOT_MOTION_GROUNDED,
+    ROOT_MOTION_HORIZONTAL,
+    ROOT_MOTION_IN_PLACE,
+    ROOT_MOTION_OBJECT,
+    ROOT_MOTION_NONE,
+)
+
+VERTICAL_AXIS = 1
+HORIZONTAL_AXES = [0, 2]
+
+
+def extract_root_motion(
+        positions: numpy.ndarray,
+        mode: str = ROOT_MOTION_GROUNDED,
+        origin: numpy.ndarray | None = None) -> tuple[numpy.ndarray, numpy.ndarray | None]:
+    """Split (N, 3) root positions into the root bone's positions and the object's translation
+
+    The object translation is None unless `mode` is ROOT_MOTION_OBJECT. With ROOT_MOTION_NONE the
+    root bone gets no positions at all and stays at its rest location. The motion is relative to
+    `origin`, the first position by default, so clips of one sequence can share the origin.
+    """
+    if mode not in ROOT_MOTION_MODES:
+        raise ValueError(f"Unknown root motion mode {mode}")
+    if mode == ROOT_MOTION_NONE:
+        return positions[:0], None
+    if mode == ROOT_MOTION_FULL or len(positions) == 0:
+        return positions, None
+
+    first_position = positions[0] if origin is None else numpy.asarray(origin)
+    root_positions = positions.copy()
+    # every other mode starts from the rest height, so a rig does not float above the ground
+    root_positions[:, VERTICAL_AXIS] -= first_position[VERTICAL_AXIS]
+    if mode == ROOT_MOTION_HORIZONTAL:
+        root_positions[:, VERTICAL_AXIS] = 0
+    elif mode in (ROOT_MOTION_IN_PLACE, ROOT_MOTION_OBJECT):
+        root_positions[:, HORIZONTAL_AXES] = first_position[HORIZONTAL_AXES]
+
+    object_translation = None
+    if mode == ROOT_MOTION_OBJECT:
+        object_translation = numpy.zeros_like(positions)
+        object_translation[:, HORIZONTAL_AXES] = \
+            positions[:, HORIZONTAL_AXES] - first_position[HORIZONTAL_AXES]
+    return root_positions, object_translation
+
+
+def to_object_space(
+        translation: numpy.ndarray,
+        root_rest_matrix: numpy.ndarray,
+        object_matrix: numpy.ndarray) -> numpy.ndarray:
+    """Map (N, 3) translations from the root bone's location space to the object's parent space
+
+    `root_rest_matrix` is the root bone's rest matrix in armature space and `object_matrix` is the
+    object's local matrix, only their 3x3 rotation and scale parts are used.
+    """
+    basis = numpy.asarray(object_matrix)[:3, :3] @ numpy.asarray(root_rest_matrix)[:3, :3]
+    return translation @ basis.T
@@ -0,0 +1,54 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+
+
+class T2MSingleFlight:
+    """Coalesces concurrent calls with the same key into one call
+
+    The first caller of a key becomes the leader and makes the call, callers arriving while it is in
+    flight get the leader's future and share its result or exception. Once the call finishes the
+    key is forgotten, so a later caller starts a new call.
+    """
+
+    def __init__(self):
+        self.coalesced_count = 0
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> tuple[Future, bool]:
+        """Future of the call in flight for `key`, and True if the caller leads and must `resolve` it"""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.coalesced_count += 1
+                return future, False
+            future = Future()
+            self._futures[key] = future
+            return future, True
+
+    def resolve(self, key: str, future: Future, fn: Callable):
+        """Call `fn()` as the leader of `key` and settle `future` with the outcome"""
+        try:
+            result = fn()
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def call(self, key: str, fn: Callable):
+        future, is_leader = self.join(key)
+        if is_leader:
+            return self.resolve(key, future, fn)
+        return future.result()
+
+    def _forget(self, key: str):
+        with self._lock:
+            self._futures.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._futures)
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 16
+
+
+class T2MSkeletonCache:
+    """LRU cache of target skeletons keyed by armature datablock
+
+    Every entry stores the fingerprint of the armature it was built from, a lookup with a
+    different fingerprint is a miss, so edited rigs are never served a stale skeleton.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, armature_key: str, fingerprint: str):
+        with self._lock:
+            entry = self._entries.get(armature_key)
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(armature_key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, armature_key: str, fingerprint: str, skeleton):
+        with self._lock:
+            self._entries[armature_key] = (fingerprint, skeleton)
+            self._entries.move_to_end(armature_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def find(self, fingerprint: str):
+        """Skeleton of any armature with `fingerprint`, identical rigs can share it"""
+        with self._lock:
+            for armature_key, entry in reversed(self._entries.items()):
+                if entry[0] == fingerprint:
+                    self._entries.move_to_end(armature_key)
+                    return entry[1]
+            return None
+
+    def get_fingerprint(self, armature_key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(armature_key)
+            return entry[0] if entry else None
+
+    def invalidate(self, armature_key: str):
+        with self._lock:
+            self._entries.pop(armature_key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,174 @@
+import json
+import re
+from collections.abc import Iterator
+
+from .t2m_animation import T2MFramesArrays, T2MTrackArrays
+
+# drop the consumed part of the buffer once it grows past this many characters
+_COMPACT_THRESHOLD = 1 << 16
+_NON_WHITESPACE = re.compile(r"\S")
+
+_START = "start"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_AFTER_VALUE = "after_value"
+_BONES_START = "bones_start"
+_BONE_KEY = "bone_key"
+_BONE_COLON = "bone_colon"
+_BONE_VALUE = "bone_value"
+_AFTER_BONE = "after_bone"
+_DONE = "done"
+
+
+class T2MFramesStreamDecoder:
+    """Incrementally decode T2MFrames JSON
+
+    Text can be fed in arbitrary chunks, every bone track is yielded by `iter_tracks` as soon
+    as its JSON object is complete, without waiting for the rest of the document. Tracks are
+    converted straight to T2MTrackArrays.
+    """
+
+    def __init__(self):
+        self.duration: float | None = None
+        self.prompt: str | None = None
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key = None
+        self.has_bones = False
+        self._is_closed = False
+        self._json_decoder = json.JSONDecoder()
+
+    @property
+    def is_complete(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str):
+        if self._pos > _COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+
+    def close(self):
+        """Mark the end of the input, incomplete input raises a ValueError from then on"""
+        self._is_closed = True
+        if self._state == _DONE:
+            self._check_trailing_content()
+
+    def _check_trailing_content(self):
+        trailing = _NON_WHITESPACE.search(self._buffer, self._pos)
+        if trailing:
+            raise ValueError(
+                f"Unexpected '{trailing.group()}' after the end of T2MFrames JSON at position {trailing.start()}")
+
+    def _next_char(self) -> str | None:
+        while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+            self._pos += 1
+        if self._pos >= len(self._buffer):
+            if self._is_closed:
+                raise ValueError("Unexpected end of T2MFrames JSON")
+            return None
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str):
+        if self._buffer[self._pos] != char:
+            raise ValueError(
+                f"Expected '{char}' at position {self._pos} of T2MFrames JSON")
+        self._pos += 1
+
+    def _decode_value(self):
+        """Decode the JSON value at the current position, returns (False, None) if more input is needed"""
+        try:
+            value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._is_closed:
+                raise
+            return False, None
+
+        # a number may still be missing digits until the next delimiter arrives
+        if not self._is_closed:
+            next_char = _NON_WHITESPACE.search(self._buffer, end)
+            if not next_char or next_char.group() not in ",:}]":
+                return False, None
+        self._pos = end
+        return True, value
+
+    def iter_tracks(self) -> Iterator[tuple[str, T2MTrackArrays]]:
+        """Tracks completed since the last call, malformed input raises ValueError"""
+        while self._state != _DONE:
+            char = self._next_char()
+            if char is None:
+                return
+
+            if self._state == _START:
+                self._expect("{")
+                self._state = _KEY
+            elif self._state in (_KEY, _BONE_KEY):
+                if char == "}":
+                    self._pos += 1
+                    # an empty bones object returns to the top level object
+                    self._state = _AFTER_VALUE if self._state == _BONE_KEY else _DONE
+                    continue
+                is_decoded, key = self._decode_value()
+                if not is_decoded:
+                    return
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected a key at position {self._pos} of T2MFrames JSON")
+                self._key = key
+                self._state = _BONE_COLON if self._state == _BONE_KEY else _COLON
+            elif self._state in (_COLON, _BONE_COLON):
+                self._expect(":")
+                if self._state == _BONE_COLON:
+                    self._state = _BONE_VALUE
+                elif self._key == "bones":
+                    self.has_bones = True
+                    self._state = _BONES_START
+                else:
+                    self._state = _VALUE
+            elif self._state == _BONES_START:
+                self._expect("{")
+                self._state = _BONE_KEY
+            elif self._state == _VALUE:
+                is_decoded, value = self._decode_value()
+                if not is_decoded:
+                    return
+                if self._key == "duration":
+                    if not isinstance(value, (int, float)) or isinstance(value, bool):
+                        raise ValueError(f"Expected a number for the duration, got {value!r}")
+                    self.duration = float(value)
+                elif self._key == "prompt":
+                    if value is not None and not isinstance(value, str):
+                        raise ValueError(f"Expected a string for the prompt, got {value!r}")
+                    self.prompt = value
+                self._state = _AFTER_VALUE
+            elif self._state == _BONE_VALUE:
+                is_decoded, value = self._decode_value()
+                if not is_decoded:
+                    return
+                self._state = _AFTER_BONE
+                yield self._key, T2MTrackArrays.from_dict(value)
+            elif self._state in (_AFTER_VALUE, _AFTER_BONE):
+                self._pos += 1
+                if char == ",":
+                    self._state = _BONE_KEY if self._state == _AFTER_BONE else _KEY
+                elif char == "}":
+                    self._state = _AFTER_VALUE if self._state == _AFTER_BONE else _DONE
+                else:
+                    raise ValueError(
+                        f"Unexpected '{char}' at position {self._pos - 1} of T2MFrames JSON")
+        if self._is_closed:
+            self._check_trailing_content()
+
+
+def decode_frames(frames_str: str) -> T2MFramesArrays:
+    """Decode a complete T2MFrames JSON document into its columnar form"""
+    decoder = T2MFramesStreamDecoder()
+    decoder.feed(frames_str)
+    decoder.close()
+    bones = dict(decoder.iter_tracks())
+    if decoder.duration is None:
+        raise ValueError("Generated frames are missing the duration")
+    if not decoder.has_bones:
+        raise ValueError("Generated frames are missing the bones")
+    return T2MFramesArrays(decoder.duration, bones, decoder.prompt)
@@ -0,0 +1,94 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger("text2motion")
+
+
+class T2MGenerationTimings:
+    """Per-phase durations and counters of one generation
+
+    Spans with the same name accumulate, so a phase that runs once per bone, or once per timer
+    tick, reports its total. The request phase runs on a worker thread while the rest runs on
+    Blender's main thread.
+    """
+
+    def __init__(self, prompt: str = "", model_version: str = ""):
+        self.prompt = prompt
+        self.model_version = model_version
+        self.spans = {}
+        self.counters = {}
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name: str, seconds: float):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value):
+        with self._lock:
+            self.counters[name] = value
+
+    def merge(self, other: "T2MGenerationTimings"):
+        """Add the spans and numeric counters of `other`, e.g. one part of a larger generation"""
+        spans, counters = other.spans.copy(), other.counters.copy()
+        with self._lock:
+            for name, seconds in spans.items():
+                self.spans[name] = self.spans.get(name, 0.0) + seconds
+            for name, value in counters.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        self._finished_at = time.perf_counter()
+
+    @property
+    def total_seconds(self) -> float:
+        return (self._finished_at or time.perf_counter()) - self._started_at
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "event": "t2m_generation",
+                "prompt": self.prompt,
+                "model_version": self.model_version,
+                "total_ms": round(self.total_seconds * 1000, 3),
+                "spans_ms": {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()},
+                "counters": dict(self.counters),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+
+last_generation_timings: T2MGenerationTimings | None = None
+
+
+def log_generation_timings(timings: T2MGenerationTimings):
+    """Finish `timings`, log them as a single JSON line and keep them for the UI"""
+    global last_generation_timings
+    timings.finish()
+    last_generation_timings = timings
+    logger.info(timings.to_json())
+
+
+def timing_span(timings: T2MGenerationTimings | None, name: str):
+    """`timings.span(name)`, or a no-op when the caller is not collecting timings"""
+    if timings is None:
+        return nullcontext()
+    return timings.span(name)
@@ -0,0 +1,56 @@
+"""Import the bpy-free modules of the add-on without running its __init__, which needs Blender"""
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+
+import numpy
+import pytest
+
+ADDON_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "addons", "text2motion")
+
+if "text2motion" not in sys.modules:
+    spec = importlib.machinery.ModuleSpec("text2motion", None, is_package=True)
+    spec.submodule_search_locations = [ADDON_DIRECTORY]
+    sys.modules["text2motion"] = importlib.util.module_from_spec(spec)
+
+
+def import_blender():
+    """The bpy module of Blender, tests that need it are skipped outside of Blender"""
+    bpy = pytest.importorskip("bpy")
+    if not isinstance(getattr(bpy.app, "version", None), tuple):
+        pytest.skip("needs Blender, not the fake-bpy-module stubs")
+    return bpy
+
+
+def random_rotations(rng, count: int) -> numpy.ndarray:
+    rotations = rng.normal(size=(count, 4))
+    return rotations / numpy.linalg.norm(rotations, axis=1, keepdims=True)
+
+
+def make_frames_json(bone_count: int = 3, sample_count: int = 10, fps: float = 30.0,
+                     seed: int = 0) -> str:
+    """T2MFrames JSON with random rotations for every bone and positions for the first one"""
+    rng = numpy.random.default_rng(seed)
+    times = numpy.arange(sample_count) / fps
+    bones = {}
+    for index in range(bone_count):
+        track = {"rotation": {repr(time): rotation for time, rotation in
+                              zip(times.tolist(), random_rotations(rng, sample_count).tolist())}}
+        if index == 0:
+            track["position"] = {repr(time): position for time, position in
+                                 zip(times.tolist(), rng.normal(size=(sample_count, 3)).tolist())}
+        bones[f"mixamorigBone{index}"] = track
+    return json.dumps({"duration": float(times[-1]), "bones": bones, "prompt": "a person walks"})
+
+
+@pytest.fixture
+def rng():
+    return numpy.random.default_rng(0)
+
+
+@pytest.fixture
+def frames_json():
+    return make_frames_json()
@@ -0,0 +1,92 @@
+import pytest
+
+from text2motion.t2m_bone_map import (
+    AUTO_PROFILE_ID,
+    BUILTIN_PROFILES,
+    T2MBoneMapLibrary,
+    T2MBoneMapProfile,
+    compile_bone_map,
+    make_profile_template,
+)
+
+
+@pytest.mark.parametrize("bone_name", ["mixamorig:Hips", "mixamorig1:Hips", "mixamorig12:Hips",
+                                       "mixamorigHips"])
+def test_mixamo_namespace(bone_name):
+    bone_map = compile_bone_map([bone_name], BUILTIN_PROFILES[AUTO_PROFILE_ID])
+
+    assert bone_map.t2m_names == ["mixamorigHips"]
+    assert bone_map.get_index("mixamorigHips") == 0
+
+
+def test_rigify_profile():
+    bone_names = ["root", "DEF-spine", "DEF-upper_arm.L", "DEF-upper_arm.R", "DEF-toe.L"]
+    bone_map = compile_bone_map(bone_names, BUILTIN_PROFILES["RIGIFY"])
+
+    assert bone_map.t2m_names == [
+        "root", "mixamorigHips", "mixamorigLeftArm", "mixamorigRightArm", "mixamorigLeftToeBase"]
+
+
+def test_ue_mannequin_profile():
+    bone_names = ["pelvis", "spine_01", "clavicle_l", "calf_r", "ball_r", "ik_hand_root"]
+    bone_map = compile_bone_map(bone_names, BUILTIN_PROFILES["UE_MANNEQUIN"])
+
+    assert bone_map.t2m_names == [
+        "mixamorigHips", "mixamorigSpine", "mixamorigLeftShoulder", "mixamorigRightLeg",
+        "mixamorigRightToeBase", "ik_hand_root"]
+    assert bone_map.get_index("mixamorigRightLeg") == 3
+
+
+def test_unknown_bones_keep_their_names():
+    bone_map = compile_bone_map(["tail", "mixamorig:Tail"], BUILTIN_PROFILES["RIGIFY"])
+
+    assert bone_map.t2m_names == ["tail", "mixamorigTail"]
+    assert bone_map.get_index("mixamorigHips") is None
+    assert len(bone_map) == 2
+
+
+def test_mapped_name_takes_precedence_over_derived_name():
+    profile = T2MBoneMapProfile(name="Custom", bones={"mixamorigHips": "pelvis"})
+    bone_map = compile_bone_map(["mixamorig:Hips", "pelvis"], profile)
+
+    # the unmapped bone keeps its own name rather than the name the mapped bone owns
+    assert bone_map.t2m_names == ["mixamorig:Hips", "mixamorigHips"]
+
+
+def test_duplicate_names_get_a_suffix():
+    bone_map = compile_bone_map(["mixamorig:Hips", "mixamorig1:Hips", "mixamorig2:Hips"])
+
+    assert bone_map.t2m_names == ["mixamorigHips", "mixamorig1:Hips", "mixamorig2:Hips"]
+
+
+def test_custom_profiles_from_json(tmp_path):
+    library = T2MBoneMapLibrary(str(tmp_path))
+    profile = make_profile_template("My Rig", ["Hips", "mixamorig:Spine"])
+    profile.bones["mixamorigHips"] = profile.bones.pop("Hips")
+    profile_id = library.save_profile(profile)
+
+    assert profile_id == "My_Rig.json"
+    assert library.save_profile(profile) == "My_Rig_1.json"
+    loaded = library.get_profile(profile_id)
+    assert loaded == profile
+    assert compile_bone_map(["Hips", "mixamorig:Spine"], loaded).t2m_names == [
+        "mixamorigHips", "mixamorigSpine"]
+    assert set(library.get_profiles()) == {*BUILTIN_PROFILES, "My_Rig.json", "My_Rig_1.json"}
+
+
+def test_invalid_custom_profile_is_skipped(tmp_path):
+    (tmp_path / "broken.json").write_text('{"bones": ', encoding="utf-8")
+    (tmp_path / "unnamed.json").write_text('{"bones": {}}', encoding="utf-8")
+    library = T2MBoneMapLibrary(str(tmp_path))
+
+    assert set(library.get_profiles()) == set(BUILTIN_PROFILES)
+    assert library.get_profile("broken.json") is None
+
+
+def test_fingerprint_follows_the_mapping():
+    profile = T2MBoneMapProfile(name="A", bones={"mixamorigHips": "pelvis"})
+    renamed = T2MBoneMapProfile(name="B", description="same bones", bones={"mixamorigHips": "pelvis"})
+    changed = T2MBoneMapProfile(name="A", bones={"mixamorigHips": "root"})
+
+    assert profile.fingerprint == renamed.fingerprint
+    assert profile.fingerprint != changed.fingerprint
@@ -0,0 +1,84 @@
+import os
+
+from text2motion.t2m_cache import CACHE_FILE_EXTENSION, T2MResponseCache
+
+
+def _age_entries(cache, keys):
+    """Give the entries increasing modification times in the order of `keys`, long ago"""
+    for age, key in enumerate(reversed(keys), start=1):
+        mtime = 1_000_000 - age * 60
+        os.utime(cache._path(key), (mtime, mtime))
+
+
+def test_put_and_get(tmp_path):
+    cache = T2MResponseCache(str(tmp_path))
+    cache.put("walk", '{"duration": 1.0}')
+
+    assert cache.get("walk") == '{"duration": 1.0}'
+    assert cache.get("run") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert os.listdir(tmp_path) == ["walk" + CACHE_FILE_EXTENSION]
+
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path):
+    cache = T2MResponseCache(str(tmp_path), max_size_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 10)
+    _age_entries(cache, ["a", "b", "c"])
+    # the hit makes "a" the most recently used entry
+    assert cache.get("a") is not None
+
+    cache.put("d", "x" * 10)
+
+    assert cache.get("b") is None
+    for key in ("a", "c", "d"):
+        assert cache.get(key) is not None
+
+
+def test_size_limit(tmp_path):
+    cache = T2MResponseCache(str(tmp_path), max_size_bytes=25)
+    for key in ("a", "b", "c"):
+        cache.put(key, "x" * 10)
+        _age_entries(cache, [other for other in ("a", "b", "c")
+                             if os.path.exists(cache._path(other))])
+
+    assert cache.get_size_bytes() == 20
+    assert cache.get("a") is None
+
+    cache.max_size_bytes = 0
+    cache.evict()
+    assert cache.get_size_bytes() == 0
+
+
+def test_entry_larger_than_the_limit_is_not_kept(tmp_path):
+    cache = T2MResponseCache(str(tmp_path), max_size_bytes=5)
+    cache.put("walk", "x" * 10)
+
+    assert cache.get("walk") is None
+
+
+def test_clear(tmp_path):
+    cache = T2MResponseCache(str(tmp_path))
+    cache.put("walk", "{}")
+    cache.get("walk")
+    (tmp_path / "notes.txt").write_text("not a cache entry")
+
+    cache.clear()
+
+    assert cache.get_size_bytes() == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert os.listdir(tmp_path) == ["notes.txt"]
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache = T2MResponseCache(str(tmp_path))
+    (tmp_path / ("binary" + CACHE_FILE_EXTENSION)).write_bytes(b"\xff\xfe\x00garbage")
+    (tmp_path / ("empty" + CACHE_FILE_EXTENSION)).write_bytes(b"")
+
+    assert cache.get("binary") is None
+    assert cache.get("empty") is None
+    assert cache.misses == 2
+    assert os.listdir(tmp_path) == []
+
+    cache.put("binary", "{}")
+    assert cache.get("binary") == "{}"
@@ -0,0 +1,114 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+from text2motion_client_api.configuration import Configuration
+
+from text2motion.t2m_http import (
+    COMPRESSION_LEVEL,
+    COMPRESSION_MIN_BYTES,
+    T2MRestClient,
+    encode_json_body,
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "benchmarks"))
+from mock_server import start_mock_server
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def make_body(bone_count: int = 40) -> dict:
+    """Generate request body with a chain of `bone_count` bones"""
+    bone = None
+    for index in reversed(range(bone_count)):
+        bone = {"name": f"mixamorigBone{index}", "rest_matrix": [[0.123456] * 4] * 4,
+                "children": [bone] if bone else []}
+    return {"prompt": "a person walks", "target_skeleton": {"root": bone}, "seconds": 1}
+
+
+@pytest.fixture
+def start_server():
+    """Start a mock server with the given options, it is shut down after the test"""
+    servers = []
+
+    def start(**kwargs):
+        servers.append(start_mock_server(**kwargs))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def mock_server(start_server):
+    return start_server()
+
+
+def _post(client, server, body):
+    response = client.request("POST", server.url + "/api/generate", JSON_HEADERS, body)
+    return response.status, json.loads(response.read())
+
+
+def test_request_body_is_gzip_compressed(mock_server):
+    client = T2MRestClient(Configuration(host=mock_server.url))
+    body = make_body()
+    encoded_body = encode_json_body(body)
+    assert len(encoded_body) >= COMPRESSION_MIN_BYTES
+
+    status, response = _post(client, mock_server, body)
+
+    assert status == 200
+    assert client.compress_requests
+    assert mock_server.received_bytes == client.sent_bytes
+    assert client.sent_bytes == len(gzip.compress(encoded_body, COMPRESSION_LEVEL))
+    assert client.sent_bytes < len(encoded_body) // 4
+    # the server decoded the skeleton from the compressed body
+    assert "mixamorigBone39" in json.loads(response["result"])["bones"]
+
+
+def test_small_request_body_is_not_compressed(mock_server):
+    client = T2MRestClient(Configuration(host=mock_server.url))
+    body = make_body(bone_count=1)
+
+    status, _ = _post(client, mock_server, body)
+
+    assert status == 200
+    assert client.sent_bytes == mock_server.received_bytes == len(encode_json_body(body))
+
+
+def test_response_is_decompressed(mock_server):
+    client = T2MRestClient(Configuration(host=mock_server.url))
+    response = client.request("POST", mock_server.url + "/api/generate", JSON_HEADERS, make_body())
+    content = response.read()
+
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert mock_server.sent_bytes < len(content)
+    assert json.loads(json.loads(content)["result"])["duration"] == 1
+
+
+def test_unsupported_compression_falls_back_to_uncompressed(start_server):
+    mock_server = start_server(accepts_compressed_requests=False)
+    client = T2MRestClient(Configuration(host=mock_server.url))
+    body = make_body()
+    encoded_body = encode_json_body(body)
+
+    status, response = _post(client, mock_server, body)
+
+    assert status == 200
+    assert "mixamorigBone0" in json.loads(response["result"])["bones"]
+    # the first attempt is answered with 415 and sent again uncompressed
+    assert not client.compress_requests
+    assert mock_server.request_count == 2
+    assert client.sent_bytes == mock_server.received_bytes
+    assert client.sent_bytes == len(gzip.compress(encoded_body, COMPRESSION_LEVEL)) + len(encoded_body)
+
+    sent_bytes = client.sent_bytes
+    status, _ = _post(client, mock_server, body)
+    assert status == 200
+    assert mock_server.request_count == 3
+    assert client.sent_bytes - sent_bytes == len(encoded_body)
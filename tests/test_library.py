@@ -0,0 +1,83 @@
+import hashlib
+import json
+import types
+
+import numpy
+from conftest import make_frames_json
+
+from text2motion import t2m_library
+from text2motion.t2m_library import (
+    CLIP_FILE_EXTENSION,
+    LIBRARY_INDEX_FILE_NAME,
+    T2MClipLibrary,
+)
+from text2motion.t2m_stream import decode_frames
+
+
+def test_add_clip_writes_index_and_hash_named_file(tmp_path, frames_json):
+    library = T2MClipLibrary(str(tmp_path))
+    entry = library.add_clip(decode_frames(frames_json), "Walk", model_version="v1")
+
+    content = (tmp_path / entry.file_name).read_bytes()
+    assert entry.hash == hashlib.sha256(content).hexdigest()
+    assert entry.file_name == entry.hash[:32] + CLIP_FILE_EXTENSION
+    assert entry.prompt == "a person walks"
+    assert entry.bone_count == 3
+
+    index = json.loads((tmp_path / LIBRARY_INDEX_FILE_NAME).read_text(encoding="utf-8"))
+    assert [saved["hash"] for saved in index["entries"]] == [entry.hash]
+    assert not (tmp_path / (LIBRARY_INDEX_FILE_NAME + ".tmp")).exists()
+
+
+def test_same_clip_is_stored_once(tmp_path, frames_json):
+    library = T2MClipLibrary(str(tmp_path))
+    entry = library.add_clip(decode_frames(frames_json), "Walk")
+    duplicate = library.add_clip(decode_frames(frames_json), "Walk again")
+
+    assert duplicate == entry
+    assert len(library.get_entries()) == 1
+    assert len(list(tmp_path.glob("*" + CLIP_FILE_EXTENSION))) == 1
+
+
+def test_index_is_read_by_other_sessions(tmp_path, frames_json):
+    entry = T2MClipLibrary(str(tmp_path)).add_clip(decode_frames(frames_json), "Walk")
+
+    other_session = T2MClipLibrary(str(tmp_path))
+    assert other_session.get_entries() == [entry]
+    assert other_session.get_entry(entry.hash) == entry
+    assert other_session.get_entry("missing") is None
+
+
+def test_search_matches_every_word_newest_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(t2m_library, "time", types.SimpleNamespace(time=iter([1.0, 2.0]).__next__))
+    library = T2MClipLibrary(str(tmp_path))
+    walk = library.add_clip(decode_frames(make_frames_json(seed=1)), "Walk", prompt="a person walks")
+    run = library.add_clip(decode_frames(make_frames_json(seed=2)), "Run", prompt="a person runs fast")
+
+    assert library.search("") == [run, walk]
+    assert library.search("PERSON") == [run, walk]
+    assert library.search("person fast") == [run]
+    assert library.search("walk") == [walk]
+    assert library.search("jumps") == []
+
+
+def test_load_round_trip(tmp_path, frames_json):
+    frames = decode_frames(frames_json)
+    library = T2MClipLibrary(str(tmp_path))
+    loaded = library.read_clip(library.add_clip(frames, "Walk"))
+
+    assert loaded.duration == frames.duration
+    assert loaded.prompt == frames.prompt
+    assert list(loaded.bones) == list(frames.bones)
+    for bone_name, track in frames.bones.items():
+        assert numpy.array_equal(loaded.bones[bone_name].rotation_times, track.rotation_times)
+        assert numpy.allclose(loaded.bones[bone_name].rotation_values, track.rotation_values, atol=1e-6)
+
+
+def test_remove_clip(tmp_path, frames_json):
+    library = T2MClipLibrary(str(tmp_path))
+    entry = library.add_clip(decode_frames(frames_json), "Walk")
+    library.remove_clip(entry)
+
+    assert library.get_entries() == []
+    assert not (tmp_path / entry.file_name).exists()
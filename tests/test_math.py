@@ -0,0 +1,67 @@
+import numpy
+from conftest import random_rotations
+
+from text2motion.t2m_math import (
+    canonicalize_quaternions,
+    matrices_to_quaternions,
+    multiply_quaternions,
+    normalize_quaternions,
+    retarget_rotations,
+    slerp_quaternions,
+)
+
+
+def test_canonicalize_makes_w_non_negative(rng):
+    quaternions = random_rotations(rng, 100)
+    canonical = canonicalize_quaternions(quaternions)
+    assert (canonical[:, 0] >= 0).all()
+    # q and -q are the same rotation
+    assert numpy.allclose(numpy.abs(canonical), numpy.abs(quaternions))
+
+
+def test_normalize_falls_back_to_identity():
+    result = normalize_quaternions(numpy.array([[0.0, 0.0, 0.0, 0.0], [0.0, 2.0, 0.0, 0.0]]))
+    assert numpy.allclose(result, [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]])
+
+
+def test_retarget_converts_xyzw_to_canonical_wxyz():
+    rotations_xyzw = numpy.array([[0.0, 0.0, 0.0, -2.0], [0.5, 0.5, 0.5, 0.5]])
+    result = retarget_rotations(rotations_xyzw)
+    assert numpy.allclose(result, [[1.0, 0.0, 0.0, 0.0], [0.5, 0.5, 0.5, 0.5]])
+
+
+def test_retarget_applies_correction_on_the_left(rng):
+    rotations_xyzw = random_rotations(rng, 20)
+    correction = random_rotations(rng, 1)[0]
+    expected = canonicalize_quaternions(
+        multiply_quaternions(correction, rotations_xyzw[:, [3, 0, 1, 2]]))
+    assert numpy.allclose(retarget_rotations(rotations_xyzw, correction), expected)
+
+
+def test_matrices_to_quaternions_matches_known_rotation():
+    # 90 degrees around X, with scale that must be ignored
+    matrix = numpy.array([[1.0, 0.0, 0.0], [0.0, 0.0, -1.0], [0.0, 1.0, 0.0]]) * 2.0
+    half = numpy.sqrt(0.5)
+    assert numpy.allclose(matrices_to_quaternions(matrix[None]), [[half, half, 0.0, 0.0]])
+
+
+def test_matrices_to_quaternions_round_trips(rng):
+    quaternions = canonicalize_quaternions(random_rotations(rng, 50))
+    w, x, y, z = quaternions.T
+    matrices = numpy.stack((
+        numpy.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)), axis=-1),
+        numpy.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)), axis=-1),
+        numpy.stack((2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)), axis=-1),
+    ), axis=1)
+    assert numpy.allclose(matrices_to_quaternions(matrices), quaternions)
+
+
+def test_slerp_takes_the_shorter_arc():
+    identity = numpy.array([[1.0, 0.0, 0.0, 0.0]])
+    half = numpy.sqrt(0.5)
+    # -q of a 90 degree rotation around Z, halfway must be 45 degrees and not 135
+    rotation = -numpy.array([[half, 0.0, 0.0, half]])
+    result = slerp_quaternions(identity, rotation, numpy.array([0.5]))
+    angle = 2 * numpy.arccos(abs(result[0, 0]))
+    assert numpy.isclose(angle, numpy.pi / 4)
+    assert numpy.allclose(numpy.linalg.norm(result, axis=1), 1.0)
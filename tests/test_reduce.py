@@ -0,0 +1,88 @@
+import numpy
+import pytest
+from conftest import import_blender
+
+from text2motion.t2m_math import normalize_quaternions
+from text2motion.t2m_reduce import (
+    location_errors,
+    reduce_keyframes_mask,
+    rotation_errors,
+)
+
+
+def linear_playback(times, values, mask):
+    """Component-wise linear interpolation between the kept keys, as LINEAR fcurves play back"""
+    return numpy.stack([numpy.interp(times, times[mask], values[mask, index])
+                        for index in range(values.shape[1])], axis=1)
+
+
+def smooth_walk(rng, count, width):
+    # a random walk of velocities, smooth like generated motion
+    velocities = numpy.cumsum(rng.normal(scale=0.001, size=(count, width)), axis=0)
+    return numpy.cumsum(velocities, axis=0)
+
+
+def test_short_curves_keep_every_key():
+    assert reduce_keyframes_mask(numpy.array([0.0, 1.0]), numpy.zeros((2, 3)), 0.1).all()
+
+
+def test_linear_motion_reduces_to_its_ends():
+    times = numpy.linspace(0.0, 1.0, 31)
+    values = numpy.outer(times, [1.0, 2.0, 3.0])
+    mask = reduce_keyframes_mask(times, values, 1e-6)
+    assert numpy.flatnonzero(mask).tolist() == [0, 30]
+
+
+@pytest.mark.parametrize("tolerance", [0.001, 0.01, 0.05])
+def test_location_error_stays_within_tolerance(rng, tolerance):
+    times = numpy.arange(300) / 30
+    values = smooth_walk(rng, 300, 3)
+    mask = reduce_keyframes_mask(times, values, tolerance)
+    assert mask[0] and mask[-1]
+    assert mask.sum() < len(mask)
+    errors = location_errors(values, linear_playback(times, values, mask))
+    assert errors.max() <= tolerance + 1e-12
+
+
+@pytest.mark.parametrize("tolerance", [numpy.radians(0.5), numpy.radians(2.0)])
+def test_rotation_error_stays_within_tolerance(rng, tolerance):
+    times = numpy.arange(300) / 30
+    quaternions = normalize_quaternions(numpy.array([1.0, 0.0, 0.0, 0.0]) + smooth_walk(rng, 300, 4))
+    mask = reduce_keyframes_mask(times, quaternions, tolerance, rotation_errors)
+    assert mask.sum() < len(mask)
+    errors = rotation_errors(quaternions, linear_playback(times, quaternions, mask))
+    assert errors.max() <= tolerance + 1e-9
+
+
+@pytest.mark.parametrize("use_bulk_keyframe_insert", [True, False])
+def test_reduced_fcurves_play_back_within_tolerance(rng, use_bulk_keyframe_insert):
+    bpy = import_blender()
+    from text2motion.t2m_server_request_wrapper import _insert_keyframes
+
+    fps = 30
+    tolerance = 0.01
+    frames = numpy.arange(300, dtype=numpy.float64)
+    values = smooth_walk(rng, 300, 3)
+    mask = reduce_keyframes_mask(frames / fps, values, tolerance)
+
+    target_object = bpy.data.objects.new("T2MReduceTest", None)
+    bpy.context.scene.collection.objects.link(target_object)
+    try:
+        target_object.animation_data_create()
+        action = bpy.data.actions.new("T2MReduceTest")
+        target_object.animation_data.action = action
+        _insert_keyframes(action, target_object, "location", frames[mask], values[mask],
+                          use_bulk_keyframe_insert, interpolation="LINEAR")
+
+        fcurves = [action.fcurves.find("location", index=index) for index in range(3)]
+        assert all(keyframe.interpolation == "LINEAR"
+                   for fcurve in fcurves for keyframe in fcurve.keyframe_points)
+        # the dropped samples are where Bezier handles would overshoot
+        dropped_frames = frames[~mask]
+        played = numpy.array([[fcurve.evaluate(frame) for fcurve in fcurves]
+                              for frame in dropped_frames])
+        # keys are stored as float32
+        assert location_errors(values[~mask], played).max() <= tolerance + 1e-5
+    finally:
+        bpy.data.objects.remove(target_object)
+        bpy.data.actions.remove(action)
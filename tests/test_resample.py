@@ -0,0 +1,33 @@
+import math
+
+import numpy
+from conftest import random_rotations
+
+from text2motion.t2m_animation import T2MTrackArrays
+from text2motion.t2m_resample import get_sample_times, resample_track
+
+
+def test_sample_times_are_whole_frames():
+    times = numpy.array([-1e-9, 0.0333, 0.5, 1.01])
+    sample_times = get_sample_times(times, 30)
+    assert numpy.allclose(sample_times * 30, numpy.arange(31))
+    assert math.copysign(1.0, sample_times[0]) == 1.0
+
+
+def test_sample_times_of_an_empty_track():
+    assert len(get_sample_times(numpy.empty(0), 30)) == 0
+
+
+def test_resample_track_interpolates_between_samples(rng):
+    # 24 fps samples resampled onto 30 fps
+    times = numpy.arange(25) / 24
+    positions = numpy.outer(times, [1.0, -2.0, 0.5])
+    rotations = random_rotations(rng, 25)
+    track = resample_track(T2MTrackArrays(times, rotations, times, positions), 30)
+
+    assert numpy.allclose(track.position_times * 30, numpy.arange(31))
+    # linear motion is reproduced exactly
+    assert numpy.allclose(track.position_values, numpy.outer(track.position_times, [1.0, -2.0, 0.5]))
+    assert numpy.allclose(numpy.linalg.norm(track.rotation_values, axis=1), 1.0)
+    # samples on shared times are kept, up to the sign of the quaternion
+    assert numpy.allclose(numpy.abs(track.rotation_values[[0, -1]]), numpy.abs(rotations[[0, -1]]))
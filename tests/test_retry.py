@@ -0,0 +1,31 @@
+from text2motion_client_api.exceptions import ApiException
+
+from text2motion.t2m_retry import T2MRetryPolicy, T2MTokenBucket, make_token_bucket
+
+
+def test_zero_rate_has_no_token_bucket():
+    assert make_token_bucket(0, 16) is None
+    bucket = make_token_bucket(2.0, 4)
+    assert isinstance(bucket, T2MTokenBucket)
+    assert (bucket.rate_per_second, bucket.capacity) == (2.0, 4)
+
+
+def test_token_bucket_allows_a_burst_then_the_rate():
+    bucket = T2MTokenBucket(rate_per_second=1.0, capacity=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = bucket.try_acquire()
+    assert 0.9 < wait <= 1.0
+
+
+def test_retry_policy_retries_throttled_requests():
+    attempts = []
+
+    def request():
+        attempts.append(len(attempts))
+        if len(attempts) < 3:
+            raise ApiException(status=429)
+        return "frames"
+
+    policy = T2MRetryPolicy(base_delay_seconds=0.0, max_delay_seconds=0.0)
+    assert policy.call(request) == "frames"
+    assert len(attempts) == 3
@@ -0,0 +1,64 @@
+import numpy
+import pytest
+
+from text2motion.t2m_root_motion import (
+    HORIZONTAL_AXES,
+    ROOT_MOTION_FULL,
+    ROOT_MOTION_IN_PLACE,
+    ROOT_MOTION_NONE,
+    ROOT_MOTION_OBJECT,
+    VERTICAL_AXIS,
+    extract_root_motion,
+    to_object_space,
+)
+
+
+def make_positions(rng):
+    return numpy.cumsum(rng.normal(scale=0.05, size=(50, 3)), axis=0) + [0.5, 1.0, -0.2]
+
+
+def rotation_about_z(angle):
+    cos_angle, sin_angle = numpy.cos(angle), numpy.sin(angle)
+    return numpy.array([[cos_angle, -sin_angle, 0.0], [sin_angle, cos_angle, 0.0], [0.0, 0.0, 1.0]])
+
+
+def test_full_and_none_modes(rng):
+    positions = make_positions(rng)
+    root_positions, translation = extract_root_motion(positions, ROOT_MOTION_FULL)
+    assert root_positions is positions and translation is None
+    root_positions, translation = extract_root_motion(positions, ROOT_MOTION_NONE)
+    assert len(root_positions) == 0 and translation is None
+
+
+def test_object_mode_moves_the_travel_to_the_object(rng):
+    positions = make_positions(rng)
+    root_positions, translation = extract_root_motion(positions, ROOT_MOTION_OBJECT)
+    in_place, _ = extract_root_motion(positions, ROOT_MOTION_IN_PLACE)
+    assert numpy.array_equal(root_positions, in_place)
+    assert numpy.allclose(translation[:, VERTICAL_AXIS], 0.0)
+    # the bone and the object together travel as generated
+    assert numpy.allclose((root_positions + translation)[:, HORIZONTAL_AXES],
+                          positions[:, HORIZONTAL_AXES])
+
+
+def test_unknown_mode_raises(rng):
+    with pytest.raises(ValueError):
+        extract_root_motion(make_positions(rng), "SIDEWAYS")
+
+
+def test_object_space_converts_between_objects(rng):
+    """An action keyed for one object is converted for another by target @ inv(source)"""
+    _, translation = extract_root_motion(make_positions(rng), ROOT_MOTION_OBJECT)
+    root_rest_matrix = numpy.identity(4)
+    root_rest_matrix[:3, :3] = [[1.0, 0.0, 0.0], [0.0, 0.0, -1.0], [0.0, 1.0, 0.0]]
+    source_matrix = numpy.identity(4)
+    target_matrix = numpy.identity(4)
+    target_matrix[:3, :3] = rotation_about_z(numpy.pi / 2) * 2.0
+
+    source_values = to_object_space(translation, root_rest_matrix, source_matrix)
+    target_values = to_object_space(translation, root_rest_matrix, target_matrix)
+    conversion = target_matrix[:3, :3] @ numpy.linalg.inv(source_matrix[:3, :3])
+    assert numpy.allclose(source_values @ conversion.T, target_values)
+    # a character turned a quarter around walks a quarter turned, at twice the scale
+    assert numpy.allclose(target_values[:, 0], -2.0 * source_values[:, 1])
+    assert numpy.allclose(target_values[:, 1], 2.0 * source_values[:, 0])
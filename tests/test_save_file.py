@@ -0,0 +1,94 @@
+import io
+
+import numpy
+import pytest
+
+from text2motion.t2m_animation import (
+    T2M_SAVE_FILE_VERSION_1_0,
+    T2M_SAVE_FILE_VERSION_2_0,
+)
+from text2motion.t2m_save_file import (
+    _HEADER,
+    _NAME_SIZE,
+    _TRACK_ENTRY,
+    BINARY_MAGIC,
+    pack_frames,
+    read_binary,
+    read_save_file,
+    unpack_frames,
+    write_binary,
+    write_save_file,
+)
+from text2motion.t2m_stream import decode_frames
+
+
+@pytest.mark.parametrize("version", [T2M_SAVE_FILE_VERSION_1_0, T2M_SAVE_FILE_VERSION_2_0])
+def test_save_file_round_trip(tmp_path, frames_json, version):
+    frames = decode_frames(frames_json)
+    path = str(tmp_path / "clip.t2m")
+    write_save_file(path, frames, version)
+    loaded = read_save_file(path)
+
+    assert loaded.duration == frames.duration
+    assert loaded.prompt == frames.prompt
+    assert list(loaded.bones) == list(frames.bones)
+    for bone_name, track in frames.bones.items():
+        loaded_track = loaded.bones[bone_name]
+        # times are stored as float64, values as float32 in the binary version
+        assert numpy.array_equal(loaded_track.rotation_times, track.rotation_times)
+        assert numpy.allclose(loaded_track.rotation_values, track.rotation_values, atol=1e-6)
+        assert numpy.array_equal(loaded_track.position_times, track.position_times)
+        assert numpy.allclose(loaded_track.position_values, track.position_values, atol=1e-6)
+
+
+def test_unsupported_version_raises(tmp_path, frames_json):
+    with pytest.raises(ValueError):
+        write_save_file(str(tmp_path / "clip.t2m"), decode_frames(frames_json), "9.0")
+
+
+def test_truncated_binary_file_raises(tmp_path, frames_json):
+    path = tmp_path / "clip.t2m"
+    write_save_file(str(path), decode_frames(frames_json))
+    data = path.read_bytes()
+    for size in range(len(BINARY_MAGIC), len(data)):
+        with pytest.raises(ValueError):
+            read_binary(data[:size])
+
+    path.write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError):
+        read_save_file(str(path))
+
+
+def test_binary_index_out_of_range_raises(tmp_path, frames_json):
+    frames = decode_frames(frames_json)
+    buffer = io.BytesIO()
+    write_binary(buffer, frames)
+    data = bytearray(buffer.getvalue())
+    # point the rotation track of the first bone past the end of the file
+    name_size = len(next(iter(frames.bones)).encode("utf-8"))
+    entry_offset = _HEADER.size + len(frames.prompt.encode("utf-8")) + _NAME_SIZE.size + name_size
+    rotation_offset, rotation_count, position_offset, position_count = \
+        _TRACK_ENTRY.unpack_from(data, entry_offset)
+    # the entry read above is the real one, its track lies inside the file
+    assert rotation_count == len(frames.bones[next(iter(frames.bones))].rotation_times)
+    assert entry_offset < rotation_offset < len(data)
+    _TRACK_ENTRY.pack_into(data, entry_offset, len(data), rotation_count,
+                           position_offset, position_count)
+    with pytest.raises(ValueError):
+        read_binary(bytes(data))
+
+
+def test_packed_frames_round_trip(frames_json):
+    frames = decode_frames(frames_json)
+    packed = pack_frames(frames)
+    assert isinstance(packed, str)
+    unpacked = unpack_frames(packed)
+    assert unpacked.duration == frames.duration
+    for bone_name, track in frames.bones.items():
+        assert numpy.allclose(unpacked.bones[bone_name].rotation_values, track.rotation_values,
+                              atol=1e-6)
+
+    with pytest.raises(ValueError):
+        unpack_frames(packed[:len(packed) // 2])
+    with pytest.raises(ValueError):
+        unpack_frames("not packed frames")
@@ -0,0 +1,139 @@
+import math
+
+import numpy
+import pytest
+
+from text2motion.t2m_animation import T2MFramesArrays, T2MTrackArrays
+from text2motion.t2m_sequence import T2MSequence, get_headings, rotate_heading
+
+FPS = 30.0
+ROOT = "mixamorigHips"
+SPINE = "mixamorigSpine"
+
+
+def make_walk(heading: float, duration: float = 1.0, height: float = 1.0, speed: float = 1.5,
+              prompt: str = "a person walks", start=(0.0, 0.0)) -> T2MFramesArrays:
+    """A root walking straight ahead at `heading` and a spine bent forward, sampled at 60 fps"""
+    times = numpy.arange(round(duration * 60) + 1) / 60
+    yaw = numpy.tile([0.0, math.sin(heading / 2), 0.0, math.cos(heading / 2)], (len(times), 1))
+    distances = speed * times
+    positions = numpy.stack([start[0] + distances * math.sin(heading),
+                             numpy.full_like(times, height),
+                             start[1] + distances * math.cos(heading)], axis=1)
+    bend = numpy.tile([math.sin(0.1), 0.0, 0.0, math.cos(0.1)], (len(times), 1))
+    empty = numpy.empty(0)
+    return T2MFramesArrays(duration, {
+        ROOT: T2MTrackArrays(times, yaw, times, positions),
+        SPINE: T2MTrackArrays(times, bend, empty, numpy.empty((0, 3))),
+    }, prompt)
+
+
+def test_headings():
+    angles = numpy.array([0.0, 0.5, -2.0, math.pi / 2])
+    rotations = numpy.stack([numpy.zeros(4), numpy.sin(angles / 2), numpy.zeros(4),
+                             numpy.cos(angles / 2)], axis=1)
+
+    assert numpy.allclose(get_headings(rotations), angles)
+
+    turned, positions = rotate_heading(rotations, numpy.array([[0.0, 1.0, 1.0]]), 0.25)
+    assert numpy.allclose(get_headings(turned), angles + 0.25)
+    assert numpy.allclose(positions, [[math.sin(0.25), 1.0, math.cos(0.25)]])
+
+
+def test_start_and_blend_frames():
+    sequence = T2MSequence([make_walk(0.0), make_walk(0.0, duration=2.0), make_walk(0.0)], FPS,
+                           blend_seconds=0.5)
+
+    # 31, 61 and 31 frames, each clip starts 15 frames before the previous one ends
+    assert sequence.blend_frames == [0, 15, 15]
+    assert sequence.start_frames == [0, 16, 62]
+    assert sequence.frame_count == 93
+    assert [len(clip.bones[ROOT].rotation_times) for clip in sequence.clips] == [31, 61, 31]
+
+
+def test_blend_is_at_most_half_of_either_clip():
+    sequence = T2MSequence([make_walk(0.0), make_walk(0.0, duration=0.4)], FPS, blend_seconds=1.0)
+
+    assert sequence.blend_frames == [0, 6]
+    assert sequence.start_frames == [0, 25]
+
+
+def test_no_blend_places_clips_end_to_end():
+    sequence = T2MSequence([make_walk(0.0), make_walk(0.0)], FPS, blend_seconds=0.0)
+
+    assert sequence.blend_frames == [0, 0]
+    assert sequence.start_frames == [0, 31]
+    assert sequence.frame_count == 62
+
+
+@pytest.mark.parametrize("blend_seconds", [0.0, 0.5])
+def test_heading_is_aligned(blend_seconds):
+    sequence = T2MSequence([make_walk(0.3), make_walk(-1.2)], FPS, blend_seconds)
+    reference_frame = 31 - max(1, sequence.blend_frames[1])
+
+    previous_root = sequence.clips[0].bones[ROOT]
+    root = sequence.clips[1].bones[ROOT]
+    assert numpy.allclose(get_headings(root.rotation_values), 0.3)
+    assert get_headings(previous_root.rotation_values[reference_frame:reference_frame + 1])[0] == \
+        pytest.approx(0.3)
+    # the second clip keeps walking straight ahead, which is now the first clip's heading
+    direction = root.position_values[-1] - root.position_values[0]
+    assert math.atan2(direction[0], direction[2]) == pytest.approx(0.3)
+    # bones other than the root are left as generated
+    assert numpy.allclose(sequence.clips[1].bones[SPINE].rotation_values,
+                          sequence.clips[0].bones[SPINE].rotation_values)
+
+
+@pytest.mark.parametrize("blend_seconds", [0.0, 0.5])
+def test_root_continues_at_every_seam(blend_seconds):
+    clips = [make_walk(0.0, height=1.0), make_walk(1.0, height=0.9, start=(5.0, -3.0)),
+             make_walk(-0.5, height=1.1, start=(-2.0, 7.0))]
+    sequence = T2MSequence(clips, FPS, blend_seconds)
+
+    for index in range(1, len(clips)):
+        previous_positions = sequence.clips[index - 1].bones[ROOT].position_values
+        first_position = sequence.clips[index].bones[ROOT].position_values[0]
+        reference_frame = len(previous_positions) - max(1, sequence.blend_frames[index])
+        assert first_position[[0, 2]] == pytest.approx(previous_positions[reference_frame][[0, 2]])
+        # the height is left as generated
+        assert first_position[1] == pytest.approx(clips[index].bones[ROOT].position_values[0][1])
+
+    assert numpy.allclose(sequence.get_root_origin(), [0.0, 1.0, 0.0])
+
+
+def test_stitch_crossfades_over_the_blend_frames():
+    clips = [make_walk(0.0, prompt="walk"), make_walk(math.pi / 2, height=0.8, prompt="turn")]
+    sequence = T2MSequence(clips, FPS, blend_seconds=0.5)
+    stitched = sequence.stitch()
+    root = stitched.bones[ROOT]
+    start_frame, blend_frames = sequence.start_frames[1], sequence.blend_frames[1]
+
+    assert stitched.duration == pytest.approx((sequence.frame_count - 1) / FPS)
+    assert stitched.prompt == "walk; turn"
+    assert numpy.allclose(root.rotation_times, numpy.arange(sequence.frame_count) / FPS)
+    assert numpy.array_equal(root.position_times, root.rotation_times)
+    assert len(stitched.bones[SPINE].position_times) == 0
+
+    first_clip = sequence.clips[0].bones[ROOT]
+    second_clip = sequence.clips[1].bones[ROOT]
+    blend_end = start_frame + blend_frames
+    # before the overlap only the first clip, after it only the second clip
+    assert numpy.allclose(root.position_values[:start_frame], first_clip.position_values[:start_frame])
+    assert numpy.allclose(root.position_values[blend_end:], second_clip.position_values[blend_frames:])
+    assert numpy.allclose(root.rotation_values[blend_end:], second_clip.rotation_values[blend_frames:])
+
+    # the aligned clips walk the same path, only the generated heights differ over the overlap
+    heights = root.position_values[start_frame - 1:blend_end + 1, 1]
+    assert heights[0] == pytest.approx(1.0) and heights[-1] == pytest.approx(0.8)
+    assert numpy.all(numpy.diff(heights) < 0)
+    assert numpy.allclose(root.position_values[start_frame:blend_end, [0, 2]],
+                          first_clip.position_values[start_frame:, [0, 2]])
+
+
+def test_missing_bone_rests_in_a_clip():
+    second = make_walk(0.0)
+    del second.bones[SPINE]
+    sequence = T2MSequence([make_walk(0.0), second], FPS, blend_seconds=0.0)
+    spine = sequence.stitch().bones[SPINE]
+
+    assert numpy.allclose(spine.rotation_values[31:], [0.0, 0.0, 0.0, 1.0])
@@ -0,0 +1,92 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from text2motion.t2m_single_flight import T2MSingleFlight
+
+TIMEOUT_SECONDS = 5
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT_SECONDS
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _call_concurrently(flight, key, fn, caller_count=2):
+    """Futures of `caller_count` threads calling `fn` through `flight`, all joined while it runs
+
+    `fn` must wait for its release event before returning.
+    """
+    executor = ThreadPoolExecutor(max_workers=caller_count)
+    futures = [executor.submit(flight.call, key, fn)]
+    _wait_for(lambda: len(flight) == 1)
+    futures += [executor.submit(flight.call, key, fn) for _ in range(caller_count - 1)]
+    _wait_for(lambda: flight.coalesced_count == caller_count - 1)
+    executor.shutdown(wait=False)
+    return futures
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = T2MSingleFlight()
+    release = threading.Event()
+    fetch_count = 0
+
+    def fetch():
+        nonlocal fetch_count
+        fetch_count += 1
+        release.wait(TIMEOUT_SECONDS)
+        return "frames"
+
+    futures = _call_concurrently(flight, "walk", fetch, caller_count=3)
+    release.set()
+
+    assert [future.result(TIMEOUT_SECONDS) for future in futures] == ["frames"] * 3
+    assert fetch_count == 1
+    assert len(flight) == 0
+
+
+def test_exception_reaches_every_waiter():
+    flight = T2MSingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(TIMEOUT_SECONDS)
+        raise ConnectionError("server unavailable")
+
+    futures = _call_concurrently(flight, "walk", fetch)
+    release.set()
+
+    for future in futures:
+        with pytest.raises(ConnectionError, match="server unavailable"):
+            future.result(TIMEOUT_SECONDS)
+    assert len(flight) == 0
+
+
+def test_later_call_starts_a_new_fetch():
+    flight = T2MSingleFlight()
+
+    assert flight.call("walk", lambda: 1) == 1
+    assert flight.call("walk", lambda: 2) == 2
+    assert flight.coalesced_count == 0
+
+
+def test_different_keys_do_not_coalesce():
+    flight = T2MSingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(TIMEOUT_SECONDS)
+        return threading.get_ident()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flight.call, key, fetch) for key in ("walk", "run")]
+        _wait_for(lambda: len(flight) == 2)
+        release.set()
+        results = [future.result(TIMEOUT_SECONDS) for future in futures]
+
+    assert results[0] != results[1]
+    assert flight.coalesced_count == 0
@@ -0,0 +1,57 @@
+import numpy
+
+from text2motion.t2m_skeleton import (
+    build_skeleton,
+    get_blender_to_t2m_matrix,
+    get_rotation_corrections,
+    get_skeleton_fingerprint,
+    matrix_to_list,
+)
+
+NAMES = ["mixamorigHips", "mixamorigSpine", "mixamorigLeftUpLeg"]
+PARENTS = [-1, 0, 0]
+
+
+def make_matrices():
+    matrices = numpy.tile(numpy.identity(4), (3, 1, 1))
+    matrices[:, :3, 3] = [[0.0, 0.0, 1.0], [0.0, 0.0, 1.1234567891], [0.1, 0.0, 0.9]]
+    return matrices
+
+
+def test_blender_to_t2m_is_minus_90_degrees_around_x():
+    expected = numpy.identity(4)
+    expected[1:3, 1:3] = [[0.0, 1.0], [-1.0, 0.0]]
+    assert numpy.allclose(get_blender_to_t2m_matrix(), expected)
+
+
+def test_matrix_to_list_is_column_major():
+    matrix = numpy.arange(16.0).reshape(4, 4)
+    assert matrix_to_list(matrix)[:4] == [0.0, 4.0, 8.0, 12.0]
+
+
+def test_build_skeleton_keeps_hierarchy():
+    skeleton = build_skeleton(NAMES, PARENTS, make_matrices())
+    assert skeleton.root.name == "mixamorigHips"
+    assert sorted(child.name for child in skeleton.root.children) == sorted(NAMES[1:])
+
+
+def test_build_skeleton_rounds_matrices():
+    skeleton = build_skeleton(NAMES, PARENTS, make_matrices(), precision=3)
+    spine = next(child for child in skeleton.root.children if child.name == "mixamorigSpine")
+    assert spine.matrix[14] == 0.123
+    exact = build_skeleton(NAMES, PARENTS, make_matrices(), precision=None)
+    spine = next(child for child in exact.root.children if child.name == "mixamorigSpine")
+    assert numpy.isclose(spine.matrix[14], 0.1234567891)
+
+
+def test_fingerprint_changes_with_rest_data():
+    matrices = make_matrices()
+    fingerprint = get_skeleton_fingerprint(NAMES, PARENTS, matrices)
+    assert fingerprint == get_skeleton_fingerprint(NAMES, PARENTS, matrices.copy())
+    matrices[1, 0, 3] += 0.01
+    assert fingerprint != get_skeleton_fingerprint(NAMES, PARENTS, matrices)
+
+
+def test_rotation_corrections_are_identity_for_aligned_bones():
+    corrections = get_rotation_corrections(PARENTS, make_matrices())
+    assert numpy.allclose(corrections, [[1.0, 0.0, 0.0, 0.0]] * 3)
@@ -0,0 +1,73 @@
+import numpy
+
+from text2motion.t2m_skeleton import get_skeleton_fingerprint
+from text2motion.t2m_skeleton_cache import T2MSkeletonCache
+
+NAMES = ["mixamorigHips", "mixamorigSpine"]
+PARENTS = [-1, 0]
+
+
+def test_hit_needs_the_same_fingerprint():
+    cache = T2MSkeletonCache()
+    cache.put("Armature", "rest", "skeleton")
+
+    assert cache.get("Armature", "rest") == "skeleton"
+    assert cache.get("Armature", "edited") is None
+    assert cache.get("Other", "rest") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_edited_rig_misses():
+    matrices = numpy.tile(numpy.eye(4), (len(NAMES), 1, 1))
+    cache = T2MSkeletonCache()
+    cache.put("Armature", get_skeleton_fingerprint(NAMES, PARENTS, matrices), "skeleton")
+
+    assert cache.get("Armature", get_skeleton_fingerprint(NAMES, PARENTS, matrices.copy())) == "skeleton"
+    matrices[1, 1, 3] = 0.5
+    assert cache.get("Armature", get_skeleton_fingerprint(NAMES, PARENTS, matrices)) is None
+    renamed = ["mixamorigHips", "mixamorigSpine1"]
+    assert cache.get("Armature", get_skeleton_fingerprint(renamed, PARENTS, matrices)) is None
+
+
+def test_put_replaces_the_fingerprint():
+    cache = T2MSkeletonCache()
+    cache.put("Armature", "rest", "old skeleton")
+    cache.put("Armature", "edited", "new skeleton")
+
+    assert cache.get("Armature", "rest") is None
+    assert cache.get("Armature", "edited") == "new skeleton"
+    assert cache.get_fingerprint("Armature") == "edited"
+    assert len(cache) == 1
+
+
+def test_find_shares_identical_rigs():
+    cache = T2MSkeletonCache()
+    cache.put("Armature", "rest", "skeleton")
+
+    assert cache.find("rest") == "skeleton"
+    assert cache.find("edited") is None
+
+
+def test_least_recently_used_armature_is_dropped():
+    cache = T2MSkeletonCache(max_entries=2)
+    cache.put("A", "a", "skeleton a")
+    cache.put("B", "b", "skeleton b")
+    assert cache.get("A", "a") == "skeleton a"
+
+    cache.put("C", "c", "skeleton c")
+
+    assert len(cache) == 2
+    assert cache.get_fingerprint("B") is None
+    assert cache.get("A", "a") == "skeleton a"
+    assert cache.get("C", "c") == "skeleton c"
+
+
+def test_invalidate_and_clear():
+    cache = T2MSkeletonCache()
+    cache.put("A", "a", "skeleton a")
+    cache.put("B", "b", "skeleton b")
+
+    cache.invalidate("A")
+    assert cache.get_fingerprint("A") is None
+    cache.clear()
+    assert len(cache) == 0
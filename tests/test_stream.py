@@ -0,0 +1,100 @@
+import json
+
+import numpy
+import pytest
+
+from text2motion.t2m_animation import T2MFrames, T2MFramesArrays
+from text2motion.t2m_stream import T2MFramesStreamDecoder, decode_frames
+
+
+def assert_same_frames(frames, expected):
+    assert frames.duration == expected.duration
+    assert list(frames.bones) == list(expected.bones)
+    for bone_name, track in frames.bones.items():
+        expected_track = expected.bones[bone_name]
+        assert numpy.array_equal(track.rotation_times, expected_track.rotation_times)
+        assert numpy.array_equal(track.rotation_values, expected_track.rotation_values)
+        assert numpy.array_equal(track.position_times, expected_track.position_times)
+        assert numpy.array_equal(track.position_values, expected_track.position_values)
+
+
+def test_decode_matches_pydantic_model(frames_json):
+    expected = T2MFramesArrays.from_frames(T2MFrames.model_validate_json(frames_json))
+    assert_same_frames(decode_frames(frames_json), expected)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 10000])
+def test_chunked_decode_matches_full_decode(frames_json, chunk_size):
+    decoder = T2MFramesStreamDecoder()
+    bones = {}
+    for start in range(0, len(frames_json), chunk_size):
+        decoder.feed(frames_json[start:start + chunk_size])
+        bones.update(decoder.iter_tracks())
+    decoder.close()
+    bones.update(decoder.iter_tracks())
+    assert decoder.is_complete
+
+    expected = decode_frames(frames_json)
+    assert_same_frames(T2MFramesArrays(decoder.duration, bones), expected)
+
+
+def test_tracks_are_yielded_before_the_document_ends(frames_json):
+    decoder = T2MFramesStreamDecoder()
+    # everything but the last bone and the end of the document
+    last_bone_start = frames_json.rindex('"mixamorigBone2"')
+    decoder.feed(frames_json[:last_bone_start])
+    assert [bone_name for bone_name, _ in decoder.iter_tracks()] == ["mixamorigBone0", "mixamorigBone1"]
+    assert not decoder.is_complete
+
+
+def test_truncated_input_raises_after_close(frames_json):
+    decoder = T2MFramesStreamDecoder()
+    decoder.feed(frames_json[:len(frames_json) // 2])
+    decoder.close()
+    with pytest.raises(ValueError):
+        list(decoder.iter_tracks())
+
+
+def test_missing_duration_raises():
+    with pytest.raises(ValueError):
+        decode_frames(json.dumps({"bones": {}}))
+
+
+@pytest.mark.parametrize("trailing", ["{}", "x", ",", '{"duration": 2}'])
+def test_trailing_content_raises(frames_json, trailing):
+    with pytest.raises(ValueError):
+        decode_frames(frames_json + "\n" + trailing)
+    assert decode_frames(frames_json + " \n\t").duration == decode_frames(frames_json).duration
+
+
+def test_trailing_content_raises_in_chunks(frames_json):
+    decoder = T2MFramesStreamDecoder()
+    decoder.feed(frames_json)
+    list(decoder.iter_tracks())
+    decoder.feed(" garbage")
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+@pytest.mark.parametrize("document", [
+    '{"duration": "5", "bones": {}}',
+    '{"duration": null, "bones": {}}',
+    '{"duration": true, "bones": {}}',
+    '{"duration": [5], "bones": {}}',
+    '{"duration": 5, "bones": null}',
+    '{"duration": 5, "bones": []}',
+    '{"duration": 5}',
+    '{"duration": 5, "bones": {}, "prompt": 3}',
+    '{"duration": 5, "bones": {"mixamorigHips": null}}',
+    '{"duration": 5, "bones": {"mixamorigHips": [1, 2]}}',
+    '{"duration": 5, "bones": {"mixamorigHips": {"rotation": [1, 2, 3, 4]}}}',
+    '{"duration": 5, "bones": {"mixamorigHips": {"rotation": {"0": [null, 0, 0, 1]}}}}',
+    '{"duration": 5, "bones": {"mixamorigHips": {"rotation": {"0": ["0", 0, 0, 1]}}}}',
+    '{"duration": 5, "bones": {"mixamorigHips": {"rotation": {"0": [0, 0, 1]}}}}',
+    '{"duration": 5, "bones": {"mixamorigHips": {"position": {"now": [0, 0, 1]}}}}',
+    '[]',
+    'null',
+])
+def test_wrong_types_raise_value_error(document):
+    with pytest.raises(ValueError):
+        decode_frames(document)
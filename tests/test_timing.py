@@ -0,0 +1,23 @@
+from text2motion.t2m_timing import T2MGenerationTimings
+
+
+def test_spans_accumulate():
+    timings = T2MGenerationTimings("a person walks")
+    timings.add_span("keyframes", 0.5)
+    timings.add_span("keyframes", 0.25)
+    assert timings.spans == {"keyframes": 0.75}
+
+
+def test_merge_adds_spans_and_numeric_counters():
+    total = T2MGenerationTimings("a person walks; a person runs")
+    total.add_span("skeleton", 0.1)
+    for request_seconds in (1.0, 2.0):
+        segment = T2MGenerationTimings()
+        segment.add_span("request", request_seconds)
+        segment.count("retries")
+        segment.set("cache_hit", False)
+        total.merge(segment)
+
+    assert total.spans == {"skeleton": 0.1, "request": 3.0}
+    # flags of a single generation do not add up
+    assert total.counters == {"retries": 2}